@@ -0,0 +1,156 @@
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+import pandas as pd
+import stocks
+import indicators
+import providers
+import instrumentation
+from lazy import loaded
+
+INDICATOR_COLUMNS = {
+    "ma": ['20-day MA', '50-day MA'],
+    "bollinger": ['Middle Band', 'Upper Band', 'Lower Band'],
+    "rsi": ['RSI'],
+    "macd": ['MACD', 'MACD Signal'],
+}
+PREDICTION_FIELDS = ('RSI Norm', 'MACD Norm', 'Bollinger Position Norm', 'Sentiment Norm', 'Total Score', 'Trend')
+FORMATS = ("csv", "json", "table")
+HEAVY_MODULES = ("matplotlib", "mplfinance", "yfinance", "pandas_market_calendars", "requests", "bs4",
+                 "textblob")
+
+
+def indicator_names(spec):
+    names = []
+    for key in spec.split(","):
+        key = key.strip().lower()
+        if not key:
+            continue
+        if key == "all":
+            return [name for columns in INDICATOR_COLUMNS.values() for name in columns]
+        if key not in INDICATOR_COLUMNS:
+            raise ValueError(f"unknown indicator {key}, expected some of {', '.join(INDICATOR_COLUMNS)} or all")
+        names += INDICATOR_COLUMNS[key]
+    return names
+
+
+def analyze_ticker(ticker, start_date, end_date, names, rows=1, interval=None, predict=False, sentiment=False,
+                   plot_dir=None, compact=False):
+    data = stocks.fetch_stock_data(ticker, start_date, end_date, interval, verbose=False, compact=compact)
+    if data.empty:
+        raise LookupError(f"no data for {ticker}")
+    if compact:
+        columns = indicators.compute(data).columns()
+        frame = pd.DataFrame({'Close': data['Close'].tail(rows).astype(float),
+                              **{name: columns[name].tail(rows) for name in names}})
+    else:
+        indicators.compute(data).apply(data)
+        frame = data[['Close'] + names].tail(rows).copy()
+    frame.insert(0, 'Ticker', ticker)
+    if predict:
+        result = stocks.predict_stock_movement(data, ticker, None if sentiment else [])
+        for field, value in zip(PREDICTION_FIELDS, result):
+            frame[field] = None
+            frame.loc[frame.index[-1], field] = value
+    elif sentiment:
+        frame['Sentiment Rating'] = None
+        frame.loc[frame.index[-1], 'Sentiment Rating'] = stocks.get_headlines_sentiment(ticker)
+    if plot_dir:
+        fig = stocks.plot_projection(data, ticker, return_fig=True)
+        fig.savefig(os.path.join(plot_dir, f"{ticker}_projection.png"))
+    return frame
+
+
+def write_results(results, fmt, output=None):
+    target = output or sys.stdout
+    if fmt == "csv":
+        results.to_csv(target)
+    elif fmt == "json":
+        text = results.reset_index().to_json(orient="records", date_format="iso")
+        if output:
+            with open(output, "w") as f:
+                f.write(text)
+        else:
+            print(text)
+    else:
+        text = results.to_string()
+        if output:
+            with open(output, "w") as f:
+                f.write(text)
+        else:
+            print(text)
+
+
+def main(argv=None):
+    started = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Batch-analyze tickers without the GUI")
+    parser.add_argument("tickers", nargs="*")
+    parser.add_argument("--file", help="text file with one ticker per line")
+    parser.add_argument("--indicators", default="rsi,macd", help=f"comma list of {', '.join(INDICATOR_COLUMNS)} or all")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--output", help="write to this file instead of stdout")
+    parser.add_argument("--rows", type=int, default=1, help="number of most recent bars per ticker")
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--interval")
+    parser.add_argument("--predict", action="store_true", help="add the buy/short score")
+    parser.add_argument("--sentiment", action="store_true", help="scrape and score headlines")
+    parser.add_argument("--plot", help="save a projection chart per ticker into this directory")
+    parser.add_argument("--replay", help="read bars recorded with providers.py from this directory")
+    parser.add_argument("--compact", action="store_true", help="hold bars as float32 CompactBars to save memory")
+    parser.add_argument("--timings", action="store_true", help="report run time, per-stage timings and which heavy modules were imported")
+    parser.add_argument("--profile", help="comma list of stages to run under cProfile, e.g. predict,fetch")
+    parser.add_argument("--export-timings", help="write per-stage spans and counters to a .json or .csv file")
+    args = parser.parse_args(argv)
+
+    tickers = [ticker.strip().upper() for ticker in args.tickers if ticker.strip()]
+    if args.file:
+        with open(args.file, "r") as f:
+            tickers += [line.split(",")[0].strip().upper() for line in f if line.strip() and not line.startswith("#")]
+    if not tickers:
+        parser.error("no tickers given")
+    try:
+        names = indicator_names(args.indicators)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.replay:
+        providers.set_provider(providers.ReplayProvider(args.replay))
+    stocks.bar_store.compact = args.compact
+    if args.plot:
+        os.makedirs(args.plot, exist_ok=True)
+    if args.profile:
+        instrumentation.recorder.enable_profiling(args.profile.split(","))
+
+    end_date = datetime.today()
+    start_str = (end_date - timedelta(days=args.days)).strftime('%Y-%m-%d')
+    end_str = end_date.strftime('%Y-%m-%d')
+    frames = []
+    failed = 0
+    for ticker in tickers:
+        try:
+            with instrumentation.run("analyze", ticker):
+                frames.append(analyze_ticker(ticker, start_str, end_str, names, args.rows, args.interval,
+                                             args.predict, args.sentiment, args.plot, args.compact))
+        except Exception as e:
+            failed += 1
+            print(f"ERROR {ticker}: {e}", file=sys.stderr)
+    if frames:
+        write_results(pd.concat(frames), args.format, args.output)
+    if args.timings:
+        heavy = [name for name in HEAVY_MODULES if loaded(name)]
+        print(f"{len(tickers)} tickers in {time.perf_counter() - started:.3f} s, "
+              f"heavy modules loaded: {', '.join(heavy) or 'none'}", file=sys.stderr)
+        print(instrumentation.recorder.report(), file=sys.stderr)
+    for profile in instrumentation.recorder.profiles:
+        print(f"profile of {profile['name']} ({profile['path']}):\n{profile['report']}", file=sys.stderr)
+    if args.export_timings:
+        if args.export_timings.endswith(".csv"):
+            instrumentation.recorder.export_csv(args.export_timings)
+        else:
+            instrumentation.recorder.export_json(args.export_timings)
+    return 1 if failed == len(tickers) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import stocks
+import indicators
+import screener
+import parallel
+
+COST_BPS = 1.0
+SLIPPAGE_BPS = 2.0
+SECONDS_PER_YEAR = 365.25 * 86400
+
+
+def score_series(data, sentiment_norm=0.0, weights=stocks.SCORE_WEIGHTS):
+    # the predict_stock_movement score for every bar at once; indicators are causal, so bar t only sees bars <= t
+    frame = indicators.compute(data)
+    rsi_norm, macd_norm, bollinger_norm = stocks.indicator_norms(
+        frame.rsi, frame.macd, frame.macd_signal, frame.close, frame.middle_band, frame.upper_band, frame.lower_band)
+    score = stocks.total_score(rsi_norm, macd_norm, sentiment_norm, weights, bollinger_norm)
+    valid = pd.concat([frame.close, frame.ma[20], frame.ma[50], frame.middle_band, frame.rsi, frame.macd,
+                       frame.macd_signal], axis=1).notna().all(axis=1)
+    return score.where(valid)
+
+
+def positions(score, allow_short=True):
+    # BUY when the score is >= 0, otherwise SHORT (or flat when shorting is off), as display_analysis_results reads it
+    signal = np.where(score >= 0, 1.0, -1.0 if allow_short else 0.0)
+    signal = np.where(score.isna(), 0.0, signal)
+    return pd.Series(signal, index=score.index)
+
+
+def simulate(close, score, cost_bps=COST_BPS, slippage_bps=SLIPPAGE_BPS, allow_short=True):
+    # a signal computed on a bar's close is traded at that close and earns the next bar's return
+    position = positions(score, allow_short)
+    returns = close.pct_change().fillna(0.0)
+    held = position.shift(1).fillna(0.0)
+    turnover = position.diff().abs().fillna(position.abs())
+    gross = held * returns
+    net = gross - turnover * (cost_bps + slippage_bps) / 10000
+    equity = (1 + net).cumprod()
+    drawdown = equity / equity.cummax() - 1
+    return pd.DataFrame({
+        'Close': close,
+        'Score': score,
+        'Position': position,
+        'Return': returns,
+        'Gross Return': gross,
+        'Turnover': turnover,
+        'Net Return': net,
+        'Equity': equity,
+        'Drawdown': drawdown,
+    })
+
+
+def backtest(data, sentiment_norm=0.0, weights=stocks.SCORE_WEIGHTS, cost_bps=COST_BPS, slippage_bps=SLIPPAGE_BPS,
+             allow_short=True):
+    close = indicators.close_series(data)
+    return simulate(close, score_series(data, sentiment_norm, weights), cost_bps, slippage_bps, allow_short)
+
+
+def summarize(result):
+    if result.empty:
+        return {}
+    span = (result.index[-1] - result.index[0]).total_seconds() if isinstance(result.index, pd.DatetimeIndex) else 0
+    years = span / SECONDS_PER_YEAR if span > 0 else len(result) / 252
+    periods = len(result) / years
+    net = result['Net Return']
+    held = result['Position'].shift(1).fillna(0.0) != 0
+    traded = result['Gross Return'][held]
+    equity = float(result['Equity'].iloc[-1])
+    close = result['Close'].dropna()
+    deviation = net.std()
+    return {
+        'Bars': len(result),
+        'Total Return': equity - 1,
+        'CAGR': equity ** (1 / years) - 1 if equity > 0 else -1.0,
+        'Sharpe': float(net.mean() / deviation * np.sqrt(periods)) if deviation > 0 else 0.0,
+        'Max Drawdown': float(result['Drawdown'].min()),
+        'Hit Rate': float((traded > 0).mean()) if len(traded) else float('nan'),
+        'Trades': int((result['Turnover'] > 0).sum()),
+        'Turnover': float(result['Turnover'].sum() / years),
+        'Exposure': float(held.mean()),
+        'Buy & Hold': float(close.iloc[-1] / close.iloc[0] - 1) if len(close) else float('nan'),
+    }
+
+
+def backtest_chunk(tasks, params):
+    results = []
+    for position, ticker, start, stop in tasks:
+        try:
+            result = {'Ticker': ticker, **summarize(backtest(parallel.frame_from_block(start, stop), **params))}
+        except Exception as e:
+            result = {'Ticker': ticker, 'Error': str(e)}
+        results.append((position, result))
+    return results
+
+
+def backtest_many(frames, workers=None, chunksize=parallel.CHUNK_SIZE, **params):
+    frames = {ticker: data for ticker, data in frames.items() if not data.empty}
+    if not frames:
+        return pd.DataFrame()
+    results = parallel.map_shared(frames, backtest_chunk, params, workers=workers, chunksize=chunksize)
+    return pd.DataFrame(results)
+
+
+def backtest_tickers(tickers, start_date, end_date, interval=None, workers=None, **params):
+    tickers = [ticker.strip().upper() for ticker in tickers if ticker.strip()]
+    panel = screener.fetch_universe(tickers, interval or stocks.get_interval(), start_date, end_date)
+    if panel.empty:
+        return pd.DataFrame()
+    return backtest_many(parallel.split_panel(panel), workers, **params)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest the BUY/SHORT score over history")
+    parser.add_argument("tickers", nargs="*")
+    parser.add_argument("--file", help="text file with one ticker per line")
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--interval")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--cost-bps", type=float, default=COST_BPS, help="commission per unit of turnover")
+    parser.add_argument("--slippage-bps", type=float, default=SLIPPAGE_BPS, help="slippage per unit of turnover")
+    parser.add_argument("--long-only", action="store_true", help="go flat instead of short on a negative score")
+    parser.add_argument("--output", help="write the per-ticker metrics to a CSV file")
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.file:
+        tickers += screener.read_tickers(args.file)
+    end_date = datetime.today()
+    start_date = (end_date - timedelta(days=args.days)).strftime('%Y-%m-%d')
+    results = backtest_tickers(tickers, start_date, end_date.strftime('%Y-%m-%d'), args.interval, args.workers,
+                               cost_bps=args.cost_bps, slippage_bps=args.slippage_bps,
+                               allow_short=not args.long_only)
+    if args.output:
+        results.to_csv(args.output, index=False)
+    print(results.to_string(index=False))
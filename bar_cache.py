@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import threading
+import pandas as pd
+from instrumentation import count
+from compact import CompactBars, as_frame
+
+CACHE_DIR = "bar_cache"
+TAIL_REFRESH_SECONDS = 60
+
+
+def to_day(value):
+    value = pd.Timestamp(value)
+    if value.tzinfo is not None:
+        value = value.tz_localize(None)
+    return value.normalize()
+
+
+def slice_bars(data, start, end):
+    if data.empty:
+        return data
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    tz = getattr(data.index, "tz", None)
+    if tz is not None:
+        start, end = start.tz_localize(tz), end.tz_localize(tz)
+    return data[(data.index >= start) & (data.index < end)]
+
+
+def merge_bars(frames):
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return None
+    if len(frames) == 1:
+        return frames[0]
+    merged = pd.concat(frames)
+    merged = merged[~merged.index.duplicated(keep="last")]
+    return merged.sort_index()
+
+
+class BarCache:
+    def __init__(self, fetch, directory=CACHE_DIR, tail_refresh=TAIL_REFRESH_SECONDS, compact=False):
+        self.fetch = fetch
+        self.directory = directory
+        self.tail_refresh = tail_refresh
+        # compact keeps each history in memory as float32 CompactBars and hands out views of it
+        self.compact = compact
+        self.frames = {}
+        self.meta = {}
+        self.network_calls = 0
+        self.lock = threading.Lock()
+        self.key_locks = {}
+
+    def _path(self, ticker, interval, ext):
+        return os.path.join(self.directory, f"{ticker}_{interval}.{ext}")
+
+    def load(self, ticker, interval):
+        key = (ticker, interval)
+        if key in self.meta:
+            return self.frames[key], self.meta[key]
+        meta_path = self._path(ticker, interval, "json")
+        bars_path = self._path(ticker, interval, "parquet")
+        if not os.path.exists(meta_path):
+            return None, None
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            frame = pd.read_parquet(bars_path) if os.path.exists(bars_path) else None
+        except Exception as e:
+            print(f"ERROR {e}")
+            return None, None
+        if self.compact and frame is not None:
+            frame = CompactBars.from_frame(frame).freeze()
+        self.frames[key] = frame
+        self.meta[key] = meta
+        return frame, meta
+
+    def store(self, ticker, interval, frame, meta):
+        key = (ticker, interval)
+        self.frames[key] = CompactBars.from_frame(frame).freeze() if self.compact and frame is not None else frame
+        self.meta[key] = meta
+        os.makedirs(self.directory, exist_ok=True)
+        if frame is not None:
+            as_frame(frame).to_parquet(self._path(ticker, interval, "parquet"))
+        with open(self._path(ticker, interval, "json"), "w") as f:
+            json.dump(meta, f)
+
+    def _fetch(self, ticker, interval, start, end):
+        self.network_calls += 1
+        return self.fetch(ticker, interval, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+
+    def get(self, ticker, interval, start_date, end_date):
+        ticker = ticker.strip().upper()
+        with self.lock:
+            key_lock = self.key_locks.setdefault((ticker, interval), threading.Lock())
+        with key_lock:
+            calls = self.network_calls
+            data = self._get(ticker, interval, to_day(start_date), to_day(end_date))
+            count("bars.cache_hit" if self.network_calls == calls else "bars.cache_miss")
+            return data
+
+    def _get(self, ticker, interval, start, end):
+        frame, meta = self.load(ticker, interval)
+
+        if meta is None:
+            frame = merge_bars([self._fetch(ticker, interval, start, end)])
+            if frame is not None:
+                meta = {"start": str(start.date()), "end": str(end.date()), "fetched_at": time.time()}
+                self.store(ticker, interval, frame, meta)
+        else:
+            covered_start, covered_end = pd.Timestamp(meta["start"]), pd.Timestamp(meta["end"])
+            head, tail = None, None
+            if start < covered_start:
+                head = self._fetch(ticker, interval, start, covered_start)
+                covered_start = start
+            today = pd.Timestamp.today().normalize()
+            tail_stale = covered_end > today and time.time() - meta["fetched_at"] > self.tail_refresh
+            if end > covered_end or (end > today and tail_stale):
+                tail_start = covered_end
+                if frame is not None and not frame.empty:
+                    tail_start = min(tail_start, to_day(frame.index[-1]))
+                tail = self._fetch(ticker, interval, tail_start, max(end, covered_end))
+                if tail is not None and not tail.empty:
+                    covered_end = max(end, covered_end)
+            if head is not None or tail is not None:
+                frame = merge_bars([head, as_frame(frame), tail])
+                meta = {"start": str(covered_start.date()), "end": str(covered_end.date()),
+                        "fetched_at": time.time() if tail is not None else meta["fetched_at"]}
+                self.store(ticker, interval, frame, meta)
+
+        if frame is None:
+            return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+        if self.compact:
+            frame = CompactBars.from_frame(self.frames.get((ticker, interval), frame))
+            return frame.between(start, end)
+        return slice_bars(frame, start, end).copy()
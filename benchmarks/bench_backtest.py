@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stocks
+import backtest
+from generators import synthetic_ohlcv
+
+
+def looped_scores(data, bars):
+    # what evaluating the call bar by bar through predict_stock_movement costs: a full recompute per prefix
+    scores = []
+    for stop in range(len(data) - bars + 1, len(data) + 1):
+        prefix = data.iloc[:stop][['Open', 'High', 'Low', 'Close', 'Volume']].copy()
+        scores.append(stocks.predict_stock_movement(prefix, "BENCH", news_data=[])[4])
+    return np.array(scores)
+
+
+def universe(count, bars):
+    frames = {}
+    for seed in range(count):
+        frames[f"T{seed:04d}"] = synthetic_ohlcv(bars, seed)
+    return frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorized backtest vs re-running predict_stock_movement per bar")
+    parser.add_argument("--bars", type=int, default=5000)
+    parser.add_argument("--looped-bars", type=int, default=200, help="bars evaluated through the per-bar loop")
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    data = synthetic_ohlcv(args.bars)
+    started = time.perf_counter()
+    result = backtest.backtest(data)
+    vectorized = time.perf_counter() - started
+
+    started = time.perf_counter()
+    looped = looped_scores(data, args.looped_bars)
+    per_bar = (time.perf_counter() - started) / args.looped_bars
+    mismatch = np.abs(result['Score'].to_numpy()[-args.looped_bars:] - looped).max()
+    print(f"{args.bars} bars: vectorized {vectorized * 1000:.1f} ms, per-bar loop {per_bar * 1000:.1f} ms/bar "
+          f"(~{per_bar * args.bars:.1f} s for the history), max score difference {mismatch:.2e}")
+    for name, value in backtest.summarize(result).items():
+        print(f"  {name:>13}: {value:.4f}" if isinstance(value, float) else f"  {name:>13}: {value}")
+
+    frames = universe(args.tickers, args.bars)
+    started = time.perf_counter()
+    serial = [backtest.summarize(backtest.backtest(frame)) for frame in frames.values()]
+    serial_time = time.perf_counter() - started
+    started = time.perf_counter()
+    pooled = backtest.backtest_many(frames, args.workers)
+    pooled_time = time.perf_counter() - started
+    same = np.allclose(pooled['Total Return'].to_numpy(), [metrics['Total Return'] for metrics in serial])
+    print(f"{args.tickers} tickers: serial {serial_time:.2f} s, process pool {pooled_time:.2f} s, identical={same}")
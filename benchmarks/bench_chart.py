@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from mplfinance.original_flavor import candlestick_ohlc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chart_renderer import ChartRenderer
+from generators import synthetic_ohlcv
+
+
+def new_axes():
+    figure = Figure(figsize=(10, 5), dpi=100)
+    canvas = FigureCanvasAgg(figure)
+    return canvas, figure.add_subplot(111)
+
+
+def clear_and_rebuild(canvas, ax, data):
+    ohlc = np.column_stack([np.arange(len(data)), data[['Open', 'High', 'Low', 'Close']].to_numpy()])
+    ax.clear()
+    candlestick_ohlc(ax, ohlc, width=0.6, colorup='green', colordown='red')
+    ax.grid(True)
+    canvas.draw()
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Candle chart redraw time: clear + candlestick_ohlc vs ChartRenderer")
+    parser.add_argument("--bars", type=int, nargs="+", default=[500, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'bars':>8} {'rebuild ms':>11} {'renderer ms':>12} {'tick ms':>8} {'artists':>8}")
+    for count in args.bars:
+        data = synthetic_ohlcv(count)
+        canvas, ax = new_axes()
+        rebuild = best_of(lambda: clear_and_rebuild(canvas, ax, data), args.repeat)
+        artists = len(ax.patches) + len(ax.lines)
+
+        canvas, ax = new_axes()
+        chart = ChartRenderer(canvas, ax)
+        chart.candles(data, "bench")
+        render = best_of(lambda: chart.candles(data, "bench"), args.repeat)
+        last = data['Close'].iloc[-1]
+        prices = last * (1 + np.random.default_rng(1).normal(0, 0.0002, args.ticks))
+        started = time.perf_counter()
+        for price in prices:
+            chart.tick(price)
+        tick = (time.perf_counter() - started) / args.ticks
+        print(f"{count:>8} {rebuild * 1000:>11.1f} {render * 1000:>12.1f} {tick * 1000:>8.2f} "
+              f"{artists:>8}->{len(ax.collections)}  blits={chart.blits}")
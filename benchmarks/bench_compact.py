@@ -0,0 +1,83 @@
+import gc
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stocks
+import indicators
+from bar_cache import BarCache, slice_bars
+from compact import CompactBars, frame_nbytes
+from generators import synthetic_ohlcv, session_index
+
+MINUTES_PER_YEAR = 252 * 390
+
+
+def history_source(tickers, count):
+    frames = {f"T{number:03d}": synthetic_ohlcv(count, number, index=session_index(count, "2019-01-02"))
+              for number in range(tickers)}
+    return frames, lambda ticker, interval, start, end: slice_bars(frames[ticker], start, end).copy()
+
+
+def watchlist(frames, fetch, directory, compact):
+    # what a session holds after processing every ticker: the cache's histories plus each analysed series
+    cache = BarCache(fetch, directory, compact=compact)
+    first, last = next(iter(frames.values())).index[[0, -1]]
+    start, end = first.strftime('%Y-%m-%d'), (last + np.timedelta64(1, 'D')).strftime('%Y-%m-%d')
+    held, scores = [], []
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    for ticker in frames:
+        data = cache.get(ticker, "1m", start, end)
+        data.attrs['key'] = (ticker, "1m", start, end)
+        scores.append(stocks.predict_stock_movement(data, ticker, news_data=[])[4])
+        held.append(data)
+    elapsed = time.perf_counter() - started
+    with_memo = tracemalloc.get_traced_memory()[0]
+    indicators.memo.clear()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    again = cache.get(next(iter(frames)), "1m", start, end)
+    shared = compact and np.shares_memory(again.values, cache.frames[(next(iter(frames)), "1m")].values)
+    held_bytes = sum(item.nbytes if isinstance(item, CompactBars) else frame_nbytes(item) for item in held)
+    return {'retained': retained, 'with_memo': with_memo, 'peak': peak, 'held': held_bytes, 'seconds': elapsed,
+            'scores': np.array(scores), 'views': shared}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory held by a watchlist of 1m histories: DataFrames vs CompactBars")
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--tickers", type=int, default=10)
+    args = parser.parse_args()
+
+    count = int(args.years * MINUTES_PER_YEAR)
+    frames, fetch = history_source(args.tickers, count)
+    results = {}
+    for compact in (False, True):
+        directory = tempfile.mkdtemp()
+        try:
+            results[compact] = watchlist(frames, fetch, directory, compact)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        indicators.memo.clear()
+
+    mb = 2 ** 20
+    print(f"{args.tickers} tickers x {count} 1m bars ({args.years:g} years of regular sessions)")
+    print(f"{'':<12}{'retained MB':>13}{'with memo MB':>14}{'peak MB':>10}{'held MB':>10}{'B/bar':>8}{'seconds':>9}")
+    for compact, name in ((False, "DataFrame"), (True, "CompactBars")):
+        result = results[compact]
+        print(f"{name:<12}{result['retained'] / mb:>13.1f}{result['with_memo'] / mb:>14.1f}{result['peak'] / mb:>10.1f}"
+              f"{result['held'] / mb:>10.1f}{result['retained'] / (count * args.tickers):>8.1f}"
+              f"{result['seconds']:>9.2f}")
+    reduction = 1 - results[True]['retained'] / results[False]['retained']
+    difference = np.abs(results[True]['scores'] - results[False]['scores']).max()
+    print(f"retained memory {reduction:.0%} lower, max score difference from float32 prices {difference:.2e}, "
+          f"cache hands out views: {results[True]['views']}")
@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import warnings
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stocks
+from figure_pool import FigurePool, live_figures
+from generators import synthetic_ohlcv
+
+
+def projection_data(count):
+    data = synthetic_ohlcv(count)
+    data['50-day MA'] = data['Close'].rolling(window=50).mean()
+    return data
+
+
+def recreate(data, runs):
+    # what the GUI used to do: a new pyplot figure and a new canvas for every analysis
+    for _ in range(runs):
+        fig = stocks.plot_projection(data, "BENCH", fig=plt.figure(figsize=(5, 3)))
+        FigureCanvasAgg(fig).draw()
+
+
+def pooled(data, runs):
+    pool = FigurePool(canvas_class=FigureCanvasAgg)
+    figure, canvas = pool.panel("prediction")
+    for _ in range(runs):
+        stocks.plot_projection(data, "BENCH", fig=pool.figure("prediction"))
+        canvas.draw()
+    return pool
+
+
+def measure(func, data, runs):
+    started = time.perf_counter()
+    func(data, runs)
+    elapsed = time.perf_counter() - started
+    plt.close('all')
+    tracemalloc.start()
+    result = func(data, runs)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed / runs, current, len(plt.get_fignums()), live_figures()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prediction panel: recreate figure/canvas per run vs pooled figure")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--bars", type=int, default=500)
+    args = parser.parse_args()
+
+    data = projection_data(args.bars)
+    warnings.filterwarnings("ignore", "More than 20 figures")
+    for name, func in (("recreate", recreate), ("pooled", pooled)):
+        plt.close('all')
+        result, per_run, retained, pyplot_figures, figures = measure(func, data, args.runs)
+        print(f"{name:>9}: {per_run * 1000:8.1f} ms/run  retained={retained / 1e6:7.1f} MB  "
+              f"pyplot figures={pyplot_figures:4d}  live figures={figures:4d}")
+        if isinstance(result, FigurePool):
+            print(f"           pool {result.stats()}")
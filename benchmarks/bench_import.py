@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generators import record_synthetic
+
+EAGER_IMPORTS = ("matplotlib.dates", "matplotlib.pyplot", "matplotlib.figure", "mplfinance.original_flavor",
+                 "sklearn.linear_model", "sklearn.preprocessing", "yfinance", "pandas_market_calendars", "requests",
+                 "bs4")
+
+
+def wall_time(command, cwd, repeat):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run(command, cwd=cwd, env=env, capture_output=True, text=True)
+        elapsed = time.perf_counter() - started
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(command)} failed: {result.stderr[-500:]}")
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result.stderr.strip().splitlines()[-1:] if result.stderr else []
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process start-up time for batch runs, eager vs lazy imports")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    analyze = [sys.executable, os.path.join(ROOT, "analyze.py"), "AAA", "--interval", "1h", "--timings"]
+    with tempfile.TemporaryDirectory() as directory:
+        record_synthetic(directory, ["AAA"], "1h", 2000)
+        analyze += ["--replay", directory]
+        scenarios = [
+            ("python startup", [sys.executable, "-c", "pass"]),
+            ("eager imports (before)", [sys.executable, "-c", f"import {', '.join(EAGER_IMPORTS)}; import stocks"]),
+            ("import stocks", [sys.executable, "-c", "import stocks"]),
+            ("analyze --indicators rsi,macd", analyze),
+            ("analyze --predict", analyze + ["--predict", "--indicators", "all"]),
+            ("analyze --plot", analyze + ["--plot", os.path.join(directory, "plots")]),
+        ]
+        for name, command in scenarios:
+            elapsed, report = wall_time(command, directory, args.repeat)
+            print(f"{name:>30}: {elapsed * 1000:8.1f} ms  {' '.join(report)}")
@@ -0,0 +1,42 @@
+import os
+import sys
+import glob
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_ingest import parse_news_page, PARSE_MODES
+
+
+def time_mode(pages, mode, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for html in pages:
+            parse_news_page(html, mode)
+        best = min(best, time.perf_counter() - started)
+    return best / len(pages)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse time per saved Finviz page for each parsing mode")
+    parser.add_argument("directory", help="directory of saved quote pages (news_ingest.py --save)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(args.directory, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append(f.read())
+    if not pages:
+        sys.exit(f"No .html pages found in {args.directory}")
+
+    reference = [parse_news_page(html, "full") for html in pages]
+    baseline = None
+    print(f"{len(pages)} pages, {sum(len(html) for html in pages) / len(pages) / 1024:.0f} KiB average")
+    for mode in PARSE_MODES:
+        identical = all(parse_news_page(html, mode) == expected for html, expected in zip(pages, reference))
+        per_page = time_mode(pages, mode, args.repeat)
+        baseline = baseline or per_page
+        print(f"{mode:>9}: {per_page * 1000:8.2f} ms/page  {baseline / per_page:6.1f}x vs full  identical={identical}")
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quote_feed import QuoteFeed, StreamSource, replay_server, HOST
+from generators import record_quotes
+
+
+def publish_rate(tickers, seconds):
+    # the shared table alone: how many quotes per second it can take and fan out
+    feed = QuoteFeed()
+    received = [0]
+    for ticker in tickers:
+        feed.subscribe(ticker, lambda price: received.__setitem__(0, received[0] + 1))
+    prices = np.round(100 + np.cumsum(np.random.default_rng(1).normal(0, 0.05, 4096)), 2)
+    position = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        for _ in range(100):
+            feed.publish({ticker: prices[(position + number) % len(prices)] for number, ticker in enumerate(tickers)})
+            position += 1
+    elapsed = time.perf_counter() - started
+    return position * len(tickers) / elapsed, received[0] / elapsed
+
+
+def stream_rate(directory, tickers, seconds, rate):
+    with replay_server(directory, HOST, 0, rate) as server:
+        port = server.socket.getsockname()[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        feed = QuoteFeed()
+        received = [0]
+        for ticker in tickers:
+            feed.subscribe(ticker, lambda price: received.__setitem__(0, received[0] + 1))
+        source = StreamSource(f"ws://{HOST}:{port}")
+        feed.attach(source)
+        deadline = time.monotonic() + 5
+        while not feed.stats()['received'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        before, messages, delivered = feed.stats()['received'], source.messages, received[0]
+        started = time.perf_counter()
+        time.sleep(seconds)
+        elapsed = time.perf_counter() - started
+        stats = feed.stats()
+        result = ((source.messages - messages) / elapsed, (stats['received'] - before) / elapsed,
+                  (received[0] - delivered) / elapsed, len(feed.snapshot()))
+        feed.close()
+        server.shutdown()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sustained quote throughput through QuoteFeed and the local stream")
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--quotes", type=int, default=10000, help="recorded quotes per ticker, replayed in a loop")
+    parser.add_argument("--rate", type=float, default=0, help="stream messages per second, 0 for unthrottled")
+    args = parser.parse_args()
+
+    tickers = [f"T{number:04d}" for number in range(args.tickers)]
+    workdir = tempfile.mkdtemp()
+    try:
+        record_quotes(workdir, tickers, args.quotes)
+        quotes, deliveries = publish_rate(tickers, args.seconds)
+        print(f"QuoteFeed.publish: {quotes:,.0f} quotes/s, {deliveries:,.0f} subscriber calls/s ({args.tickers} tickers)")
+        messages, quotes, deliveries, seen = stream_rate(workdir, tickers, args.seconds, args.rate)
+        print(f"local stream: {messages:,.0f} messages/s, {quotes:,.0f} quotes/s, {deliveries:,.0f} subscriber calls/s, "
+              f"{seen}/{args.tickers} tickers in the table")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
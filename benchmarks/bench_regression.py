@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stocks
+import regression
+from generators import synthetic_ohlcv
+
+try:
+    from sklearn.linear_model import LinearRegression
+    from sklearn.preprocessing import PolynomialFeatures
+except ImportError:
+    LinearRegression = None
+
+
+def sklearn_trend(data, degree):
+    # the previous implementation: per-row toordinal and a fit on raw ordinals
+    data = data.dropna().reset_index()
+    data['Timestamp'] = data['Datetime'].map(lambda x: x.toordinal())
+    X = PolynomialFeatures(degree=degree).fit_transform(data[['Timestamp']])
+    return LinearRegression().fit(X, data['Close']).predict(X)
+
+
+def reference_trend(data, degree):
+    x = regression.ordinal_days(data.index)
+    t = (x - x.mean()) / np.ptp(x)
+    close = data['Close'].to_numpy()
+    return np.polynomial.polynomial.polyval(t, np.polynomial.polynomial.polyfit(t, close, degree))
+
+
+def best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regression trends: sklearn on raw ordinals vs the closed-form engine")
+    parser.add_argument("--bars", type=int, default=2000)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--degrees", default="1,3,10")
+    parser.add_argument("--ticks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = synthetic_ohlcv(args.bars)
+    data.index = pd.date_range("2022-01-03", periods=args.bars, freq="D", tz="America/New_York", name="Datetime")
+    for degree in [int(degree) for degree in args.degrees.split(",")]:
+        reference = reference_trend(data, degree)
+        engine = best_of(lambda: stocks.polynomial_regression_trend(data, degree), args.repeat)
+        error = np.abs(stocks.polynomial_regression_trend(data, degree)['Poly Trend'].to_numpy() - reference).max()
+        line = f"degree {degree:2d}: engine {engine * 1000:8.2f} ms  max error {error:.2e}"
+        if LinearRegression is not None:
+            legacy = best_of(lambda: sklearn_trend(data, degree), args.repeat)
+            legacy_error = np.abs(sklearn_trend(data, degree) - reference).max()
+            line += f"  | sklearn {legacy * 1000:8.2f} ms  max error {legacy_error:.2e}  {legacy / engine:6.1f}x"
+        print(line)
+
+    x = regression.ordinal_days(data.index)
+    close = data['Close'].to_numpy()
+    rng = np.random.default_rng(1)
+    series = [close * rng.uniform(0.5, 2.0) for _ in range(args.tickers)]
+    looped = best_of(lambda: [regression.fit(x, y, 3) for y in series], args.repeat)
+    shared = best_of(lambda: regression.fit(x, np.column_stack(series), 3), args.repeat)
+    batched = best_of(lambda: regression.fit_many([x] * len(series), series, 3), args.repeat)
+    print(f"{args.tickers} tickers, degree 3: loop {looped * 1000:.1f} ms  shared axis {shared * 1000:.1f} ms  "
+          f"batched {batched * 1000:.1f} ms")
+    nested = best_of(lambda: regression.fit(x, close, range(1, 11)), args.repeat)
+    print(f"degrees 1..10 from one QR: {nested * 1000:.2f} ms")
+
+    incremental = regression.IncrementalFit(3, x, close)
+    prices = close[-1] + rng.normal(0, 0.1, args.ticks)
+    started = time.perf_counter()
+    for price in prices:
+        incremental.revise(price)
+    revise = (time.perf_counter() - started) / args.ticks
+    started = time.perf_counter()
+    for step, price in enumerate(prices[:1000]):
+        incremental.update(x[-1] + 1 + step, price)
+    update = (time.perf_counter() - started) / 1000
+    print(f"live tick refit: revise {revise * 1e6:.1f} us  append bar {update * 1e6:.1f} us")
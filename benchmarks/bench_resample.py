@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bar_cache import BarCache, slice_bars
+from compact import CompactBars
+from market_sessions import MarketSessions
+from resample import Resampler, resample
+from generators import synthetic_ohlcv, session_index
+
+TICKER = "SYN"
+TARGETS = {"5m": "5min", "15m": "15min", "30m": "30min", "1h": "60min", "1d": "1D"}
+AGGREGATES = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def in_session(data, bounds):
+    opens, closes = (np.asarray(moments, dtype=np.int64) * 1000 for moments in bounds)
+    times = data.index.as_unit('ns').asi8
+    position = np.searchsorted(opens, times, 'right') - 1
+    return data[(position >= 0) & (times < closes[np.maximum(position, 0)])]
+
+
+def reference(data, interval):
+    # what pandas' label-based resample gives for regular NYSE sessions opening at 09:30
+    bins = data.resample(TARGETS[interval]) if interval == "1d" else \
+        data.resample(TARGETS[interval], origin="start_day", offset="9h30min")
+    return bins.agg(AGGREGATES).dropna(subset=['Close'])
+
+
+def best(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coarser bars resampled from cached 1m history vs pandas and refetching")
+    parser.add_argument("--days", type=int, default=250, help="sessions of 1m bars")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    count = args.days * 390
+    source = synthetic_ohlcv(count, 7, index=session_index(count, "2023-01-03"))
+    first, last = source.index[[0, -1]]
+    start, end = first.strftime('%Y-%m-%d'), (last + np.timedelta64(1, 'D')).strftime('%Y-%m-%d')
+    workdir = tempfile.mkdtemp()
+    try:
+        sessions = MarketSessions(os.path.join(workdir, "exchanges.json"))
+        sessions.exchanges[TICKER] = "NYQ"
+        bounds = sessions.session_bounds(TICKER, start, end)
+        regular = in_session(source, bounds)
+        print(f"{count} 1m bars, {len(source) - len(regular)} outside NYSE sessions (holidays, early closes)")
+        print(f"{'interval':<10}{'bars':>8}{'parity':>8}{'resample ms':>13}{'compact ms':>12}{'pandas ms':>11}")
+        compact = CompactBars.from_frame(source)
+        for interval in TARGETS:
+            result = resample(source, interval, bounds)
+            expected = reference(regular, interval)
+            same = result.index.equals(expected.index) and np.allclose(result.values, expected[result.columns].values)
+            ours = best(lambda: resample(source, interval, bounds), args.repeat)
+            small = best(lambda: resample(compact, interval, bounds), args.repeat)
+            theirs = best(lambda: reference(in_session(source, bounds), interval), args.repeat)
+            print(f"{interval:<10}{len(result):>8}{str(same):>8}{ours * 1000:>13.2f}{small * 1000:>12.2f}"
+                  f"{theirs * 1000:>11.2f}")
+
+        # switching intervals in the GUI: every coarser series comes from the one cached 1m history
+        fetched = []
+        def fetch(ticker, interval, fetch_start, fetch_end):
+            fetched.append(interval)
+            return slice_bars(source, fetch_start, fetch_end).copy()
+        resampler = Resampler(BarCache(fetch, os.path.join(workdir, "bars")), sessions)
+        resampler.get(TICKER, "1m", start, end)
+        started = time.perf_counter()
+        for interval in TARGETS:
+            resampler.get(TICKER, interval, start, end)
+        derived = time.perf_counter() - started
+        started = time.perf_counter()
+        for interval in TARGETS:
+            resampler.get(TICKER, interval, start, end)
+        reused = time.perf_counter() - started
+        print(f"downloads: {fetched}; {len(TARGETS)} intervals derived in {derived * 1000:.1f} ms, "
+              f"memoized in {reused * 1000:.1f} ms; {resampler.stats()}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
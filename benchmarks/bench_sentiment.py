@@ -0,0 +1,84 @@
+import os
+import sys
+import glob
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment import TextBlobBackend, LexiconBackend, load_lexicon
+from news_ingest import parse_news_page
+from generators import headline_corpus
+
+# scored on every run, whatever the corpus
+PUNCTUATION_CASES = ["really good/bad", "Good—bad—ugly", "Not bad… really good", "Investors' great week",
+                     "Shares soar!!! :)", "U.S. stocks great. O.K.?", "Terrible “good” news", "Good news\n\nbad news",
+                     "It's not a good/great day", "(!) great quarter", "Bad o . O results", "Great > . > bad"]
+NEGATION_WORDS = ["not", "no", "never"]
+
+
+def lexicon_headlines(count, seed=0):
+    # negations and modifiers are a small part of the lexicon but drive most of the scoring rules
+    words, polarity, intensity, modifier = load_lexicon()
+    modifiers = [word for word, is_modifier in zip(words, modifier) if is_modifier]
+    return headline_corpus(count, seed, words + modifiers * (len(words) // (2 * len(modifiers)))
+                           + NEGATION_WORDS * (len(words) // 8))
+
+
+def page_headlines(directory):
+    headlines = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            headlines += [item["title"] for item in parse_news_page(f.read())]
+    return headlines
+
+
+def time_backend(backend, headlines, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        backend.score(headlines)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parity and throughput of the lexicon sentiment backend against TextBlob")
+    parser.add_argument("--file", help="text file with one headline per line")
+    parser.add_argument("--pages", help="directory of saved quote pages (news_ingest.py --save)")
+    parser.add_argument("--count", type=int, default=20000, help="synthetic headlines when no corpus is given")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    headlines = []
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            headlines += [line.strip() for line in f if line.strip()]
+    if args.pages:
+        headlines += page_headlines(args.pages)
+    if not headlines:
+        headlines = lexicon_headlines(args.count)
+    headlines += PUNCTUATION_CASES
+
+    reference, lexicon = TextBlobBackend(), LexiconBackend()
+    expected = np.array(reference.score(headlines))
+    actual = np.array(lexicon.score(headlines))
+    error = np.abs(actual - expected)
+    print(f"{len(headlines)} headlines")
+    print(f"parity: exact={np.mean(error <= args.tolerance):.2%}  mae={error.mean():.2e}  max={error.max():.2e}  "
+          f"sign agreement={np.mean(np.sign(actual) == np.sign(expected)):.2%}")
+    for index in np.argsort(-error)[:5]:
+        if error[index] > args.tolerance:
+            print(f"  {expected[index]:+.3f} vs {actual[index]:+.3f}  {headlines[index]}")
+    mismatched = int(np.sum(error > args.tolerance))
+
+    baseline = None
+    for backend in (reference, lexicon):
+        seconds = time_backend(backend, headlines, args.repeat)
+        baseline = baseline or seconds
+        print(f"{backend.name:>9}: {len(headlines) / seconds:12,.0f} headlines/s  {baseline / seconds:6.1f}x vs textblob")
+    if mismatched:
+        print(f"{mismatched} headlines score differently from TextBlob")
+        sys.exit(1)
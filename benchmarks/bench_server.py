@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import providers
+import server
+from generators import record_synthetic
+
+
+async def client(host, port, targets, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    for target in targets:
+        started = time.perf_counter()
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+        await writer.drain()
+        status = await reader.readline()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if not line.strip():
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        body = await reader.readexactly(length)
+        latencies.append(time.perf_counter() - started)
+        if b" 200 " not in status:
+            print(f"{target}: {status.decode().strip()} {body[:200]}")
+    writer.close()
+
+
+async def run(args, tickers, interval):
+    analysis = server.AnalysisServer(args.workers)
+    listener = await asyncio.start_server(analysis.handle, server.HOST, 0)
+    port = listener.sockets[0].getsockname()[1]
+    paths = args.paths.split(",")
+    targets = [f"{paths[i % len(paths)]}?ticker={tickers[i % len(tickers)]}&interval={interval}&days={args.days}&tail=50"
+               for i in range(args.requests)]
+    latencies = []
+    started = time.perf_counter()
+    per_client = [targets[i::args.clients] for i in range(args.clients)]
+    await asyncio.gather(*(client(server.HOST, port, chunk, latencies) for chunk in per_client))
+    elapsed = time.perf_counter() - started
+    listener.close()
+    analysis.close()
+    values = np.array(latencies) * 1000
+    print(f"{len(values)} requests from {args.clients} clients in {elapsed:.2f} s ({len(values) / elapsed:.0f} req/s)")
+    print(f"client p50={np.percentile(values, 50):.2f} ms  p99={np.percentile(values, 99):.2f} ms")
+    analysis.print_report()
+    print(json.dumps((await analysis.stats())["latency_ms"], indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the analysis server against synthetic replay bars")
+    parser.add_argument("--tickers", type=int, default=20)
+    parser.add_argument("--bars", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=400)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=server.WORKERS)
+    parser.add_argument("--paths", default="/indicators,/regression")
+    args = parser.parse_args()
+
+    tickers = [f"T{i:03d}" for i in range(args.tickers)]
+    with tempfile.TemporaryDirectory() as directory:
+        record_synthetic(directory, tickers, "1h", args.bars)
+        providers.set_provider(providers.ReplayProvider(directory))
+        os.chdir(directory)
+        asyncio.run(run(args, tickers, "1h"))
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+import pytz
+import pandas_market_calendars as mcal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from market_sessions import MarketSessions, CALENDAR_CODES
+
+
+def schedule_per_call(exchange, moment):
+    cal = mcal.get_calendar(CALENDAR_CODES[exchange])
+    today = moment.strftime('%Y-%m-%d')
+    sched = cal.schedule(start_date=today, end_date=today)
+    if sched.empty:
+        return False
+    return sched.iloc[0]['market_open'] <= moment <= sched.iloc[0]['market_close']
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Market-open checks: per-call calendar schedule vs precomputed sessions")
+    parser.add_argument("--exchange", default="NMS", choices=sorted(CALENDAR_CODES))
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--legacy-calls", type=int, default=50)
+    args = parser.parse_args()
+
+    start = datetime(datetime.now().year, 1, 5, tzinfo=pytz.utc)
+    step = timedelta(days=360) / args.calls
+    moments = [start + step * i for i in range(args.calls)]
+    with tempfile.TemporaryDirectory() as directory:
+        sessions = MarketSessions(os.path.join(directory, "exchanges.json"))
+        sessions.exchanges["BENCH"] = args.exchange
+        started = time.perf_counter()
+        sessions.is_open("BENCH", moments[0])
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for moment in moments:
+            sessions.is_open("BENCH", moment)
+        indexed = (time.perf_counter() - started) / len(moments)
+
+        legacy_moments = moments[::max(1, len(moments) // args.legacy_calls)][:args.legacy_calls]
+        mismatches = sum(schedule_per_call(args.exchange, moment) != sessions.is_open("BENCH", moment)
+                         for moment in legacy_moments)
+        started = time.perf_counter()
+        for moment in legacy_moments:
+            schedule_per_call(args.exchange, moment)
+        legacy = (time.perf_counter() - started) / len(legacy_moments)
+
+    print(f"year of sessions built in {build * 1000:.1f} ms")
+    print(f"schedule per call: {legacy * 1e6:10.1f} us/check")
+    print(f"  interval index: {indexed * 1e6:10.2f} us/check  {legacy / indexed:8.0f}x  mismatches={mismatches}")
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import ta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streaming import StreamingIndicators
+from generators import synthetic_ohlcv
+
+
+def reference(close):
+    # the batch indicators stocks.py took from ta before the streaming engine
+    bollinger = ta.volatility.BollingerBands(close)
+    macd = ta.trend.MACD(close)
+    return pd.DataFrame({
+        '20-day MA': close.rolling(20).mean(),
+        '50-day MA': close.rolling(50).mean(),
+        'Middle Band': bollinger.bollinger_mavg(),
+        '20-day STD': close.rolling(20).std(ddof=0),
+        'Upper Band': bollinger.bollinger_hband(),
+        'Lower Band': bollinger.bollinger_lband(),
+        'RSI': ta.momentum.RSIIndicator(close).rsi(),
+        'MACD': macd.macd(),
+        'MACD Signal': macd.macd_signal(),
+    }, index=close.index)
+
+
+def streamed(close, revisions, seed=0):
+    # each bar opens on a provisional tick and is revised a few times before it settles on its close
+    rng = np.random.default_rng(seed)
+    ticks = close.to_numpy()[:, None] * (1 + rng.normal(0, 0.002, (len(close), revisions + 1)))
+    stream = StreamingIndicators()
+    rows = []
+    started = time.perf_counter()
+    for value, provisional in zip(close.to_numpy(), ticks):
+        stream.update(float(provisional[0]))
+        for tick in provisional[1:]:
+            stream.revise(float(tick))
+        rows.append(stream.revise(float(value)))
+    elapsed = time.perf_counter() - started
+    return pd.DataFrame(rows, index=close.index), elapsed / (len(close) * (revisions + 2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming indicators against batch ta, with revised last bars")
+    parser.add_argument("--bars", type=int, default=20000)
+    parser.add_argument("--revisions", type=int, default=3, help="provisional ticks revised on every bar")
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1e-8)
+    args = parser.parse_args()
+
+    mismatched = 0
+    for seed in range(args.seeds):
+        close = synthetic_ohlcv(args.bars, seed)['Close']
+        started = time.perf_counter()
+        expected = reference(close)
+        batch = time.perf_counter() - started
+        actual, per_call = streamed(close, args.revisions, seed)
+        for name in expected:
+            want, got = expected[name].to_numpy(), actual[name].to_numpy()
+            gaps = np.isnan(want) != np.isnan(got)
+            error = np.nanmax(np.abs(got - want)) if not np.isnan(want).all() else 0.0
+            bad = int(gaps.sum()) + int(np.sum(np.abs(got - want) > args.tolerance))
+            mismatched += bad
+            if bad:
+                print(f"  seed {seed} {name}: {bad} bars off, max error {error:.2e}")
+        error = np.nanmax(np.abs(actual[expected.columns].to_numpy() - expected.to_numpy()))
+        print(f"seed {seed}: {args.bars} bars, max error {error:.2e}, {per_call * 1e6:.1f} us per update/revise, "
+              f"batch ta {batch * 1e3:.1f} ms per full recompute")
+    if mismatched:
+        print(f"{mismatched} values differ from ta by more than {args.tolerance:g}")
+        sys.exit(1)
@@ -0,0 +1,222 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import warnings
+import tracemalloc
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stocks
+import indicators
+import backtest
+import providers
+from news_cache import HeadlineCache
+from chart_renderer import ChartRenderer
+from generators import synthetic_universe, news_items
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+INTERVAL = "1m"
+SUFFIXES = {"k": 1000, "m": 1000000}
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    if text[-1:] in SUFFIXES:
+        return int(float(text[:-1]) * SUFFIXES[text[-1]])
+    return int(text)
+
+
+def render(fig):
+    FigureCanvasAgg(fig).draw()
+
+
+def candles(data):
+    canvas = FigureCanvasAgg(Figure(figsize=(10, 5), dpi=100))
+    ChartRenderer(canvas, canvas.figure.add_subplot(111)).candles(data, "bench")
+    canvas.draw()
+
+
+def with_columns(data):
+    data = data.copy()
+    indicators.compute(data).apply(data)
+    return data
+
+
+def seed_news(context, tickers):
+    stocks.headline_cache.get_many(tickers, lambda missing: {ticker: context['news'][ticker] for ticker in missing})
+
+
+def end_to_end(ticker, data, context):
+    # bars through the replay provider, headlines through a seeded HeadlineCache: the Process click minus Tk
+    seed_news(context, [ticker])
+    return lambda: stocks.predict_stock_movement(
+        stocks.fetch_stock_data(ticker, context['start'], context['end'], INTERVAL, verbose=False), ticker)
+
+
+def sentiment_cold(ticker, data, context):
+    stocks.headline_cache.clear()
+    return lambda: stocks.get_headlines_sentiment(ticker, context['news'][ticker])
+
+
+def sentiment_cached(ticker, data, context):
+    stocks.get_headlines_sentiment(ticker, context['news'][ticker])
+    return lambda: stocks.get_headlines_sentiment(ticker, context['news'][ticker])
+
+
+def copied(func):
+    return lambda ticker, data, context: lambda frame=data.copy(): func(frame)
+
+
+def charted(func):
+    return lambda ticker, data, context: lambda frame=with_columns(data): func(frame, ticker)
+
+
+# name -> (prepare, largest bar count it runs at, None for no limit or "fixed" when it does not depend on the bars).
+# prepare(ticker, data, context) does the untimed setup and returns the call to time
+CASES = {
+    "moving_averages": (copied(stocks.moving_averages), None),
+    "bollinger_bands": (copied(stocks.bollinger_bands), None),
+    "rsi": (copied(stocks.rsi), None),
+    "macd": (copied(stocks.macd), None),
+    "indicator_frame": (lambda ticker, data, context: lambda: indicators.IndicatorFrame(data), None),
+    "linear_regression": (lambda ticker, data, context: lambda: stocks.linear_regression_trend(data), None),
+    "polynomial_regression": (lambda ticker, data, context: lambda: stocks.polynomial_regression_trend(data, 3),
+                              None),
+    "predict_stock_movement": (lambda ticker, data, context: lambda frame=data.copy(): stocks.predict_stock_movement(
+        frame, ticker, context['news'][ticker]), None),
+    "score_series": (lambda ticker, data, context: lambda: backtest.score_series(data), None),
+    "end_to_end": (end_to_end, None),
+    "sentiment_cold": (sentiment_cold, "fixed"),
+    "sentiment_cached": (sentiment_cached, "fixed"),
+    "plot_projection": (charted(lambda frame, ticker: render(stocks.plot_projection(frame, ticker, return_fig=True))),
+                        1000000),
+    "chart_candles": (lambda ticker, data, context: lambda: candles(data), 1000000),
+    "showRSI": (charted(stocks.showRSI), 1000000),
+    "showMACD": (charted(stocks.showMACD), 10000),
+    "showboll": (charted(stocks.showboll), 10000),
+}
+
+
+def run_case(prepare, frames, context, repeat, memory):
+    # per_ticker is what baselines compare, so runs with different universe sizes stay comparable
+    timings = []
+    for _ in range(repeat):
+        calls = [prepare(ticker, data, context) for ticker, data in frames.items()]
+        started = time.perf_counter()
+        for call in calls:
+            call()
+        timings.append(time.perf_counter() - started)
+    peak = None
+    if memory:
+        calls = [prepare(ticker, data, context) for ticker, data in frames.items()]
+        tracemalloc.start()
+        for call in calls:
+            call()
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    plt.close('all')
+    return {'best': min(timings), 'median': float(np.median(timings)), 'per_ticker': min(timings) / len(frames),
+            'peak_mb': peak}
+
+
+def load_baseline(path):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(path, results, args):
+    with open(path, "w") as f:
+        json.dump({"machine": platform.platform(), "python": platform.python_version(),
+                   "tickers": args.tickers, "headlines": args.headlines, "repeat": args.repeat,
+                   "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks of every stocks.py stage on synthetic bars")
+    parser.add_argument("--sizes", default="1k,10k,100k,1M", help="bar counts per ticker, e.g. 1k,10k,100k,1M,10M")
+    parser.add_argument("--tickers", type=int, default=1)
+    parser.add_argument("--headlines", type=int, default=100, help="headlines per ticker")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cases", help=f"comma list of {', '.join(CASES)}")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="compare against this baseline file")
+    parser.add_argument("--save", nargs="?", const=BASELINE_PATH, help="store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    parser.add_argument("--json", help="write the results of this run to a file")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.cases.split(",")] if args.cases else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    # tight_layout and empty-legend chatter from the pyplot chart functions
+    warnings.filterwarnings("ignore", category=UserWarning)
+    baseline = load_baseline(args.baseline)
+    workdir = tempfile.mkdtemp()
+    stocks.headline_cache = HeadlineCache(os.path.join(workdir, "news_cache.db"))
+    results = {}
+    regressions = []
+    print(f"{'case':<24}{'bars':>10}{'best ms':>12}{'median ms':>12}{'per ticker':>12}{'Mbars/s':>9}"
+          f"{'peak MB':>9}{'vs base':>9}")
+    try:
+        fixed_done = set()
+        for size in sizes:
+            frames = synthetic_universe(args.tickers, size)
+            news = {ticker: news_items(ticker, args.headlines, seed) for seed, ticker in enumerate(frames)}
+            replay = os.path.join(workdir, f"replay_{size}")
+            os.makedirs(replay)
+            for ticker, data in frames.items():
+                data.to_parquet(os.path.join(replay, f"{ticker}_{INTERVAL}.parquet"))
+            providers.set_provider(providers.ReplayProvider(replay))
+            first, last = next(iter(frames.values())).index[[0, -1]]
+            context = {'news': news, 'start': first.strftime('%Y-%m-%d'),
+                       'end': (last + np.timedelta64(1, 'D')).strftime('%Y-%m-%d')}
+            for name in names:
+                prepare, limit = CASES[name]
+                if limit == "fixed":
+                    if name in fixed_done:
+                        continue
+                    fixed_done.add(name)
+                elif limit is not None and size > limit:
+                    continue
+                result = run_case(prepare, frames, context, args.repeat, not args.no_memory)
+                key = f"{name}@{size}" if limit != "fixed" else f"{name}@{args.headlines}h"
+                results[key] = result
+                before = baseline.get(key)
+                ratio = result['per_ticker'] / before['per_ticker'] if before and before.get('per_ticker') else None
+                if ratio is not None and ratio > args.threshold:
+                    regressions.append((key, ratio))
+                throughput = size * args.tickers / result['best'] / 1e6 if limit != "fixed" else float('nan')
+                peak = f"{result['peak_mb']:.1f}" if result['peak_mb'] is not None else "-"
+                print(f"{name:<24}{size if limit != 'fixed' else '-':>10}{result['best'] * 1000:>12.2f}"
+                      f"{result['median'] * 1000:>12.2f}{result['per_ticker'] * 1000:>12.2f}"
+                      f"{throughput:>9.2f}{peak:>9}{f'{ratio:.2f}x' if ratio is not None else '-':>9}")
+            shutil.rmtree(replay, ignore_errors=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save:
+        save_baseline(args.save, {**baseline, **results}, args)
+        print(f"baseline saved to {args.save}")
+    if regressions:
+        print(f"{len(regressions)} cases slower than {args.threshold:.2f}x the baseline:")
+        for key, ratio in sorted(regressions, key=lambda item: -item[1]):
+            print(f"  {key}: {ratio:.2f}x")
+        sys.exit(1)
@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stocks
+import indicators
+import backtest
+import sweep
+from generators import synthetic_ohlcv
+
+
+def naive(data, combo, weights):
+    # one combination from scratch: recompute every indicator, then a pandas backtest
+    rsi, fast, slow, signal, boll_window, boll_dev = combo
+    close = indicators.close_series(data)
+    mean, std = indicators.rolling_stats(close, boll_window)
+    macd, macd_signal = indicators.macd_lines(close, fast, slow, signal)
+    rsi_norm, macd_norm, bollinger_norm = stocks.indicator_norms(
+        indicators.wilder_rsi(close, rsi), macd, macd_signal, close, mean, mean + boll_dev * std, mean - boll_dev * std)
+    score = stocks.total_score(rsi_norm, macd_norm, 0.0, (weights[0], weights[1], 0.0, weights[2]), bollinger_norm)
+    valid = score.notna() & close.rolling(sweep.TREND_WINDOW).mean().notna()
+    return backtest.summarize(backtest.simulate(close, score.where(valid)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parameter sweep: shared components vs recomputing every combination")
+    parser.add_argument("--bars", type=int, default=5000)
+    parser.add_argument("--naive", type=int, default=100, help="combinations timed the naive way")
+    parser.add_argument("--tickers", type=int, default=8)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    params, weights = sweep.make_grid(rsi=(7, 14, 21), macd=((12, 26, 9), (8, 17, 9), (5, 35, 5)),
+                                      bollinger=((20, 2), (20, 2.5), (10, 2)), weight_steps=(0, 0.25, 0.5, 0.75, 1))
+    total = len(params) * len(weights)
+    data = synthetic_ohlcv(args.bars)
+    directory = tempfile.mkdtemp()
+    try:
+        started = time.perf_counter()
+        cold = sweep.sweep(data, params, weights, cache_dir=directory)
+        cold_time = time.perf_counter() - started
+        started = time.perf_counter()
+        sweep.sweep(data, params, weights, cache_dir=directory)
+        warm_time = time.perf_counter() - started
+
+        combos = [(combo, w) for combo in params for w in weights][:args.naive]
+        started = time.perf_counter()
+        checks = [naive(data, combo, w) for combo, w in combos]
+        naive_time = (time.perf_counter() - started) / len(combos) * total
+        mismatch = max(abs(check['Sharpe'] - cold['Sharpe'].iloc[i]) for i, check in enumerate(checks))
+        print(f"{total} combinations on {args.bars} bars: shared {cold_time:.2f} s, cached rerun {warm_time:.2f} s, "
+              f"naive ~{naive_time:.1f} s ({naive_time / cold_time:.0f}x), max Sharpe difference {mismatch:.1e}")
+
+        frames = {}
+        for seed in range(args.tickers):
+            frames[f"T{seed:03d}"] = synthetic_ohlcv(args.bars, seed)
+        shutil.rmtree(directory)
+        started = time.perf_counter()
+        results = sweep.sweep_many(frames, params, weights, args.workers, cache_dir=directory)
+        print(f"{args.tickers} tickers x {total} combinations across the pool: {time.perf_counter() - started:.2f} s")
+        print(sweep.rank(results, top=5).to_string(index=False))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,105 @@
+import os
+import sys
+import random
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_ingest import news_item
+
+START = "2000-01-03 09:30"
+SUBJECTS = ["Apple", "Microsoft", "Nvidia", "Tesla", "Amazon", "the Fed", "Treasury yields", "chipmakers", "banks",
+            "oil prices", "the CEO", "analysts", "regulators", "investors", "the board"]
+VERBS = ["beats", "misses", "raises", "cuts", "slashes", "boosts", "warns on", "reaffirms", "delays", "expands",
+         "surges past", "falls short of", "upgrades", "downgrades", "halts"]
+OBJECTS = ["quarterly earnings", "full-year guidance", "revenue estimates", "its dividend", "buyback plans",
+           "price targets", "AI spending", "holiday demand", "margins", "the outlook", "production targets",
+           "job cuts", "a merger", "supply concerns", "rate-cut hopes"]
+TONES = ["", "", "", "amid strong demand", "on weak sales", "in a stunning reversal", "despite record profit",
+         "as losses mount", "after a great quarter", "on disappointing results", "to the delight of investors",
+         "in a terrible week", "with solid growth", "as fears grow", "(Reuters)"]
+# noise mixed between vocabulary words: contractions, abbreviations, emoticons and the punctuation that tokenizers
+# split differently
+FILLERS = ["shares", "stock", "the", "a", "of", "to", "in", "as", "Q3", "earnings", "Fed", "AI", "U.S.", "5.5%", "$1,000",
+           "is", "be", "after", "CEO", "says", ",", ":", "-", "(Reuters)", "'s", "don't", "isn't", "can't", "!",
+           "...", "....", "?!...", "/", "—", "…", "'", "investors'", "“good”", "U.S.-China", "Mr.", ":)",
+           ": (", "(!)", "XD", "o.O"]
+ELLIPSES = ["...", "....", "..", "!...", "…", "'", "’"]
+# words are usually joined by a space, sometimes by the slashes and dashes that stay inside one token
+JOINERS = [" "] * 17 + ["/", "—", "-"]
+
+
+def session_index(count, start=START, minutes=390):
+    # regular-session minute stamps on business days, 09:30 onwards, the shape of multi-year 1m history
+    days = pd.bdate_range(pd.Timestamp(start).normalize(), periods=-(-count // minutes))
+    opens = days.values.astype("datetime64[ns]") + np.timedelta64(9 * 60 + 30, "m")
+    stamps = (opens[:, None] + np.arange(minutes).astype("timedelta64[m]")).ravel()[:count]
+    return pd.DatetimeIndex(stamps, name="Datetime").tz_localize("America/New_York")
+
+
+def synthetic_ohlcv(count, seed=0, freq="min", start=START, index=None):
+    # a deterministic geometric random walk; minute bars so even 10M bars stay inside the pandas date range
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, count)))
+    opens = np.empty(count)
+    opens[0] = close[0]
+    opens[1:] = close[:-1]
+    spread = np.abs(rng.normal(0, 0.001, count)) * close
+    if index is None:
+        index = pd.date_range(start, periods=count, freq=freq, tz="America/New_York", name="Datetime")
+    return pd.DataFrame({'Open': opens, 'High': np.maximum(opens, close) + spread,
+                         'Low': np.minimum(opens, close) - spread, 'Close': close,
+                         'Volume': rng.integers(1000, 100000, count).astype(float)}, index=index)
+
+
+def synthetic_universe(tickers, count, seed=0, freq="min"):
+    return {f"T{number:04d}": synthetic_ohlcv(count, seed + number, freq) for number in range(tickers)}
+
+
+def headline_corpus(count, seed=0, words=None):
+    # templated headlines, or with a vocabulary (e.g. a sentiment lexicon) a noisy mix of its words and FILLERS
+    rng = random.Random(seed)
+    headlines = []
+    for _ in range(count):
+        if words:
+            parts = []
+            for _ in range(rng.randint(6, 14)):
+                parts.append(rng.choice(words) if rng.random() < 0.37 else rng.choice(FILLERS))
+                if rng.random() < 0.05:
+                    parts[-1] += rng.choice(ELLIPSES)
+                parts.append(rng.choice(JOINERS))
+            headlines.append("".join(parts[:-1]))
+            continue
+        tone = rng.choice(TONES)
+        headline = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+        headlines.append(f"{headline} {tone}".strip())
+    return [headline[0].upper() + headline[1:] for headline in headlines]
+
+
+def record_synthetic(directory, tickers, interval, count, freq="h"):
+    # replay-provider bars ({ticker}_{interval}.parquet) ending at the current period, so recent ranges hit them
+    end = pd.Timestamp.now(tz="America/New_York").floor(freq)
+    index = pd.date_range(end=end, periods=count, freq=freq, name="Datetime")
+    for seed, ticker in enumerate(tickers):
+        synthetic_ohlcv(count, seed, index=index).to_parquet(os.path.join(directory, f"{ticker}_{interval}.parquet"))
+
+
+def record_quotes(directory, tickers, count, seed=0):
+    # a tick-level random walk per ticker, in the replay provider's {ticker}_quotes layout
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-02 14:30", periods=count, freq="100ms", tz="UTC", name="Datetime")
+    for ticker in tickers:
+        prices = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.0005, count))), 2)
+        pd.DataFrame({'Price': prices}, index=index).to_parquet(os.path.join(directory, f"{ticker}_quotes.parquet"))
+
+
+def news_items(ticker, count, seed=0):
+    # what HeadlineCache.get_news returns for a ticker: newest first, one headline per item
+    stamp = pd.Timestamp("2024-01-02 16:00")
+    items = []
+    for number, title in enumerate(headline_corpus(count, seed)):
+        when = stamp - pd.Timedelta(minutes=37 * number)
+        items.append(news_item(when.strftime("%b-%d-%y %I:%M%p"), title,
+                               f"https://example.com/{ticker.lower()}/{seed}/{number}"))
+    return items
@@ -0,0 +1,281 @@
+import numpy as np
+import pandas as pd
+import matplotlib.dates as mdates
+from matplotlib.collections import PolyCollection, LineCollection
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+from compact import CompactBars
+
+BODY_WIDTH = 0.6
+COLOR_UP = 'green'
+COLOR_DOWN = 'red'
+TICK_COUNT = 10
+Y_MARGIN = 0.05
+
+
+def pixel_columns(ax):
+    return max(int(ax.get_window_extent().width), 1)
+
+
+def bucket_size(count, columns):
+    return max(1, -(-count // columns))
+
+
+def bucket_rows(values, size):
+    padded = np.full(-(-len(values) // size) * size, np.nan)
+    padded[:len(values)] = values
+    return padded.reshape(-1, size)
+
+
+def aggregate_ohlc(ohlc, size):
+    count = len(ohlc)
+    if size == 1:
+        return np.arange(count, dtype=float), ohlc
+    starts = np.arange(0, count, size)
+    lengths = np.minimum(size, count - starts)
+    rows = np.arange(len(starts))
+    bars = np.column_stack([
+        ohlc[starts, 0],
+        np.nanmax(bucket_rows(ohlc[:, 1], size), axis=1),
+        np.nanmin(bucket_rows(ohlc[:, 2], size), axis=1),
+        bucket_rows(ohlc[:, 3], size)[rows, lengths - 1],
+    ])
+    return starts + (lengths - 1) / 2, bars
+
+
+def downsample_line(x, y, columns):
+    # keep the min and max of every pixel column, in time order, so the envelope survives
+    size = bucket_size(len(y), columns)
+    if size <= 2:
+        return x, y
+    rows = bucket_rows(y, size)
+    missing = np.isnan(rows)
+    low = np.argmin(np.where(missing, np.inf, rows), axis=1)
+    high = np.argmax(np.where(missing, -np.inf, rows), axis=1)
+    starts = np.arange(0, len(y), size)
+    index = np.column_stack([starts + np.minimum(low, high), starts + np.maximum(low, high)])
+    index = index[~missing.all(axis=1)].ravel()
+    return x[index], y[index]
+
+
+def downsample_bars(x, heights, columns):
+    size = bucket_size(len(heights), columns)
+    if size == 1:
+        return x, heights, 1
+    rows = bucket_rows(heights, size)
+    peak = np.argmax(np.where(np.isnan(rows), -np.inf, np.abs(rows)), axis=1)
+    index = np.minimum(np.arange(0, len(heights), size) + peak, len(heights) - 1)
+    return x[index], heights[index], size
+
+
+def candle_geometry(x, bars, width):
+    opens, highs, lows, closes = bars.T
+    left, right = x - width / 2, x + width / 2
+    bottom, top = np.minimum(opens, closes), np.maximum(opens, closes)
+    bodies = np.stack([np.column_stack([left, bottom]), np.column_stack([left, top]),
+                       np.column_stack([right, top]), np.column_stack([right, bottom])], axis=1)
+    wicks = np.stack([np.column_stack([x, lows]), np.column_stack([x, highs])], axis=1)
+    colors = np.where(closes >= opens, COLOR_UP, COLOR_DOWN)
+    return bodies, wicks, colors
+
+
+def bar_geometry(x, heights, width):
+    left, right = x - width / 2, x + width / 2
+    zero = np.zeros_like(heights)
+    return np.stack([np.column_stack([left, zero]), np.column_stack([left, heights]),
+                     np.column_stack([right, heights]), np.column_stack([right, zero])], axis=1)
+
+
+def x_values(x):
+    if isinstance(x, (pd.DatetimeIndex, pd.Series)) and pd.api.types.is_datetime64_any_dtype(x):
+        index = pd.DatetimeIndex(x)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        return mdates.date2num(index.to_numpy()), True
+    return np.asarray(x, dtype=float), False
+
+
+def padded_limits(low, high):
+    if not np.isfinite(low) or not np.isfinite(high):
+        return None
+    margin = (high - low) * Y_MARGIN or abs(high) * Y_MARGIN or 1.0
+    return low - margin, high + margin
+
+
+class ChartRenderer:
+    def __init__(self, canvas, ax):
+        self.canvas = canvas
+        self.ax = ax
+        self.layout = None
+        self.artists = {}
+        self.animated = []
+        self.background = None
+        self.view = None
+        self.ohlc = None
+        self.dates = None
+        self.size = 1
+        self.full_draws = 0
+        self.blits = 0
+        canvas.mpl_connect("draw_event", self._on_draw)
+        canvas.mpl_connect("resize_event", self._on_resize)
+
+    def _prepare(self, layout):
+        if layout == self.layout:
+            return False
+        self.ax.clear()
+        self.artists = {}
+        self.animated = []
+        self.layout = layout
+        return True
+
+    def _draw(self):
+        self.full_draws += 1
+        self.canvas.draw()
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        for artist in self.animated:
+            self.ax.draw_artist(artist)
+
+    def _on_resize(self, event):
+        if self.view is not None:
+            self.view()
+
+    def _collection(self, key, factory, animated=False):
+        artist = self.artists.get(key)
+        if artist is None:
+            artist = factory()
+            artist.set_animated(animated)
+            self.ax.add_collection(artist)
+            self.artists[key] = artist
+            if animated:
+                self.animated.append(artist)
+        return artist
+
+    def _set_candles(self, key, x, bars, animated=False):
+        bodies, wicks, colors = candle_geometry(x, bars, BODY_WIDTH * self.size)
+        body = self._collection((key, "bodies"), lambda: PolyCollection([], linewidths=0.5), animated)
+        wick = self._collection((key, "wicks"), lambda: LineCollection([], linewidths=1), animated)
+        body.set_verts(bodies)
+        body.set_facecolor(colors)
+        body.set_edgecolor(colors)
+        wick.set_segments(wicks)
+        wick.set_color(colors)
+
+    def candles(self, data, title):
+        if isinstance(data, CompactBars):
+            ohlc = data.ohlc()
+            valid = ~np.isnan(ohlc).any(axis=1)
+            self.ohlc = ohlc[valid]
+            self.dates = data.index[valid]
+        else:
+            ohlc = data[['Open', 'High', 'Low', 'Close']].dropna()
+            self.ohlc = np.array(ohlc.to_numpy(dtype=float))
+            self.dates = ohlc.index
+        self.view = lambda: self._render_candles(title)
+        self._render_candles(title)
+
+    def _render_candles(self, title):
+        rebuilt = self._prepare("candles")
+        count = len(self.ohlc)
+        self.size = bucket_size(count, pixel_columns(self.ax))
+        x, bars = aggregate_ohlc(self.ohlc, self.size)
+        self._set_candles("history", x[:-1], bars[:-1])
+        self._set_candles("last", x[-1:], bars[-1:], animated=True)
+
+        step = max(count // TICK_COUNT, 1)
+        ticks = np.arange(0, count, step)
+        self.ax.set_xticks(ticks)
+        self.ax.set_xticklabels(self.dates[ticks].strftime('%Y-%m-%d'), rotation=45, ha='right')
+        self.ax.set_xlim(-1, count)
+        self.ax.set_ylim(padded_limits(np.nanmin(self.ohlc[:, 2]), np.nanmax(self.ohlc[:, 1])))
+        if rebuilt:
+            self.ax.grid(True)
+            self.ax.set_xlabel('Date')
+            self.ax.set_ylabel('Price')
+        self.ax.set_title(title)
+        self._draw()
+
+    def tick(self, price, new_bar=False):
+        if self.layout != "candles" or self.ohlc is None or not len(self.ohlc):
+            return False
+        if new_bar:
+            self.ohlc = np.vstack([self.ohlc, [price, price, price, price]])
+            self.dates = self.dates.append(self.dates[-1:])
+            self.view()
+            return True
+        last = self.ohlc[-1]
+        last[1], last[2], last[3] = max(last[1], price), min(last[2], price), price
+        start = (len(self.ohlc) - 1) // self.size * self.size
+        x, bars = aggregate_ohlc(self.ohlc[start:], len(self.ohlc) - start)
+        self._set_candles("last", x + start, bars, animated=True)
+        low, high = self.ax.get_ylim()
+        if self.background is None or not low <= price <= high:
+            self.ax.set_ylim(padded_limits(np.nanmin(self.ohlc[:, 2]), np.nanmax(self.ohlc[:, 1])))
+            self._draw()
+            return True
+        self.canvas.restore_region(self.background)
+        for artist in self.animated:
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.ax.bbox)
+        self.blits += 1
+        return True
+
+    def lines(self, title, series, hlines=(), bars=None, ylim=None, xlabel=None, ylabel=None, legend=True):
+        self.view = lambda: self._render_lines(title, series, hlines, bars, ylim, xlabel, ylabel, legend)
+        self._render_lines(title, series, hlines, bars, ylim, xlabel, ylabel, legend)
+
+    def _render_lines(self, title, series, hlines, bars, ylim, xlabel, ylabel, legend):
+        dated = False
+        layout = ("lines", len(series), len(hlines), bars is not None)
+        rebuilt = self._prepare(layout)
+        columns = pixel_columns(self.ax)
+        x_low, x_high, y_low, y_high = np.inf, -np.inf, np.inf, -np.inf
+        labels_changed = rebuilt
+        for index, (x, y, style) in enumerate(series):
+            x, dated = x_values(x)
+            x, y = downsample_line(x, np.asarray(y, dtype=float), columns)
+            line = self.artists.get(("line", index))
+            if line is None:
+                line, = self.ax.plot(x, y, **style)
+                self.artists[("line", index)] = line
+            else:
+                labels_changed |= line.get_label() != style.get('label', line.get_label())
+                line.set_data(x, y)
+                line.set(**style)
+            if len(x):
+                x_low, x_high = min(x_low, x.min()), max(x_high, x.max())
+                y_low, y_high = min(y_low, np.nanmin(y)), max(y_high, np.nanmax(y))
+        for index, (level, style) in enumerate(hlines):
+            line = self.artists.get(("hline", index))
+            if line is None:
+                self.artists[("hline", index)] = self.ax.axhline(level, **style)
+            else:
+                line.set_ydata([level, level])
+                line.set(**style)
+        if bars is not None:
+            x, heights, style = bars
+            x, dated = x_values(x)
+            heights = np.asarray(heights, dtype=float)
+            spacing = np.median(np.diff(x)) if len(x) > 1 else 1.0
+            x, heights, size = downsample_bars(x, heights, columns)
+            verts = bar_geometry(x, np.nan_to_num(heights), 0.8 * spacing * size)
+            collection = self._collection("bars", lambda: PolyCollection([], **style))
+            collection.set_verts(verts)
+            collection.set_facecolor(np.where(heights >= 0, COLOR_UP, COLOR_DOWN))
+            if len(heights):
+                y_low, y_high = min(y_low, np.nanmin(heights), 0), max(y_high, np.nanmax(heights), 0)
+        if dated and rebuilt:
+            locator = AutoDateLocator()
+            self.ax.xaxis.set_major_locator(locator)
+            self.ax.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+        if np.isfinite(x_low) and x_high > x_low:
+            self.ax.set_xlim(x_low, x_high)
+        self.ax.set_ylim(ylim or padded_limits(y_low, y_high))
+        if rebuilt:
+            self.ax.grid(True)
+        self.ax.set_title(title)
+        self.ax.set_xlabel(xlabel or '')
+        self.ax.set_ylabel(ylabel or '')
+        if legend and labels_changed:
+            self.ax.legend()
+        self._draw()
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+PRICES = FIELDS[:4]
+PRICE_DTYPE = np.float32
+VOLUME_DTYPE = np.float64
+
+
+class CompactBars:
+    # one contiguous (prices x bars) float32 block, float64 volumes (exact well past float32's 2**24) and int64
+    # epoch-nanosecond timestamps. Rows of the block are the price columns, so every column, slice and the
+    # DataFrame view share memory with it instead of copying
+    __slots__ = ('values', 'volume', 'times', 'tz', 'attrs', '_index')
+
+    def __init__(self, values, volume, times, tz=None, attrs=None):
+        self.values = values
+        self.volume = volume
+        self.times = times
+        self.tz = tz
+        self.attrs = dict(attrs or {})
+        self._index = None
+
+    @classmethod
+    def from_frame(cls, data, dtype=PRICE_DTYPE):
+        if isinstance(data, cls):
+            return data
+        values = np.empty((len(PRICES), len(data)), dtype=dtype)
+        volume = np.empty(len(data), dtype=VOLUME_DTYPE)
+        for row, name in enumerate(FIELDS):
+            column = data[name] if name in data else np.nan
+            if isinstance(column, pd.DataFrame):
+                column = column.squeeze(axis=1)
+            if name == 'Volume':
+                volume[:] = column
+            else:
+                values[row] = column
+        index = pd.DatetimeIndex(data.index)
+        times = np.ascontiguousarray(index.as_unit('ns').asi8, dtype=np.int64)
+        return cls(values, volume, times, str(index.tz) if index.tz is not None else None, data.attrs)
+
+    def freeze(self):
+        # shared histories are handed out as views; writing through one would change the cached bars
+        for array in (self.values, self.volume, self.times):
+            array.flags.writeable = False
+        return self
+
+    def __len__(self):
+        return len(self.times)
+
+    def __repr__(self):
+        if not len(self):
+            return "CompactBars(0 bars)"
+        return (f"CompactBars({len(self)} bars, {self.index[0]} .. {self.index[-1]}, "
+                f"{self.values.dtype}, {self.nbytes / 2 ** 20:.1f} MB)")
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.volume.nbytes + self.times.nbytes
+
+    @property
+    def index(self):
+        if self._index is None:
+            dtype = pd.DatetimeTZDtype('ns', self.tz) if self.tz else 'datetime64[ns]'
+            values = self.times if self.tz else self.times.view('datetime64[ns]')
+            self._index = pd.DatetimeIndex(values, dtype=dtype, copy=False, name='Datetime')
+        return self._index
+
+    @property
+    def columns(self):
+        return pd.Index(FIELDS)
+
+    def __contains__(self, name):
+        return name in FIELDS
+
+    def column(self, name):
+        if name == 'Volume':
+            return self.volume
+        return self.values[PRICES.index(name)]
+
+    def __getitem__(self, name):
+        if isinstance(name, str):
+            return pd.Series(self.column(name), index=self.index, name=name, copy=False)
+        return self.to_frame()[list(name)]
+
+    def _view(self, start, stop):
+        return CompactBars(self.values[:, start:stop], self.volume[start:stop], self.times[start:stop], self.tz,
+                           self.attrs)
+
+    def between(self, start, end):
+        # bars with start <= time < end, as views
+        bounds = [pd.Timestamp(moment) for moment in (start, end)]
+        if self.tz:
+            bounds = [moment.tz_localize(self.tz) if moment.tzinfo is None else moment for moment in bounds]
+        elif any(moment.tzinfo is not None for moment in bounds):
+            bounds = [moment.tz_convert(None) if moment.tzinfo is not None else moment for moment in bounds]
+        start, end = (np.int64(moment.as_unit('ns').value) for moment in bounds)
+        return self._view(np.searchsorted(self.times, start, 'left'), np.searchsorted(self.times, end, 'left'))
+
+    def tail(self, count):
+        return self._view(max(len(self) - count, 0), len(self))
+
+    def to_frame(self, copy=False):
+        frame = pd.DataFrame({name: self.column(name) for name in FIELDS}, index=self.index, copy=copy)
+        frame.attrs.update(self.attrs)
+        return frame
+
+    def ohlc(self, dtype=float):
+        return self.values.T.astype(dtype)
+
+
+def as_frame(data):
+    return data.to_frame() if isinstance(data, CompactBars) else data
+
+
+def frame_nbytes(data):
+    return int(data.memory_usage(index=True, deep=True).sum())
+
+
+def latest_valid(data, columns):
+    # the last bar on which every price field and every indicator is set, like data.dropna().iloc[-1]
+    values = {name: data.column(name) for name in FIELDS}
+    values.update({name: np.asarray(series) for name, series in columns.items()})
+    valid = np.logical_and.reduce([~np.isnan(array) for array in values.values()])
+    positions = np.flatnonzero(valid)
+    if not len(positions):
+        raise IndexError("no bar has every indicator set")
+    return pd.Series({name: float(array[positions[-1]]) for name, array in values.items()},
+                     name=data.index[positions[-1]])
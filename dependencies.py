@@ -2,22 +2,29 @@ required_packages = [
     "yfinance",
     "matplotlib",
     "pandas",
-    "ta",
     "requests",
     "beautifulsoup4",
     "textblob",
     "numpy",
     "mplfinance",
-    "scikit-learn",
     "pandas-market-calendars",
-    "pytz"
+    "pytz",
+    "pyarrow",
+    "lxml",
+    "websockets"
+]
+
+# only the benchmarks need these, e.g. bench_streaming checks the streaming indicators against ta
+benchmark_packages = [
+    "ta"
 ]
 
 if __name__ == "__main__":
     import subprocess
     import sys
 
-    for package in required_packages:
+    packages = required_packages + (benchmark_packages if "--bench" in sys.argv[1:] else [])
+    for package in packages:
         try:
             __import__(package)
             print(f"{package} is already installed.")
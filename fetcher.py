@@ -0,0 +1,63 @@
+import queue
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+WORKERS = 8
+POLL_MS = 30
+
+
+class FetchScheduler:
+    def __init__(self, root, workers=WORKERS, poll_ms=POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch")
+        self.done = queue.Queue()
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.deduped = 0
+        self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, key, func, *args, on_done=None, on_error=None):
+        # the job and each callback run in their submitter's context, so their spans land in the submitter's run
+        context = contextvars.copy_context()
+        with self.lock:
+            if key in self.inflight:
+                self.inflight[key].append((on_done, on_error, context))
+                self.deduped += 1
+                return False
+            self.inflight[key] = [(on_done, on_error, context)]
+            self.submitted += 1
+        future = self.pool.submit(context.copy().run, func, *args)
+        future.add_done_callback(lambda f: self.done.put((key, f)))
+        return True
+
+    def pending(self):
+        with self.lock:
+            return len(self.inflight)
+
+    def _poll(self):
+        while True:
+            try:
+                key, future = self.done.get_nowait()
+            except queue.Empty:
+                break
+            with self.lock:
+                callbacks = self.inflight.pop(key, [])
+            error = future.exception()
+            for on_done, on_error, context in callbacks:
+                try:
+                    if error is None:
+                        if on_done:
+                            context.run(on_done, future.result())
+                    elif on_error:
+                        context.run(on_error, error)
+                    else:
+                        print(f"ERROR {key}: {error}")
+                except Exception as e:
+                    print(f"ERROR {key}: {e}")
+        self.root.after(self.poll_ms, self._poll)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,42 @@
+import gc
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+
+def live_figures():
+    return sum(isinstance(obj, Figure) for obj in gc.get_objects())
+
+
+class FigurePool:
+    def __init__(self, canvas_class=None):
+        if canvas_class is None:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg as canvas_class
+        self.canvas_class = canvas_class
+        self.canvases = {}
+        self.created = 0
+        self.reused = 0
+
+    def panel(self, name, master=None, figsize=(5, 3)):
+        canvas = self.canvases.get(name)
+        if canvas is None:
+            canvas = self.canvas_class(Figure(figsize=figsize), master=master) if master is not None \
+                else self.canvas_class(Figure(figsize=figsize))
+            self.canvases[name] = canvas
+            self.created += 1
+        else:
+            self.reused += 1
+        return canvas.figure, canvas
+
+    def figure(self, name, master=None, figsize=(5, 3)):
+        figure, canvas = self.panel(name, master, figsize)
+        figure.clear()
+        return figure
+
+    def stats(self):
+        return {
+            "canvases": len(self.canvases),
+            "created": self.created,
+            "reused": self.reused,
+            "pyplot_figures": len(plt.get_fignums()),
+            "live_figures": live_figures(),
+        }
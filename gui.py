@@ -2,15 +2,21 @@ import tkinter as tk
 from tkinter import messagebox, ttk, filedialog
 from datetime import datetime, timedelta
 import stocks
+import streaming
+from fetcher import FetchScheduler
+from refresh import RefreshScheduler
+from quote_feed import QuoteFeed, StreamSource
+from chart_renderer import ChartRenderer
+from figure_pool import FigurePool
+from resample import INTERVAL_SECONDS
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.backends.backend_tkagg import NavigationToolbar2Tk
-import yfinance as yf
+import instrumentation
 import configparser
 import os
 import matplotlib.dates as mdates
-from mplfinance.original_flavor import candlestick_ohlc
 from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
 
 class StockAnalysisApp(tk.Tk):
@@ -69,6 +75,9 @@ class StockAnalysisApp(tk.Tk):
         self.toolbar_frame.grid(row=5, column=0, columnspan=4, sticky="ew")
         self.toolbar = NavigationToolbar2Tk(self.canvas, self.toolbar_frame)
         self.toolbar.update()
+        self.canvas.draw = instrumentation.timed("gui.canvas_draw")(self.canvas.draw)
+        self.chart = ChartRenderer(self.canvas, self.ax)
+        self.figures = FigurePool()
 
         self.news_frame = ttk.LabelFrame(self.main_frame, text="Headlines", padding=10)
         self.news_frame.grid(row=0, column=4, rowspan=6, sticky="nsew", padx=(10,0))
@@ -89,6 +98,8 @@ class StockAnalysisApp(tk.Tk):
         self.time_range_combo.set("6M")
         self.time_range_combo.grid(row=1, column=1, padx=5, pady=5)
         self.time_range_combo.bind("<<ComboboxSelected>>", lambda e: self.update_chart())
+        self.ticker_entry.bind("<Return>", lambda e: self.update_chart())
+        self.ticker_entry.bind("<FocusOut>", lambda e: self.update_chart())
 
         self.price_label = tk.Label(self.main_frame, text="Price: $0.00", font=("Segoe UI", 18, "bold"), width=20, height=2)
         self.price_label.grid(row=3, column=0, columnspan=4, pady=(10, 20))
@@ -104,6 +115,8 @@ class StockAnalysisApp(tk.Tk):
         ttk.Button(button_frame, text="Export Result", command=self.export_results).grid(row=0, column=1, padx=10,
                                                                                          pady=10)
         ttk.Button(button_frame, text="Settings", command=self.open_settings).grid(row=0, column=2, padx=10, pady=10)
+        ttk.Button(button_frame, text="Diagnostics", command=self.open_diagnostics).grid(row=0, column=3, padx=10,
+                                                                                         pady=10)
 
         ttk.Button(button_frame, text="Regression", command=self.show_regression).grid(row=1, column=0, padx=10,
                                                                                        pady=10)
@@ -143,20 +156,35 @@ class StockAnalysisApp(tk.Tk):
         self.action_label = tk.Label(self.analysis_frame, text="Awaiting Analysis...", font=("Segoe UI", 24, "bold"),
                                      fg="gray")
         self.action_label.pack(pady=15)
-        placeholder_fig = plt.Figure(figsize=(5, 3))
+        placeholder_fig, self.prediction_canvas = self.figures.panel("prediction", self.analysis_frame, (5, 3))
         ax = placeholder_fig.add_subplot(111)
         ax.set_title("Prediction Preview")
         ax.set_xticks([])
         ax.set_yticks([])
         ax.grid(True)
-
-        self.prediction_canvas = None
+        self.prediction_canvas.draw = instrumentation.timed("gui.prediction_draw")(self.prediction_canvas.draw)
+        self.prediction_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.diagnostics = None
+        self.profile_process = tk.BooleanVar(value=False)
         self.last_result = None
+        self.stream = None
+        self.stream_bar_time = None
+        self.process_token = 0
+        self.watched_ticker = None
+        self.fetcher = FetchScheduler(self)
+        self.quotes = QuoteFeed(self)
+        self.quote_source = None
+        self.refresher = RefreshScheduler(self, self.fetcher, self.update_interval_var.get,
+                                          enabled=lambda: self.live_update.get(), on_session=self.set_market_state,
+                                          feed=self.quotes)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.display_headlines = tk.BooleanVar()
         self.auto_refresh = tk.BooleanVar()
         self.live_update = tk.BooleanVar()
         self.interval_var = tk.StringVar()
+        self.quote_stream = tk.StringVar()
         self.load_settings()
+        self.connect_quote_stream()
         self.update_chart()
 
     def open_settings(self):
@@ -189,6 +217,8 @@ class StockAnalysisApp(tk.Tk):
 
         ttk.Label(settings_window, text="Fetch Interval:").pack(pady=(10, 0))
         ttk.Combobox(settings_window, textvariable=self.interval_var, values=["1m", "5m", "15m", "30m", "1h", "1d"]).pack()
+        ttk.Label(settings_window, text="Quote Stream URL:").pack(pady=(10, 0))
+        ttk.Entry(settings_window, textvariable=self.quote_stream, width=32).pack()
         ttk.Button(
             settings_window,
             text="Save Settings",
@@ -201,10 +231,12 @@ class StockAnalysisApp(tk.Tk):
             "show_headlines": str(self.display_headlines.get()),
             "live_update": str(self.live_update.get()),
             "auto_refresh": str(self.auto_refresh.get()),
-            "interval": str(self.interval_var.get())
+            "interval": str(self.interval_var.get()),
+            "quote_stream": self.quote_stream.get().strip()
         }
         with open("user_settings.inf", "w") as configfile:
             config.write(configfile)
+        self.connect_quote_stream()
         if window:
             window.destroy()
 
@@ -216,6 +248,7 @@ class StockAnalysisApp(tk.Tk):
             self.live_update.set(config.getboolean("Options", "live_update", fallback=False))
             self.auto_refresh.set(config.getboolean("Options", "auto_refresh", fallback=True))
             self.interval_var.set(config.get("Options", "interval", fallback='1h'))
+            self.quote_stream.set(config.get("Options", "quote_stream", fallback=''))
         else:
             self.display_headlines.set(True)
             self.live_update.set(False)
@@ -223,41 +256,22 @@ class StockAnalysisApp(tk.Tk):
             self.interval_var.set('1h')
 
     def show_stock_graph(self):
-        ticker = self.ticker_entry.get()
-        end_date = datetime.today()
-        start_date = self.calculate_start_date(self.time_range_var.get(), end_date)
-        data = stocks.fetch_stock_data(ticker, start_date, end_date.strftime('%Y-%m-%d'))
+        self.load_data(self.draw_stock_graph)
 
+    @instrumentation.timed("gui.draw_stock_graph")
+    def draw_stock_graph(self, ticker, data):
         if data.empty:
             messagebox.showerror("Data Error", "No data available for the selected period.")
             return
 
-        data = data[['Open', 'High', 'Low', 'Close']].dropna().reset_index()
-        data['FormattedDate'] = data['Datetime'].dt.strftime('%Y-%m-%d')
-
-        data['Index'] = range(len(data))
-        ohlc = data[['Index', 'Open', 'High', 'Low', 'Close']].values
-
-        self.ax.clear()
-        candlestick_ohlc(self.ax, ohlc, width=0.6, colorup='green', colordown='red')
-
-        self.ax.set_xticks(data['Index'][::max(len(data) // 10, 1)])
-        self.ax.set_xticklabels(data['FormattedDate'][::max(len(data) // 10, 1)], rotation=45, ha='right')
+        self.chart.candles(data, f'{ticker} Candlestick Chart')
 
-        self.ax.grid(True)
-        self.ax.set_title(f'{ticker} Candlestick Chart')
-        self.ax.set_xlabel('Date')
-        self.ax.set_ylabel('Price')
-
-        self.canvas.draw()
-
-    def update_prediction_plot(self, fig):
-        if self.prediction_canvas:
-            self.prediction_canvas.get_tk_widget().destroy()
-        self.prediction_canvas = FigureCanvasTkAgg(fig, master=self.analysis_frame)
-        self.prediction_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        self.prediction_canvas.draw()
+    @instrumentation.timed("gui.update_prediction_plot")
+    def update_prediction_plot(self, data, ticker):
+        stocks.plot_projection(data, ticker, fig=self.figures.figure("prediction"))
+        self.prediction_canvas.draw_idle()
 
+    @instrumentation.timed("gui.display_analysis_results")
     def display_analysis_results(self, result):
         metric_values = [
             result[0],
@@ -279,27 +293,60 @@ class StockAnalysisApp(tk.Tk):
         else:
             self.action_label.config(text="SHORT", fg="red")
 
-    def update_canvas(self, new_figure):
-        self.canvas.get_tk_widget().destroy()
-        self.canvas = FigureCanvasTkAgg(new_figure, master=self.main_frame)
-        self.canvas.get_tk_widget().grid(row=4, column=0, columnspan=4, sticky="nsew")
-        self.canvas.draw()
-        self.toolbar.destroy()
-        self.toolbar = NavigationToolbar2Tk(self.canvas, self.toolbar_frame)
-        self.toolbar.update()
-
-    def process_stock(self):
+    def load_data(self, callback):
         ticker = self.ticker_entry.get()
         end_date = datetime.today()
         start_date = self.calculate_start_date(self.time_range_var.get(), end_date)
-        data = stocks.fetch_stock_data(ticker, start_date, end_date.strftime('%Y-%m-%d'))
+        end_str = end_date.strftime('%Y-%m-%d')
+        key = ("bars", ticker.strip().upper(), stocks.get_interval(), start_date, end_str)
+        self.fetcher.submit(key, stocks.fetch_stock_data, ticker, start_date, end_str,
+                            on_done=lambda data: callback(ticker, data), on_error=self.show_fetch_error)
+        return ticker, start_date, end_str
+
+    def show_fetch_error(self, error):
+        messagebox.showerror("Data Error", f"Could not fetch data: {error}")
+
+    def process_stock(self):
+        instrumentation.begin_run("process", self.ticker_entry.get().strip().upper())
+        with instrumentation.span("gui.process_stock"):
+            self.start_process()
+
+    def start_process(self):
+        self.process_token += 1
+        token = self.process_token
+        results = {}
+
+        def collect(name):
+            def callback(value):
+                if token != self.process_token:
+                    return
+                results[name] = value
+                if 'data' in results and 'news' in results:
+                    self.finish_process(ticker, start_date, end_str, results['data'], results['news'])
+            return callback
+
+        self.action_label.config(text="Loading...", fg="gray")
+        self.update_chart()
+        ticker, start_date, end_str = self.load_data(lambda ticker, data: collect('data')(data))
+        self.fetcher.submit(("news", ticker.strip().upper()), stocks.getNewsData, ticker,
+                            on_done=collect('news'), on_error=lambda error: collect('news')([]))
+        if self.auto_refresh.get():
+            self.update_price_display()
+
+    @instrumentation.timed("gui.finish_process")
+    def finish_process(self, ticker, start_date, end_date, data, news_data):
+        if data.empty:
+            messagebox.showerror("Data Error", "No data available for the selected period.")
+            return
         if isinstance(data['Close'], pd.DataFrame):
             data['Close'] = data['Close'].squeeze()
-        analysis_result = stocks.predict_stock_movement(data, ticker)
+        analysis_result = stocks.predict_stock_movement(data, ticker, news_data)
+        self.stream = streaming.StreamingIndicators.from_close(data['Close'])
+        self.stream_bar_time = None
         self.last_result = {
             'Ticker': ticker,
             'Start Date': start_date,
-            'End Date': end_date.strftime('%Y-%m-%d'),
+            'End Date': end_date,
             'RSI Norm': analysis_result[0],
             'MACD Norm': analysis_result[1],
             'Bollinger Position Norm': analysis_result[2],
@@ -308,13 +355,10 @@ class StockAnalysisApp(tk.Tk):
             'Trend': analysis_result[5]
         }
         self.display_analysis_results(analysis_result)
-        self.show_stock_graph()
+        self.draw_stock_graph(ticker, data)
         if self.display_headlines.get():
-            self.display_headlines_sentiment()
-        if self.auto_refresh.get():
-            self.update_price_display()
-        fig = stocks.plot_projection(data, ticker, return_fig=True)
-        self.update_prediction_plot(fig)
+            self.display_headlines_sentiment(news_data)
+        self.update_prediction_plot(data, ticker)
 
 
 
@@ -336,92 +380,115 @@ class StockAnalysisApp(tk.Tk):
     def update_interval_display(self, val):
         self.interval_label.config(text=f"{int(float(val))}s")
 
-    def update_price_display(self):
-        ticker = self.ticker_entry.get()
-
-        live_data = yf.Ticker(ticker).history(period="1d", interval="1m")
-        current_price = live_data['Close'].iloc[-1]
-        print(current_price)
+    def show_price(self, current_price):
+        if current_price is None:
+            return
         color = "green" if self.last_price is not None and current_price > self.last_price else "red"
         self.price_label.config(text=f"Price: ${current_price:.2f}", bg=color, fg="white")
         self.last_price = current_price
 
+    def update_price_display(self):
+        ticker = self.ticker_entry.get().strip().upper()
+        self.show_price(self.quotes.last(ticker))
+        self.refresher.request(ticker)
 
-    def update_chart(self):
-        ticker = self.ticker_entry.get()
-        if not stocks.is_market_open(ticker):
+    def connect_quote_stream(self):
+        url = self.quote_stream.get().strip()
+        if self.quote_source is not None and self.quote_source.url == url:
+            return
+        if self.quote_source is not None:
+            self.quotes.detach(self.quote_source)
+            self.quote_source = None
+        if url:
+            self.quote_source = StreamSource(url)
+            self.quotes.attach(self.quote_source)
+
+    def live_tick(self, current_price):
+        self.show_price(current_price)
+        self.feed_stream(current_price)
+
+    @instrumentation.timed("gui.feed_stream")
+    def feed_stream(self, current_price):
+        if self.stream is None:
+            return
+        now = datetime.now()
+        bar_seconds = INTERVAL_SECONDS.get(self.interval_var.get(), 3600)
+        new_bar = self.stream_bar_time is None or (now - self.stream_bar_time).total_seconds() >= bar_seconds
+        if new_bar:
+            values = self.stream.update(current_price)
+            self.stream_bar_time = now
+        else:
+            values = self.stream.revise(current_price)
+        self.chart.tick(current_price, new_bar)
+        norms = stocks.indicator_norms(values['RSI'], values['MACD'], values['MACD Signal'], values['Close'],
+                                       values['Middle Band'], values['Upper Band'], values['Lower Band'])
+        for label, value in zip(self.analysis_labels, norms):
+            name = label.cget('text').split(':')[0]
+            label.config(text=f"{name}: {value:.2f}", fg="green" if value >= 0 else "red")
+
+    def set_market_open(self, market_open):
+        if not market_open:
             self.live_checkbox.state(["disabled"])
             self.live_update.set(False)
         else:
             self.live_checkbox.state(["!disabled"])
 
-        if self.live_update.get():
-            self.show()
-            self.update_price_display()
+    def set_market_state(self, ticker, market_open):
+        if ticker == self.watched_ticker:
+            self.set_market_open(market_open)
 
-        interval_ms = self.update_interval_var.get() * 1000
-        self.after(interval_ms, self.update_chart)
+    def update_chart(self):
+        ticker = self.ticker_entry.get().strip().upper()
+        if ticker == self.watched_ticker:
+            return
+        if self.watched_ticker:
+            self.refresher.unsubscribe(self.watched_ticker, self.live_tick)
+        self.watched_ticker = ticker
+        if ticker:
+            self.refresher.subscribe(ticker, self.live_tick)
+
+    def on_close(self):
+        self.fetcher.shutdown()
+        self.quotes.close()
+        plt.close('all')
+        self.destroy()
 
 
     def draw_secondary_plot(self, title, y_data, label):
-        self.ax.clear()
-        self.ax.plot(y_data.index, y_data, label=label)
-        self.ax.set_title(title)
-        self.ax.set_xlabel('Date')
-        self.ax.set_ylabel(label)
-        self.ax.grid(True)
-        self.ax.legend()
-        self.canvas.draw()
+        self.chart.lines(title, [(y_data.index, y_data, dict(label=label))], xlabel='Date', ylabel=label)
 
     def RSI(self):
-        ticker = self.ticker_entry.get()
-        end_date = datetime.today()
-        start_date = self.calculate_start_date(self.time_range_var.get(), end_date)
-        data = stocks.fetch_stock_data(ticker, start_date, end_date.strftime('%Y-%m-%d'))
+        self.load_data(self.draw_RSI)
+
+    @instrumentation.timed("gui.draw_RSI")
+    def draw_RSI(self, ticker, data):
         stocks.rsi(data)
-        self.ax.clear()
-        self.ax.plot(data.index, data['RSI'], color='purple', label='RSI')
-        self.ax.axhline(70, color='red', linestyle='--', label='Overbought (70)')
-        self.ax.axhline(30, color='green', linestyle='--', label='Oversold (30)')
-        self.ax.set_title(f'{ticker} RSI')
-        self.ax.set_ylim(0, 100)
-        self.ax.grid()
-        self.ax.legend()
-        self.canvas.draw()
+        self.chart.lines(f'{ticker} RSI', [(data.index, data['RSI'], dict(color='purple', label='RSI'))],
+                         hlines=[(70, dict(color='red', linestyle='--', label='Overbought (70)')),
+                                 (30, dict(color='green', linestyle='--', label='Oversold (30)'))],
+                         ylim=(0, 100))
 
     def MACD(self):
-        ticker = self.ticker_entry.get()
-        end_date = datetime.today()
-        start_date = self.calculate_start_date(self.time_range_var.get(), end_date)
-        data = stocks.fetch_stock_data(ticker, start_date, end_date.strftime('%Y-%m-%d'))
+        self.load_data(self.draw_MACD)
+
+    @instrumentation.timed("gui.draw_MACD")
+    def draw_MACD(self, ticker, data):
         stocks.macd(data)
         macd_hist = data['MACD'] - data['MACD Signal']
-        colors = ['green' if val >= 0 else 'red' for val in macd_hist]
-        self.ax.clear()
-        self.ax.plot(data.index, data['MACD'], color='blue', label='MACD Line')
-        self.ax.plot(data.index, data['MACD Signal'], color='orange', label='Signal Line')
-        self.ax.bar(data.index, macd_hist, color=colors, alpha=0.5, label='MACD Histogram')
-        self.ax.set_title(f'{ticker} MACD')
-        self.ax.grid()
-        self.ax.legend()
-        self.canvas.draw()
+        self.chart.lines(f'{ticker} MACD', [(data.index, data['MACD'], dict(color='blue', label='MACD Line')),
+                                            (data.index, data['MACD Signal'], dict(color='orange', label='Signal Line'))],
+                         bars=(data.index, macd_hist, dict(alpha=0.5, label='MACD Histogram')))
 
     def boll(self):
-        ticker = self.ticker_entry.get()
-        end_date = datetime.today()
-        start_date = self.calculate_start_date(self.time_range_var.get(), end_date)
-        data = stocks.fetch_stock_data(ticker, start_date, end_date.strftime('%Y-%m-%d'))
+        self.load_data(self.draw_boll)
+
+    @instrumentation.timed("gui.draw_boll")
+    def draw_boll(self, ticker, data):
         stocks.bollinger_bands(data)
-        self.ax.clear()
-        self.ax.plot(data.index, data['Close'], label='Close')
-        self.ax.plot(data.index, data['Upper Band'], label='Upper Band', linestyle='--')
-        self.ax.plot(data.index, data['Lower Band'], label='Lower Band', linestyle='--')
-        self.ax.set_title(f'{ticker} Bollinger Bands')
-        self.ax.set_xlabel('Date')
-        self.ax.set_ylabel('Price')
-        self.ax.grid(True)
-        self.ax.legend()
-        self.canvas.draw()
+        self.chart.lines(f'{ticker} Bollinger Bands', [(data.index, data['Close'], dict(label='Close')),
+                                                       (data.index, data['Upper Band'], dict(label='Upper Band', linestyle='--')),
+                                                       (data.index, data['Lower Band'], dict(label='Lower Band', linestyle='--'))],
+                         xlabel='Date', ylabel='Price')
 
     def predict_graph(self):
         ticker = self.ticker_entry.get()
@@ -454,6 +521,7 @@ class StockAnalysisApp(tk.Tk):
         }
         self.display_results(analysis_result)
 
+    @instrumentation.timed("gui.export_results")
     def export_results(self):
         if self.last_result is None:
             messagebox.showinfo("No Result", "Run an analysis first.")
@@ -464,6 +532,72 @@ class StockAnalysisApp(tk.Tk):
             df.to_csv(file_path, index=False)
             messagebox.showinfo("Exported", f"Results saved to {file_path}")
 
+    def open_diagnostics(self):
+        if self.diagnostics is not None and self.diagnostics.winfo_exists():
+            self.diagnostics.lift()
+            return
+        window = tk.Toplevel(self)
+        window.title("Diagnostics")
+        window.geometry("720x560")
+        self.diagnostics = window
+        self.diagnostics_scope = tk.StringVar(value="Last run")
+        controls = ttk.Frame(window, padding=5)
+        controls.pack(fill=tk.X)
+        ttk.Combobox(controls, textvariable=self.diagnostics_scope, values=["Last run", "All runs"], state="readonly",
+                     width=10).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(controls, text="Profile Process", variable=self.profile_process,
+                        command=self.toggle_profiling).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Export JSON", command=lambda: self.export_timings("json")).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Export CSV", command=lambda: self.export_timings("csv")).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Reset", command=instrumentation.recorder.reset).pack(side=tk.LEFT, padx=5)
+        columns = ("count", "total", "mean", "p99", "max")
+        self.diagnostics_tree = ttk.Treeview(window, columns=columns, height=12)
+        self.diagnostics_tree.heading("#0", text="Stage")
+        for column in columns:
+            self.diagnostics_tree.heading(column, text=column if column == "count" else f"{column} ms")
+            self.diagnostics_tree.column(column, width=90, anchor="e")
+        self.diagnostics_tree.pack(fill=tk.BOTH, expand=True, padx=5)
+        self.diagnostics_text = tk.Text(window, height=12, font=("Consolas", 9))
+        self.diagnostics_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.refresh_diagnostics()
+
+    def refresh_diagnostics(self):
+        if self.diagnostics is None or not self.diagnostics.winfo_exists():
+            self.diagnostics = None
+            return
+        recorder = instrumentation.recorder
+        run = "last" if self.diagnostics_scope.get() == "Last run" else None
+        self.diagnostics_tree.delete(*self.diagnostics_tree.get_children())
+        for row in recorder.summary(run):
+            self.diagnostics_tree.insert("", tk.END, text=row['name'], values=(
+                row['count'], f"{row['total_ms']:.1f}", f"{row['mean_ms']:.1f}", f"{row['p99_ms']:.1f}",
+                f"{row['max_ms']:.1f}"))
+        lines = [f"{name}: {value}" for name, value in sorted(recorder.snapshot()['counters'].items())]
+        lines += [f"fetch.submitted: {self.fetcher.submitted}", f"fetch.deduped: {self.fetcher.deduped}",
+                  f"fetch.pending: {self.fetcher.pending()}"]
+        if recorder.profiles:
+            profile = recorder.profiles[-1]
+            lines += ["", f"Last profile: {profile['name']} ({profile['path'] or profile['error']})", profile['report']]
+        self.diagnostics_text.delete(1.0, tk.END)
+        self.diagnostics_text.insert(tk.END, "\n".join(lines))
+        self.after(1000, self.refresh_diagnostics)
+
+    def toggle_profiling(self):
+        # cProfile only sees the thread that enables it, so each stage is profiled on the thread it runs on
+        names = ["gui.finish_process", "fetch", "news"] if self.profile_process.get() else []
+        instrumentation.recorder.enable_profiling(names)
+
+    def export_timings(self, fmt):
+        file_path = filedialog.asksaveasfilename(defaultextension=f".{fmt}",
+                                                 filetypes=[(f"{fmt.upper()} files", f"*.{fmt}")])
+        if not file_path:
+            return
+        if fmt == "csv":
+            instrumentation.recorder.export_csv(file_path)
+        else:
+            instrumentation.recorder.export_json(file_path)
+        messagebox.showinfo("Exported", f"Timings saved to {file_path}")
+
     def display_results(self, analysis_result):
         result_window = tk.Toplevel()
         result_window.title("Analysis Results")
@@ -482,56 +616,41 @@ class StockAnalysisApp(tk.Tk):
         score_label = result_window.winfo_children()[-2]
         score_label.config(fg="green" if analysis_result[4] >= 0 else "red")
 
-    def display_headlines_sentiment(self):
+    @instrumentation.timed("gui.display_headlines_sentiment")
+    def display_headlines_sentiment(self, news_data=None):
         ticker = self.ticker_entry.get()
-        headlines_sentiment = stocks.show_headlines(ticker)
+        headlines_sentiment = stocks.show_headlines(ticker, news_data)
         self.news_text.delete(1.0, tk.END)
         if headlines_sentiment:
-            with open("news_cache.txt", "w", encoding="utf-8") as f:
-                for idx, (headline, sentiment) in enumerate(headlines_sentiment, 1):
-                    f.write(f"{idx}. {headline} - Sentiment: {sentiment:.2f}\n")
-            with open("news_cache.txt", "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            for line in lines:
-                if ' - Sentiment:' in line:
-                    headline, sentiment = line.split(' - Sentiment:')
-                    formatted = f"• {headline.strip()}\n   Sentiment Score: {sentiment.strip()}\n{'-'*60}\n"
-                    self.news_text.insert(tk.END, formatted)
+            for idx, (headline, sentiment) in enumerate(headlines_sentiment, 1):
+                formatted = f"• {idx}. {headline}\n   Sentiment Score: {sentiment:.2f}\n{'-'*60}\n"
+                self.news_text.insert(tk.END, formatted)
         else:
             self.news_text.delete(1.0, tk.END)
             self.news_text.insert(tk.END, "No headlines found for this stock.")
 
     def show_regression(self):
-        ticker = self.ticker_entry.get()
-        end_date = datetime.today()
-        start_date = self.calculate_start_date(self.time_range_var.get(), end_date)
-        data = stocks.fetch_stock_data(ticker, start_date, end_date.strftime('%Y-%m-%d'))
+        self.load_data(self.draw_regression)
+
+    @instrumentation.timed("gui.draw_regression")
+    def draw_regression(self, ticker, data):
         result = stocks.linear_regression_trend(data)
-        self.ax.clear()
-        self.ax.plot(result['Datetime'], result['Close'], label='Close Price')
-        self.ax.plot(result['Datetime'], result['LR Trend'], label='Linear Regression', linestyle='--')
-        self.ax.set_title(f'{ticker} Linear Regression Trend')
-        self.ax.set_xlabel('Date')
-        self.ax.set_ylabel('Price')
-        self.ax.legend()
-        self.ax.grid(True)
-        self.canvas.draw()
+        self.chart.lines(f'{ticker} Linear Regression Trend',
+                         [(result['Datetime'], result['Close'], dict(label='Close Price')),
+                          (result['Datetime'], result['LR Trend'], dict(label='Linear Regression', linestyle='--'))],
+                         xlabel='Date', ylabel='Price')
 
     def show_polynomial_regression(self):
-        ticker = self.ticker_entry.get()
-        end_date = datetime.today()
-        start_date = self.calculate_start_date(self.time_range_var.get(), end_date)
-        data = stocks.fetch_stock_data(ticker, start_date, end_date.strftime('%Y-%m-%d'))
+        self.load_data(self.draw_polynomial_regression)
+
+    @instrumentation.timed("gui.draw_polynomial_regression")
+    def draw_polynomial_regression(self, ticker, data):
         result = stocks.polynomial_regression_trend(data, degree=self.degree_var.get())
-        self.ax.clear()
-        self.ax.plot(result['Datetime'], result['Close'], label='Close Price')
-        self.ax.plot(result['Datetime'], result['Poly Trend'], label=f'Polynomial Regression (deg={self.degree_var.get()})', linestyle='--')
-        self.ax.set_title(f'{ticker} Polynomial Regression Trend')
-        self.ax.set_xlabel('Date')
-        self.ax.set_ylabel('Price')
-        self.ax.legend()
-        self.ax.grid(True)
-        self.canvas.draw()
+        self.chart.lines(f'{ticker} Polynomial Regression Trend',
+                         [(result['Datetime'], result['Close'], dict(label='Close Price')),
+                          (result['Datetime'], result['Poly Trend'],
+                           dict(label=f'Polynomial Regression (deg={self.degree_var.get()})', linestyle='--'))],
+                         xlabel='Date', ylabel='Price')
 
 if __name__ == "__main__":
     app = StockAnalysisApp()
@@ -0,0 +1,115 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from instrumentation import count
+
+MEMO_SIZE = 32
+MEMO_BYTES = 512 * 2 ** 20
+TAIL_BARS = 512
+memo = OrderedDict()
+memo_lock = threading.Lock()
+
+
+def close_series(data):
+    close = data['Close']
+    if isinstance(close, pd.DataFrame) and close.shape[1] == 1:
+        close = close.squeeze(axis=1)
+    return close.astype(float)
+
+
+def rolling_stats(close, window):
+    reference = close.mean()
+    centered = close - reference
+    mean = centered.rolling(window).sum() / window
+    variance = (centered * centered).rolling(window).sum() / window - mean * mean
+    return mean + reference, np.sqrt(variance.clip(lower=0))
+
+
+def ema(series, span):
+    return series.ewm(span=span, min_periods=span, adjust=False).mean()
+
+
+def wilder_rsi(close, window=14):
+    diff = close.diff(1)
+    up = diff.where(diff > 0, 0.0)
+    down = -diff.where(diff < 0, 0.0)
+    avg_up = up.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    avg_down = down.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    rsi = 100 - 100 / (1 + avg_up / avg_down)
+    return rsi.mask(avg_down == 0, 100.0)
+
+
+def macd_lines(close, fast=12, slow=26, signal=9):
+    macd = ema(close, fast) - ema(close, slow)
+    return macd, ema(macd, signal)
+
+
+class IndicatorFrame:
+    def __init__(self, data, ma_windows=(20, 50), boll_window=20, boll_dev=2, rsi_window=14, macd_windows=(12, 26, 9)):
+        close = close_series(data)
+        self.index = data.index
+        self.close = close
+        mean, std = rolling_stats(close, boll_window)
+        self.ma = {}
+        for window in ma_windows:
+            self.ma[window] = mean if window == boll_window else close.rolling(window).mean()
+        self.middle_band = mean
+        self.std = std
+        self.upper_band = mean + boll_dev * std
+        self.lower_band = mean - boll_dev * std
+        self.rsi = wilder_rsi(close, rsi_window)
+        self.macd, self.macd_signal = macd_lines(close, *macd_windows)
+
+    def columns(self):
+        columns = {f'{window}-day MA': series for window, series in self.ma.items()}
+        columns.update({
+            'Middle Band': self.middle_band,
+            '20-day STD': self.std,
+            'Upper Band': self.upper_band,
+            'Lower Band': self.lower_band,
+            'RSI': self.rsi,
+            'MACD': self.macd,
+            'MACD Signal': self.macd_signal,
+        })
+        return columns
+
+    @property
+    def nbytes(self):
+        arrays = {id(series): series.memory_usage(index=False) for series in [self.close, *self.columns().values()]}
+        return int(sum(arrays.values()))
+
+    def apply(self, data, names=None):
+        for name, series in self.columns().items():
+            if names is None or name in names:
+                data[name] = series
+        return data
+
+
+def memo_key(data):
+    key = data.attrs.get('key')
+    if key is None or data.empty:
+        return None
+    # a tail refresh revises the latest bars in place, so the recent closes are part of the key
+    tail = np.asarray(data['Close']).ravel()[-TAIL_BARS:].astype(float)
+    return key + (len(data), data.index[-1], hash(tail.tobytes()))
+
+
+def compute(data):
+    key = memo_key(data)
+    with memo_lock:
+        frame = memo.get(key) if key is not None else None
+        if frame is not None:
+            memo.move_to_end(key)
+    if frame is not None:
+        count("indicators.memo_hit")
+        return frame
+    count("indicators.memo_miss")
+    frame = IndicatorFrame(data)
+    if key is not None:
+        with memo_lock:
+            memo[key] = frame
+            # long 1m histories make a few frames outweigh the entry limit, so the memo is bounded by bytes too
+            while len(memo) > 1 and (len(memo) > MEMO_SIZE or sum(item.nbytes for item in memo.values()) > MEMO_BYTES):
+                memo.popitem(last=False)
+    return frame
@@ -0,0 +1,219 @@
+import io
+import os
+import csv
+import sys
+import json
+import time
+import pstats
+import cProfile
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+HISTORY = 5000
+PROFILE_TOP = 25
+PROFILE_KEEP = 10
+PROFILE_DIR = "profiles"
+SPAN_FIELDS = ['run', 'label', 'name', 'path', 'thread', 'start', 'ms']
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+class Recorder:
+    def __init__(self, history=HISTORY, enabled=True):
+        self.enabled = enabled
+        self.spans = deque(maxlen=history)
+        self.counters = {}
+        self.runs = {}
+        self.runs_begun = 0
+        self.current_run = contextvars.ContextVar("run", default=0)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.origin = time.perf_counter()
+        self.profile_names = set()
+        self.profile_dir = None
+        self.profiles = deque(maxlen=PROFILE_KEEP)
+        self.profiled = 0
+        self.profile_lock = threading.Lock()
+
+    def begin_run(self, name, label=None):
+        # spans belong to the run begun in their context: later spans on this thread, and jobs handed to workers
+        # with contextvars.copy_context() (FetchScheduler.submit does), until the context begins another run
+        with self.lock:
+            self.runs_begun += 1
+            run_id = self.runs_begun
+            self.runs[run_id] = {'name': name, 'label': label or name, 'started': time.time()}
+            while len(self.runs) > self.spans.maxlen:
+                del self.runs[next(iter(self.runs))]
+        self.current_run.set(run_id)
+        return run_id
+
+    @contextmanager
+    def run(self, name, label=None):
+        previous = self.current_run.get()
+        run_id = self.begin_run(name, label)
+        try:
+            with self.span(name):
+                yield run_id
+        finally:
+            self.current_run.set(previous)
+
+    def _stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name):
+        if not self.enabled:
+            yield
+            return
+        stack = self._stack()
+        path = f"{stack[-1]}/{name}" if stack else name
+        stack.append(path)
+        profiler = self._start_profile(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if profiler is not None:
+                self._finish_profile(profiler, name)
+            stack.pop()
+            run_id = self.current_run.get()
+            with self.lock:
+                self.spans.append({
+                    'run': run_id,
+                    'label': self.runs.get(run_id, {}).get('label', ''),
+                    'name': name,
+                    'path': path,
+                    'thread': threading.current_thread().name,
+                    'start': round((started - self.origin) * 1000, 3),
+                    'ms': round(elapsed * 1000, 3),
+                })
+
+    def timed(self, name=None):
+        def decorate(func):
+            span_name = name or func.__name__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, name, amount=1):
+        if not self.enabled or not amount:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def enable_profiling(self, names, directory=PROFILE_DIR):
+        # spans with these names run under cProfile; "*" profiles every outermost span
+        self.profile_names = {name.strip() for name in names if name.strip()}
+        self.profile_dir = directory
+
+    def _start_profile(self, name):
+        if name not in self.profile_names and not ("*" in self.profile_names and len(self._stack()) == 1):
+            return None
+        # cProfile is one profiler per process, so concurrent spans are only timed
+        if not self.profile_lock.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _finish_profile(self, profiler, name):
+        profiler.disable()
+        self.profiled += 1
+        sequence = self.profiled
+        self.profile_lock.release()
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        path, error = None, None
+        if self.profile_dir:
+            try:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                path = os.path.join(self.profile_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{sequence}.prof")
+                profiler.dump_stats(path)
+            except Exception as e:
+                print(f"ERROR {e}", file=sys.stderr)
+                path, error = None, str(e)
+        self.profiles.append({'name': name, 'path': path, 'error': error, 'report': text.getvalue()})
+
+    def records(self, run=None):
+        with self.lock:
+            spans = list(self.spans)
+        if run == "last":
+            run = max((span['run'] for span in spans), default=None)
+        return [span for span in spans if run is None or span['run'] == run]
+
+    def summary(self, run=None):
+        grouped = {}
+        for span in self.records(run):
+            grouped.setdefault(span['name'], []).append(span['ms'])
+        rows = []
+        for name, values in grouped.items():
+            rows.append({
+                'name': name,
+                'count': len(values),
+                'total_ms': round(sum(values), 3),
+                'mean_ms': round(sum(values) / len(values), 3),
+                'p50_ms': percentile(values, 0.5),
+                'p99_ms': percentile(values, 0.99),
+                'max_ms': max(values),
+            })
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def snapshot(self, run=None):
+        with self.lock:
+            counters = dict(self.counters)
+            runs = {str(run_id): dict(info) for run_id, info in self.runs.items()}
+        return {'summary': self.summary(run), 'counters': counters, 'runs': runs, 'spans': self.records(run)}
+
+    def export_json(self, path, run=None):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(run), f, indent=2)
+        return path
+
+    def export_csv(self, path, run=None):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=SPAN_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.records(run))
+        return path
+
+    def report(self, run=None):
+        lines = [f"{'stage':<28}{'count':>7}{'total ms':>12}{'mean ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for row in self.summary(run):
+            lines.append(f"{row['name']:<28}{row['count']:>7}{row['total_ms']:>12.1f}{row['mean_ms']:>10.1f}"
+                         f"{row['p99_ms']:>10.1f}{row['max_ms']:>10.1f}")
+        with self.lock:
+            counters = sorted(self.counters.items())
+        lines += [f"{name:<28}{value:>7}" for name, value in counters]
+        return "\n".join(lines)
+
+    def reset(self):
+        with self.lock:
+            self.spans.clear()
+            self.counters.clear()
+            self.runs.clear()
+        self.profiles.clear()
+
+
+recorder = Recorder(enabled=os.environ.get("STOCKS_INSTRUMENT", "1") != "0")
+if os.environ.get("STOCKS_PROFILE"):
+    recorder.enable_profiling(os.environ["STOCKS_PROFILE"].split(","))
+
+span = recorder.span
+timed = recorder.timed
+count = recorder.count
+begin_run = recorder.begin_run
+run = recorder.run
@@ -0,0 +1,31 @@
+import sys
+import types
+import importlib
+
+
+class LazyModule(types.ModuleType):
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    # the real module if something already paid for it, otherwise a proxy that imports on first attribute access
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def loaded(name):
+    return name in sys.modules
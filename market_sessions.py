@@ -0,0 +1,148 @@
+import os
+import json
+import threading
+from bisect import bisect_right
+import pandas as pd
+import pytz
+from lazy import lazy_import
+from providers import get_provider
+mcal = lazy_import("pandas_market_calendars")
+
+EXCHANGE_PATH = "exchange_cache.json"
+EPOCH = pd.Timestamp("1970-01-01", tz="UTC")
+MICROSECOND = pd.Timedelta(microseconds=1)
+
+CALENDAR_CODES = {
+    "NASDAQ": "NASDAQ",
+    "NMS": "NASDAQ",
+    "NYSE": "NYSE",
+    "NYQ": "NYSE",
+    "LSE": "LSE",
+    "TSX": "TSX",
+    "TOR": "TSX",
+}
+
+ASIAN_EXCHANGES = {
+    "JPX": ("Asia/Tokyo", 9, 15),
+    "TSE": ("Asia/Tokyo", 9, 15),
+    "HKG": ("Asia/Hong_Kong", 9, 16),
+    "SHG": ("Asia/Shanghai", 9, 15),
+    "SHE": ("Asia/Shanghai", 9, 15),
+}
+
+
+def to_micros(moment):
+    return int(moment.timestamp() * 1_000_000)
+
+
+def micros(stamps):
+    return ((pd.DatetimeIndex(stamps).tz_convert("UTC") - EPOCH) // MICROSECOND).tolist()
+
+
+def calendar_sessions(code, start, end):
+    sched = mcal.get_calendar(code).schedule(start_date=start, end_date=end)
+    return micros(sched['market_open']), micros(sched['market_close'])
+
+
+def fixed_sessions(tz_str, open_hr, close_hr, start, end):
+    days = pd.date_range(start, end, freq="B")
+    tz = pytz.timezone(tz_str)
+    opens = (days + pd.Timedelta(hours=open_hr)).tz_localize(tz)
+    closes = (days + pd.Timedelta(hours=close_hr)).tz_localize(tz)
+    return micros(opens), micros(closes)
+
+
+class MarketSessions:
+    def __init__(self, path=EXCHANGE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self.exchanges = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.exchanges = json.load(f)
+            except Exception as e:
+                print(f"ERROR {e}")
+
+    def exchange(self, ticker):
+        ticker = ticker.strip().upper()
+        with self.lock:
+            if self.exchanges.get(ticker):
+                return self.exchanges[ticker]
+        exchange = get_provider().exchange(ticker)
+        # an empty answer is usually a failed info lookup, so it is asked again next time instead of kept for good
+        if not exchange:
+            return exchange
+        with self.lock:
+            self.exchanges[ticker] = exchange
+            with open(self.path, "w") as f:
+                json.dump(self.exchanges, f, indent=2)
+        return exchange
+
+    def _sessions(self, exchange, year):
+        key = (exchange, year)
+        with self.lock:
+            if key in self.sessions:
+                return self.sessions[key]
+        # pad by a day on each side so sessions straddling midnight UTC are found from either year
+        start, end = f"{year - 1}-12-31", f"{year + 1}-01-01"
+        if exchange in ASIAN_EXCHANGES:
+            sessions = fixed_sessions(*ASIAN_EXCHANGES[exchange], start, end)
+        elif exchange in CALENDAR_CODES:
+            sessions = calendar_sessions(CALENDAR_CODES[exchange], start, end)
+        else:
+            sessions = ([], [])
+        with self.lock:
+            self.sessions[key] = sessions
+        return sessions
+
+    def session_bounds(self, ticker, start, end):
+        # every session's open and close (UTC microseconds) from start's year to end's year, or None without a calendar
+        exchange = self.exchange(ticker)
+        if exchange not in ASIAN_EXCHANGES and exchange not in CALENDAR_CODES:
+            return None
+        bounds = {}
+        for year in range(pd.Timestamp(start).year, pd.Timestamp(end).year + 1):
+            bounds.update(zip(*self._sessions(exchange, year)))
+        opens = sorted(bounds)
+        return opens, [bounds[moment] for moment in opens]
+
+    def _locate(self, ticker, moment):
+        exchange = self.exchange(ticker)
+        if exchange not in ASIAN_EXCHANGES and exchange not in CALENDAR_CODES:
+            return None
+        moment = moment or get_provider().now()
+        stamp = to_micros(moment)
+        year = moment.astimezone(pytz.utc).year
+        opens, closes = self._sessions(exchange, year)
+        index = bisect_right(opens, stamp) - 1
+        if index >= 0 and stamp < closes[index]:
+            return True, closes[index] - stamp, closes[index] - stamp
+        if index + 1 < len(opens):
+            return False, opens[index + 1] - stamp, closes[index + 1] - stamp
+        opens, closes = self._sessions(exchange, year + 1)
+        index = bisect_right(opens, stamp)
+        if index < len(opens):
+            return False, opens[index] - stamp, closes[index] - stamp
+        return None
+
+    def is_open(self, ticker, moment=None):
+        located = self._locate(ticker, moment)
+        return bool(located and located[0])
+
+    def seconds_until_next_open(self, ticker, moment=None):
+        located = self._locate(ticker, moment)
+        if located is None:
+            return None
+        return 0.0 if located[0] else located[1] / 1_000_000
+
+    def seconds_until_next_close(self, ticker, moment=None):
+        located = self._locate(ticker, moment)
+        return located[2] / 1_000_000 if located else None
+
+    def state(self, ticker, moment=None):
+        located = self._locate(ticker, moment)
+        if located is None:
+            return False, None
+        return located[0], located[1] / 1_000_000
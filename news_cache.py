@@ -0,0 +1,128 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from sentiment import get_backend
+from instrumentation import count
+
+CACHE_PATH = "news_cache.db"
+TTL_SECONDS = 15 * 60
+MAX_TICKERS = 500
+MAX_SENTIMENTS = 50000
+QUERY_CHUNK = 500
+
+
+def headline_hash(headline, backend_name=""):
+    return hashlib.sha1(f"{backend_name}:{headline}".encode("utf-8")).hexdigest()
+
+
+class HeadlineCache:
+    def __init__(self, path=CACHE_PATH, ttl=TTL_SECONDS, max_tickers=MAX_TICKERS, max_sentiments=MAX_SENTIMENTS):
+        self.path = path
+        self.ttl = ttl
+        self.max_tickers = max_tickers
+        self.max_sentiments = max_sentiments
+        self.lock = threading.Lock()
+        self.conn = None
+        self.hits = 0
+        self.misses = 0
+        self.sentiment_hits = 0
+        self.sentiment_misses = 0
+
+    def _db(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("CREATE TABLE IF NOT EXISTS headlines "
+                              "(ticker TEXT PRIMARY KEY, fetched_at REAL, accessed_at REAL, items TEXT)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS sentiment "
+                              "(hash TEXT PRIMARY KEY, polarity REAL, accessed_at REAL)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS headlines_accessed ON headlines (accessed_at)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS sentiment_accessed ON sentiment (accessed_at)")
+        return self.conn
+
+    def get_news(self, ticker, fetch):
+        return self.get_many([ticker], lambda tickers: {t: fetch(t) for t in tickers})[ticker.strip().upper()]
+
+    def get_many(self, tickers, fetch_many):
+        tickers = [ticker.strip().upper() for ticker in tickers]
+        now = time.time()
+        results = {}
+        with self.lock:
+            db = self._db()
+            for ticker in tickers:
+                row = db.execute("SELECT fetched_at, items FROM headlines WHERE ticker = ?", (ticker,)).fetchone()
+                if row and now - row[0] < self.ttl:
+                    results[ticker] = json.loads(row[1])
+                    db.execute("UPDATE headlines SET accessed_at = ? WHERE ticker = ?", (now, ticker))
+            db.commit()
+            missing = [ticker for ticker in tickers if ticker not in results]
+            self.hits += len(tickers) - len(missing)
+            self.misses += len(missing)
+        count("news.cache_hit", len(tickers) - len(missing))
+        count("news.cache_miss", len(missing))
+        if missing:
+            fetched = fetch_many(missing)
+            with self.lock:
+                db = self._db()
+                db.executemany("INSERT OR REPLACE INTO headlines VALUES (?, ?, ?, ?)",
+                               [(ticker, now, now, json.dumps(items)) for ticker, items in fetched.items()])
+                db.execute("DELETE FROM headlines WHERE ticker NOT IN "
+                           "(SELECT ticker FROM headlines ORDER BY accessed_at DESC LIMIT ?)", (self.max_tickers,))
+                db.commit()
+            results.update(fetched)
+        return {ticker: results.get(ticker, []) for ticker in tickers}
+
+    def polarities(self, headlines, backend=None):
+        backend = backend or get_backend()
+        hashes = [headline_hash(headline, backend.name) for headline in headlines]
+        now = time.time()
+        known = {}
+        with self.lock:
+            db = self._db()
+            unique = list(set(hashes))
+            for i in range(0, len(unique), QUERY_CHUNK):
+                chunk = unique[i:i + QUERY_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                known.update(db.execute(f"SELECT hash, polarity FROM sentiment WHERE hash IN ({marks})", chunk))
+                db.execute(f"UPDATE sentiment SET accessed_at = ? WHERE hash IN ({marks})", [now] + chunk)
+        unscored = {}
+        for headline, key in zip(headlines, hashes):
+            if key not in known:
+                unscored.setdefault(key, headline)
+        missing = dict(zip(unscored, backend.score(list(unscored.values())))) if unscored else {}
+        count("sentiment.cache_hit", len(headlines) - len(missing))
+        count("sentiment.cache_miss", len(missing))
+        with self.lock:
+            self.sentiment_hits += len(headlines) - len(missing)
+            self.sentiment_misses += len(missing)
+            db = self._db()
+            if missing:
+                db.executemany("INSERT OR REPLACE INTO sentiment VALUES (?, ?, ?)",
+                               [(key, polarity, now) for key, polarity in missing.items()])
+                db.execute("DELETE FROM sentiment WHERE hash NOT IN "
+                           "(SELECT hash FROM sentiment ORDER BY accessed_at DESC LIMIT ?)", (self.max_sentiments,))
+            db.commit()
+        known.update(missing)
+        return [known[key] for key in hashes]
+
+    def stats(self):
+        with self.lock:
+            db = self._db()
+            tickers = db.execute("SELECT COUNT(*) FROM headlines").fetchone()[0]
+            sentiments = db.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "sentiment_hits": self.sentiment_hits,
+            "sentiment_misses": self.sentiment_misses,
+            "tickers": tickers,
+            "sentiments": sentiments,
+        }
+
+    def clear(self):
+        with self.lock:
+            db = self._db()
+            db.execute("DELETE FROM headlines")
+            db.execute("DELETE FROM sentiment")
+            db.commit()
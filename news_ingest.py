@@ -0,0 +1,257 @@
+import os
+import re
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from lazy import lazy_import
+from instrumentation import count
+requests = lazy_import("requests")
+requests_adapters = lazy_import("requests.adapters")
+urllib3_retry = lazy_import("urllib3.util.retry")
+bs4 = lazy_import("bs4")
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+BASE_URL = "https://finviz.com/quote.ashx?t={ticker}"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.6312.86 Safari/537.36"
+}
+WORKERS = 8
+RATE_PER_SECOND = 5
+TIMEOUT = 10
+RETRIES = 3
+BACKOFF = 0.5
+
+
+NEWS_TABLE_CLASS = "fullview-news-outer"
+NEWS_TABLE_CLASS_PATTERN = re.compile(rf"(^|\s){NEWS_TABLE_CLASS}(\s|$)")
+NEWS_TABLE_XPATH = f'//table[contains(concat(" ", normalize-space(@class), " "), " {NEWS_TABLE_CLASS} ")]'
+PARSE_MODES = ("full", "strainer", "fast")
+
+
+def news_item(timestamp, title, link):
+    return {
+        "link": link,
+        "title": title,
+        "snippet": "",
+        "date": timestamp,
+        "source": "Finviz"
+    }
+
+
+def parse_soup_table(table):
+    news_results = []
+    if table:
+        rows = table.find_all("tr")
+        for row in rows:
+            cells = row.find_all("td")
+            link_tag = cells[1].find("a") if len(cells) > 1 else None
+            if link_tag is None:
+                continue
+            news_results.append(news_item(cells[0].text.strip(), link_tag.text.strip(), link_tag["href"]))
+    return news_results
+
+
+def parse_lxml(html):
+    tree = lxml_html.fromstring(html)
+    news_results = []
+    for table in tree.xpath(NEWS_TABLE_XPATH)[:1]:
+        for row in table.iter("tr"):
+            cells = list(row.iter("td"))
+            link_tag = next(cells[1].iter("a"), None) if len(cells) > 1 else None
+            if link_tag is None:
+                continue
+            news_results.append(news_item(cells[0].text_content().strip(), link_tag.text_content().strip(),
+                                          link_tag.get("href")))
+    return news_results
+
+
+def parse_news_page(html, mode="fast"):
+    if mode == "fast" and lxml_html is not None:
+        return parse_lxml(html)
+    if mode == "full":
+        soup = bs4.BeautifulSoup(html, "html.parser")
+        return parse_soup_table(soup.find("table", class_=NEWS_TABLE_CLASS))
+    strainer = bs4.SoupStrainer("table", class_=NEWS_TABLE_CLASS_PATTERN)
+    soup = bs4.BeautifulSoup(html, "lxml" if lxml_html is not None else "html.parser", parse_only=strainer)
+    return parse_soup_table(soup.find("table", class_=NEWS_TABLE_CLASS))
+
+
+class RateLimiter:
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class NewsIngestor:
+    def __init__(self, base_url=BASE_URL, workers=WORKERS, rate=RATE_PER_SECOND, timeout=TIMEOUT,
+                 retries=RETRIES, backoff=BACKOFF, parse_mode="fast"):
+        self.base_url = base_url
+        self.parse_mode = parse_mode
+        self.workers = workers
+        self.rate = rate
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._session = None
+        self.limiters = {}
+        self.validators = {}
+        self.lock = threading.Lock()
+        self.pages = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+
+    @property
+    def session(self):
+        # built on first use so importing the scraper does not pull in requests
+        with self.lock:
+            if self._session is None:
+                session = requests.Session()
+                session.headers.update(HEADERS)
+                retry = urllib3_retry.Retry(total=self.retries, backoff_factor=self.backoff,
+                                            status_forcelist=(429, 500, 502, 503, 504),
+                                            allowed_methods=frozenset(["GET"]), respect_retry_after_header=True)
+                adapter = requests_adapters.HTTPAdapter(pool_connections=4, pool_maxsize=self.workers, max_retries=retry)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def _limiter(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.limiters:
+                self.limiters[host] = RateLimiter(self.rate)
+            return self.limiters[host]
+
+    def fetch_page(self, ticker):
+        url = self.base_url.format(ticker=ticker)
+        headers = {}
+        cached = self.validators.get(url)
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+        self._limiter(url).acquire()
+        count("network.news")
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached:
+            with self.lock:
+                self.pages += 1
+                self.not_modified += 1
+            return cached["body"]
+        response.raise_for_status()
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        with self.lock:
+            self.pages += 1
+            self.bytes += len(response.content)
+            if etag or last_modified:
+                self.validators[url] = {"etag": etag, "last_modified": last_modified, "body": response.text}
+        return response.text
+
+    def fetch_news(self, ticker):
+        return parse_news_page(self.fetch_page(ticker), self.parse_mode)
+
+    def fetch_many(self, tickers):
+        def fetch(ticker):
+            try:
+                return ticker, self.fetch_news(ticker)
+            except Exception as e:
+                with self.lock:
+                    self.errors += 1
+                print(f"ERROR {ticker}: {e}")
+                return ticker, None
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = {ticker: items for ticker, items in pool.map(fetch, tickers) if items is not None}
+        self.elapsed += time.perf_counter() - started
+        return results
+
+    def stats(self):
+        return {
+            "pages": self.pages,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "seconds": round(self.elapsed, 3),
+            "pages_per_second": round(self.pages / self.elapsed, 2) if self.elapsed else 0.0,
+        }
+
+
+class SavedPageHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def translate_path(self, path):
+        ticker = parse_qs(urlparse(path).query).get("t", [""])[0].upper()
+        return os.path.join(self.directory, f"{ticker}.html")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_pages(directory, port=8000):
+    handler = lambda *args, **kwargs: SavedPageHandler(*args, directory=directory, **kwargs)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    print(f"Serving saved pages from {directory} on http://127.0.0.1:{port}/quote.ashx?t={{ticker}}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-scrape Finviz headlines or serve saved pages locally")
+    parser.add_argument("tickers", nargs="*")
+    parser.add_argument("--file", help="text file with one ticker per line")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--rate", type=float, default=RATE_PER_SECOND, help="requests per second per host")
+    parser.add_argument("--save", help="directory to save the fetched pages in")
+    parser.add_argument("--serve", help="serve saved pages from this directory instead of fetching")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--parse-mode", choices=PARSE_MODES, default="fast")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve_pages(args.serve, args.port)
+    else:
+        tickers = [ticker.upper() for ticker in args.tickers]
+        if args.file:
+            with open(args.file, "r") as f:
+                tickers += [line.split(",")[0].strip().upper() for line in f if line.strip() and not line.startswith("#")]
+        ingestor = NewsIngestor(args.base_url, args.workers, args.rate, parse_mode=args.parse_mode)
+        if args.save:
+            os.makedirs(args.save, exist_ok=True)
+            fetch_page = ingestor.fetch_page
+
+            def save_page(ticker):
+                html = fetch_page(ticker)
+                with open(os.path.join(args.save, f"{ticker}.html"), "w", encoding="utf-8") as f:
+                    f.write(html)
+                return html
+            ingestor.fetch_page = save_page
+        results = ingestor.fetch_many(tickers)
+        for ticker, items in results.items():
+            print(f"{ticker}: {len(items)} headlines")
+        print(ingestor.stats())
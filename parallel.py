@@ -0,0 +1,161 @@
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+import stocks
+import screener
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+CHUNK_SIZE = 16
+
+block = {}
+
+
+def attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedBars:
+    def __init__(self, frames):
+        self.tickers = list(frames)
+        lengths = [len(frames[ticker]) for ticker in self.tickers]
+        self.offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self.rows = int(self.offsets[-1])
+        first = next(iter(frames.values()), None)
+        self.tz = str(first.index.tz) if first is not None and getattr(first.index, "tz", None) else None
+        self.shm = shared_memory.SharedMemory(create=True, size=max(self.rows * 8 * (1 + len(FIELDS)), 1))
+        timestamps, values = views(self.shm, self.rows)
+        for ticker, start, stop in zip(self.tickers, self.offsets[:-1], self.offsets[1:]):
+            data = frames[ticker]
+            index = data.index.tz_convert("UTC") if getattr(data.index, "tz", None) else data.index
+            timestamps[start:stop] = index.as_unit("ns").asi8
+            values[start:stop] = data[FIELDS].to_numpy(dtype=np.float64)
+
+    def spec(self):
+        return self.shm.name, self.rows, self.tz
+
+    def tasks(self):
+        return [(i, ticker, int(start), int(stop)) for i, (ticker, start, stop)
+                in enumerate(zip(self.tickers, self.offsets[:-1], self.offsets[1:]))]
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def views(shm, rows):
+    timestamps = np.ndarray((rows,), dtype=np.int64, buffer=shm.buf)
+    values = np.ndarray((rows, len(FIELDS)), dtype=np.float64, buffer=shm.buf, offset=rows * 8)
+    return timestamps, values
+
+
+def init_worker(name, rows, tz):
+    shm = attach(name)
+    block['shm'] = shm
+    block['views'] = views(shm, rows)
+    block['tz'] = tz
+
+
+def frame_from_block(start, stop):
+    timestamps, values = block['views']
+    index = pd.to_datetime(timestamps[start:stop], utc=block['tz'] is not None)
+    if block['tz'] is not None:
+        index = index.tz_convert(block['tz'])
+    return pd.DataFrame(values[start:stop], index=pd.Index(index, name='Datetime'), columns=FIELDS)
+
+
+def analyze_frame(ticker, data, degree, with_sentiment):
+    stocks.moving_averages(data)
+    result = {'Ticker': ticker, 'Trend': stocks.detect_trend(data)}
+    prices = data[['Open', 'High', 'Low', 'Close', 'Volume']]
+    trends = stocks.regression_trends(prices, (1, degree))
+    linear = trends[1]
+    result['LR Trend'] = float(linear.iloc[-1])
+    result['LR Slope'] = float(linear.iloc[-1] - linear.iloc[0]) / max(len(linear) - 1, 1)
+    result['Poly Trend'] = float(trends[degree].iloc[-1])
+    result['Sentiment'] = stocks.get_headlines_sentiment(ticker) if with_sentiment else None
+    return result
+
+
+def analyze_chunk(tasks, degree, with_sentiment):
+    results = []
+    for position, ticker, start, stop in tasks:
+        try:
+            result = analyze_frame(ticker, frame_from_block(start, stop), degree, with_sentiment)
+        except Exception as e:
+            result = {'Ticker': ticker, 'Error': str(e)}
+        results.append((position, result))
+    return results
+
+
+def map_shared(frames, chunk_func, *args, workers=None, chunksize=CHUNK_SIZE):
+    # chunk_func(tasks, *args) runs in the workers and reads its frames with frame_from_block
+    workers = workers or os.cpu_count()
+    shared = SharedBars(frames)
+    try:
+        tasks = shared.tasks()
+        chunks = [tasks[i:i + chunksize] for i in range(0, len(tasks), chunksize)]
+        results = [None] * len(tasks)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=shared.spec()) as pool:
+            futures = [pool.submit(chunk_func, chunk, *args) for chunk in chunks]
+            for future in futures:
+                for position, result in future.result():
+                    results[position] = result
+    finally:
+        shared.close()
+    return results
+
+
+def analyze_many(frames, workers=None, chunksize=CHUNK_SIZE, degree=3, with_sentiment=False):
+    frames = {ticker: data for ticker, data in frames.items() if not data.empty}
+    if not frames:
+        return pd.DataFrame()
+    return pd.DataFrame(map_shared(frames, analyze_chunk, degree, with_sentiment, workers=workers, chunksize=chunksize))
+
+
+def split_panel(panel):
+    frames = {}
+    for ticker in panel['Close'].columns:
+        data = panel.xs(ticker, axis=1, level=1)[FIELDS].dropna(subset=['Close'])
+        frames[ticker] = data
+    return frames
+
+
+def analyze_tickers(tickers, start_date, end_date, interval=None, workers=None, chunksize=CHUNK_SIZE,
+                    degree=3, with_sentiment=False):
+    tickers = [ticker.strip().upper() for ticker in tickers if ticker.strip()]
+    panel = screener.fetch_universe(tickers, interval or stocks.get_interval(), start_date, end_date)
+    if panel.empty:
+        return pd.DataFrame()
+    return analyze_many(split_panel(panel), workers, chunksize, degree, with_sentiment)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the per-ticker analysis across a process pool")
+    parser.add_argument("tickers", nargs="*")
+    parser.add_argument("--file", help="text file with one ticker per line")
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--interval")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--degree", type=int, default=3)
+    parser.add_argument("--sentiment", action="store_true")
+    parser.add_argument("--output", help="write the results to a CSV file")
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.file:
+        tickers += screener.read_tickers(args.file)
+    end_date = datetime.today()
+    start_date = (end_date - timedelta(days=args.days)).strftime('%Y-%m-%d')
+    results = analyze_tickers(tickers, start_date, end_date.strftime('%Y-%m-%d'), args.interval, args.workers,
+                              args.chunksize, args.degree, args.sentiment)
+    if args.output:
+        results.to_csv(args.output, index=False)
+    print(results.to_string(index=False))
@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import argparse
+from datetime import datetime
+import pandas as pd
+import pytz
+from lazy import lazy_import
+yf = lazy_import("yfinance")
+
+
+class DataProvider:
+    cached = False
+
+    def history(self, ticker, interval, start_date, end_date):
+        raise NotImplementedError
+
+    def history_many(self, tickers, interval, start_date, end_date):
+        frames = {}
+        for ticker in tickers:
+            data = self.history(ticker, interval, start_date, end_date)
+            if not data.empty:
+                frames[ticker.upper()] = data
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1)
+
+    def latest_quote(self, ticker):
+        raise NotImplementedError
+
+    def latest_quotes(self, tickers):
+        quotes = {}
+        for ticker in tickers:
+            price = self.latest_quote(ticker)
+            if price is not None:
+                quotes[ticker.upper()] = price
+        return quotes
+
+    def exchange(self, ticker):
+        raise NotImplementedError
+
+    def now(self):
+        return datetime.now(pytz.utc)
+
+
+class YFinanceProvider(DataProvider):
+    cached = True
+
+    def history(self, ticker, interval, start_date, end_date):
+        data = yf.Ticker(ticker).history(interval=interval, start=start_date, end=end_date)
+        if data.empty:
+            return data
+        data = data[['Open', 'High', 'Low', 'Close', 'Volume']].astype(float)
+        data.index.name = 'Datetime'
+        return data
+
+    def history_many(self, tickers, interval, start_date, end_date):
+        data = yf.download(list(tickers), interval=interval, start=start_date, end=end_date,
+                           group_by='column', threads=True, progress=False)
+        if data.empty:
+            return data
+        data = data[['Open', 'High', 'Low', 'Close', 'Volume']].astype(float)
+        data = data.dropna(axis=1, how='all')
+        data.index.name = 'Datetime'
+        return data
+
+    def latest_quote(self, ticker):
+        return self.latest_quotes([ticker]).get(ticker.upper())
+
+    def latest_quotes(self, tickers):
+        # one batched download of the live daily bar for every ticker, rather than a day of 1m bars each
+        data = yf.download(list(tickers), period="5d", interval="1d", group_by='column', threads=True,
+                           progress=False)
+        if data.empty:
+            return {}
+        close = data['Close']
+        if isinstance(close, pd.Series):
+            close = close.to_frame(tickers[0])
+        last = close.ffill().iloc[-1]
+        return {str(ticker).upper(): float(price) for ticker, price in last.items() if pd.notna(price)}
+
+    def exchange(self, ticker):
+        return yf.Ticker(ticker).info.get("exchange", "").upper()
+
+
+def read_frame(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    data = pd.read_csv(path, index_col=0)
+    data.index = pd.to_datetime(data.index, utc=True)
+    data.index.name = 'Datetime'
+    return data
+
+
+def find_file(directory, name):
+    for ext in ("parquet", "csv"):
+        path = os.path.join(directory, f"{name}.{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def before(data, moment):
+    tz = getattr(data.index, "tz", None)
+    moment = moment.tz_convert(tz) if tz is not None else moment.tz_convert(None)
+    return data[data.index <= moment]
+
+
+class ReplayProvider(DataProvider):
+    def __init__(self, directory, speed=None, start=None):
+        self.directory = directory
+        self.speed = speed
+        self.origin = pd.Timestamp(start, tz="UTC") if start is not None else None
+        self.started = time.monotonic()
+        self.frames = {}
+        self.exchanges = {}
+        path = os.path.join(directory, "exchanges.json")
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self.exchanges = json.load(f)
+
+    def _load(self, name):
+        if name not in self.frames:
+            path = find_file(self.directory, name)
+            self.frames[name] = read_frame(path) if path else None
+        return self.frames[name]
+
+    def quote_series(self, ticker):
+        quotes = self._load(f"{ticker}_quotes")
+        if quotes is not None:
+            return quotes['Price']
+        for interval in ("1m", "5m", "15m", "30m", "1h", "1d"):
+            bars = self._load(f"{ticker}_{interval}")
+            if bars is not None:
+                return bars['Close']
+        return None
+
+    def clock(self):
+        if self.speed is None or self.origin is None:
+            return None
+        return self.origin + pd.Timedelta(seconds=(time.monotonic() - self.started) * self.speed)
+
+    def now(self):
+        moment = self.clock()
+        return moment.floor("us").to_pydatetime() if moment is not None else super().now()
+
+    def history(self, ticker, interval, start_date, end_date):
+        data = self._load(f"{ticker.upper()}_{interval}")
+        if data is None:
+            return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        tz = getattr(data.index, "tz", None)
+        if tz is not None:
+            start, end = start.tz_localize(tz), end.tz_localize(tz)
+        data = data[(data.index >= start) & (data.index < end)]
+        moment = self.clock()
+        if moment is not None:
+            data = before(data, moment)
+        return data.copy()
+
+    def latest_quote(self, ticker):
+        quotes = self.quote_series(ticker.upper())
+        if quotes is None or quotes.empty:
+            return None
+        moment = self.clock()
+        if moment is not None:
+            quotes = before(quotes, moment)
+            if quotes.empty:
+                return None
+        return float(quotes.iloc[-1])
+
+    def exchange(self, ticker):
+        return self.exchanges.get(ticker.upper(), "").upper()
+
+
+def record(tickers, interval, start_date, end_date, directory, source=None):
+    source = source or YFinanceProvider()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "exchanges.json")
+    exchanges = {}
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            exchanges = json.load(f)
+    for ticker in tickers:
+        ticker = ticker.upper()
+        data = source.history(ticker, interval, start_date, end_date)
+        if data.empty:
+            print(f"No data for {ticker}")
+            continue
+        data.to_parquet(os.path.join(directory, f"{ticker}_{interval}.parquet"))
+        try:
+            exchanges[ticker] = source.exchange(ticker)
+        except Exception as e:
+            print(f"ERROR {e}")
+    with open(path, "w") as f:
+        json.dump(exchanges, f, indent=2)
+
+
+provider = YFinanceProvider()
+
+
+def get_provider():
+    return provider
+
+
+def set_provider(new_provider):
+    global provider
+    provider = new_provider
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record market data for the replay provider")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--dir", default="replay")
+    args = parser.parse_args()
+    record(args.tickers, args.interval, args.start, args.end, args.dir)
@@ -0,0 +1,315 @@
+import json
+import time
+import base64
+import argparse
+import threading
+from datetime import datetime
+import pytz
+from lazy import lazy_import
+from providers import ReplayProvider
+from instrumentation import count
+ws_client = lazy_import("websockets.sync.client")
+ws_server = lazy_import("websockets.sync.server")
+pricing_pb2 = lazy_import("yfinance.pricing_pb2")
+
+YAHOO_STREAM_URL = "wss://streamer.finance.yahoo.com/?version=2"
+POLL_MS = 50
+RECV_TIMEOUT = 1
+RESUBSCRIBE_SECONDS = 15
+RECONNECT_SECONDS = 5
+HOST = "127.0.0.1"
+PORT = 8765
+
+
+def decode_message(message):
+    # Yahoo's streamer wraps one base64 protobuf quote as {"message": ...}; the local stand-in sends JSON batches
+    # anything else (acknowledgements, heartbeats) carries no quotes
+    payload = json.loads(message)
+    if not isinstance(payload, dict):
+        return {}
+    if "message" in payload:
+        data = pricing_pb2.PricingData()
+        data.ParseFromString(base64.b64decode(payload["message"]))
+        return {data.id.upper(): float(data.price)} if data.id else {}
+    if "quotes" in payload:
+        return {ticker.upper(): float(price) for ticker, price in payload["quotes"].items()}
+    if "id" in payload and "price" in payload:
+        return {payload["id"].upper(): float(payload["price"])}
+    return {}
+
+
+class QuoteFeed:
+    # the shared last-quote table. Sources publish from any thread; with a Tk root, changes are coalesced to the
+    # latest price per ticker and handed to subscribers on the Tk thread, otherwise subscribers run on the publisher
+    def __init__(self, root=None, poll_ms=POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.lock = threading.Lock()
+        self.quotes = {}
+        self.callbacks = {}
+        self.pending = {}
+        self.sources = []
+        self.received = 0
+        self.changed = 0
+        self.coalesced = 0
+        self.delivered = 0
+        if root is not None:
+            root.after(poll_ms, self._poll)
+
+    def tickers(self):
+        with self.lock:
+            return sorted(self.callbacks)
+
+    def subscribe(self, ticker, callback):
+        ticker = ticker.strip().upper()
+        with self.lock:
+            callbacks = self.callbacks.setdefault(ticker, [])
+            added = not callbacks
+            callbacks.append(callback)
+        if added:
+            for source in list(self.sources):
+                source.watch([ticker])
+
+    def unsubscribe(self, ticker, callback):
+        ticker = ticker.strip().upper()
+        with self.lock:
+            callbacks = self.callbacks.get(ticker)
+            if callbacks is None:
+                return
+            if callback in callbacks:
+                callbacks.remove(callback)
+            removed = not callbacks
+            if removed:
+                del self.callbacks[ticker]
+                self.pending.pop(ticker, None)
+        if removed:
+            for source in list(self.sources):
+                source.forget([ticker])
+
+    def attach(self, source):
+        self.sources.append(source)
+        source.start(self)
+
+    def detach(self, source):
+        if source in self.sources:
+            self.sources.remove(source)
+        source.stop()
+
+    def close(self):
+        for source in list(self.sources):
+            self.detach(source)
+
+    def last(self, ticker, max_age=None):
+        with self.lock:
+            quote = self.quotes.get(ticker.strip().upper())
+        if quote is None or (max_age is not None and time.monotonic() - quote[1] > max_age):
+            return None
+        return quote[0]
+
+    def snapshot(self):
+        with self.lock:
+            return {ticker: price for ticker, (price, _) in self.quotes.items()}
+
+    def publish(self, quotes):
+        # returns the tickers whose price moved; unchanged quotes only refresh the table's timestamps
+        now = time.monotonic()
+        changes = {}
+        with self.lock:
+            self.received += len(quotes)
+            for ticker, price in quotes.items():
+                if price is None:
+                    continue
+                previous = self.quotes.get(ticker)
+                self.quotes[ticker] = (price, now)
+                if previous is None or previous[0] != price:
+                    changes[ticker] = price
+            self.changed += len(changes)
+            if self.root is not None:
+                self.coalesced += sum(1 for ticker in changes if ticker in self.pending)
+                self.pending.update(changes)
+                return changes
+        self._deliver(changes)
+        return changes
+
+    def _deliver(self, changes):
+        for ticker, price in changes.items():
+            with self.lock:
+                callbacks = list(self.callbacks.get(ticker, ()))
+                self.delivered += len(callbacks)
+            for callback in callbacks:
+                try:
+                    callback(price)
+                except Exception as e:
+                    print(f"ERROR {ticker}: {e}")
+
+    def _poll(self):
+        with self.lock:
+            changes, self.pending = self.pending, {}
+        self._deliver(changes)
+        self.root.after(self.poll_ms, self._poll)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "tickers": len(self.quotes),
+                "subscribed": len(self.callbacks),
+                "received": self.received,
+                "changed": self.changed,
+                "coalesced": self.coalesced,
+                "delivered": self.delivered,
+                "sources": [source.stats() for source in self.sources],
+            }
+
+
+class StreamSource:
+    # one websocket subscription for every watched ticker: Yahoo's streamer or the local stand-in from serve()
+    def __init__(self, url=YAHOO_STREAM_URL, reconnect=RECONNECT_SECONDS):
+        self.url = url
+        self.reconnect = reconnect
+        self.feed = None
+        self.socket = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.messages = 0
+        self.errors = 0
+
+    def start(self, feed):
+        self.feed = feed
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, name="quote-stream", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        with self.lock:
+            socket = self.socket
+        if socket is not None:
+            socket.close()
+
+    def watch(self, tickers):
+        self._send({"subscribe": list(tickers)})
+
+    def forget(self, tickers):
+        self._send({"unsubscribe": list(tickers)})
+
+    def connected(self):
+        with self.lock:
+            return self.socket is not None
+
+    def _send(self, payload):
+        with self.lock:
+            socket = self.socket
+        if socket is None or not payload.get("subscribe", payload.get("unsubscribe")):
+            return
+        try:
+            socket.send(json.dumps(payload))
+        except Exception as e:
+            print(f"ERROR {e}")
+
+    def _run(self):
+        while not self.stopped.is_set():
+            try:
+                with ws_client.connect(self.url) as socket:
+                    with self.lock:
+                        self.socket = socket
+                    self.watch(self.feed.tickers())
+                    renewed = time.monotonic()
+                    while not self.stopped.is_set():
+                        try:
+                            message = socket.recv(timeout=RECV_TIMEOUT)
+                        except TimeoutError:
+                            message = None
+                        if message is not None:
+                            self.messages += 1
+                            count("network.quote_messages")
+                            try:
+                                quotes = decode_message(message)
+                            except Exception as e:
+                                # one garbled message is not a reason to drop the connection
+                                print(f"ERROR {e}")
+                                quotes = {}
+                            self.feed.publish(quotes)
+                        # Yahoo drops subscriptions that are not renewed every so often
+                        if time.monotonic() - renewed > RESUBSCRIBE_SECONDS:
+                            self.watch(self.feed.tickers())
+                            renewed = time.monotonic()
+            except Exception as e:
+                if not self.stopped.is_set():
+                    self.errors += 1
+                    print(f"ERROR {e}")
+                    self.stopped.wait(self.reconnect)
+            finally:
+                with self.lock:
+                    self.socket = None
+
+    def stats(self):
+        return {"url": self.url, "connected": self.connected(), "messages": self.messages, "errors": self.errors}
+
+
+def replay_handler(provider, rate):
+    # each message carries the next recorded price of every subscribed ticker; series wrap so runs can be sustained
+    def handler(connection):
+        lock = threading.Lock()
+        series = {}
+
+        def listen():
+            for message in connection:
+                request = json.loads(message)
+                with lock:
+                    for ticker in request.get("subscribe", []):
+                        ticker = ticker.upper()
+                        if ticker not in series:
+                            prices = provider.quote_series(ticker)
+                            if prices is not None and not prices.empty:
+                                series[ticker] = prices.to_numpy(dtype=float)
+                    for ticker in request.get("unsubscribe", []):
+                        series.pop(ticker.upper(), None)
+
+        threading.Thread(target=listen, name="quote-replay-listen", daemon=True).start()
+        position = 0
+        next_at = time.monotonic()
+        try:
+            while True:
+                with lock:
+                    quotes = {ticker: prices[position % len(prices)] for ticker, prices in series.items()}
+                if quotes:
+                    connection.send(json.dumps({"time": datetime.now(pytz.utc).isoformat(), "quotes": quotes}))
+                    position += 1
+                if rate:
+                    next_at = max(next_at + 1 / rate, time.monotonic() - 1)
+                    time.sleep(max(next_at - time.monotonic(), 0))
+                elif not quotes:
+                    time.sleep(0.01)
+        except Exception:
+            return
+    return handler
+
+
+def replay_server(directory, host=HOST, port=PORT, rate=10):
+    return ws_server.serve(replay_handler(ReplayProvider(directory), rate), host, port)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream recorded quotes over a local websocket, or print a live feed")
+    parser.add_argument("tickers", nargs="*")
+    parser.add_argument("--serve", help="replay directory to stream quotes from")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--rate", type=float, default=10, help="messages per second, 0 for as fast as possible")
+    parser.add_argument("--url", default=YAHOO_STREAM_URL, help="stream to subscribe to when not serving")
+    args = parser.parse_args()
+
+    if args.serve:
+        with replay_server(args.serve, HOST, args.port, args.rate) as server:
+            print(f"streaming quotes from {args.serve} on ws://{HOST}:{args.port}")
+            server.serve_forever()
+    else:
+        feed = QuoteFeed()
+        for ticker in args.tickers:
+            feed.subscribe(ticker, lambda price, ticker=ticker.upper(): print(f"{ticker} {price:.4f}"))
+        feed.attach(StreamSource(args.url))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            feed.close()
@@ -0,0 +1,184 @@
+import time
+from datetime import timedelta
+from providers import get_provider
+from quote_feed import QuoteFeed
+from resample import INTERVAL_SECONDS
+import stocks
+
+TICK_MS = 250
+SAMPLES_PER_BAR = 720
+BACKOFF_LIMIT = 8
+MARKET_RECHECK_SECONDS = 300
+
+
+def latest_quotes(tickers):
+    return get_provider().latest_quotes(tickers)
+
+
+class Subscription:
+    def __init__(self):
+        self.callbacks = []
+        self.due = 0.0
+        self.market_open = None
+        self.session_until = None
+        self.session_pending = False
+        self.inflight = False
+        self.requested = False
+        self.last_price = None
+        self.unchanged = 0
+
+
+class RefreshScheduler:
+    def __init__(self, root, fetcher, period, interval=stocks.get_interval, enabled=lambda: True, on_session=None,
+                 fetch=latest_quotes, market_state=stocks.market_state, tick_ms=TICK_MS, feed=None):
+        self.root = root
+        self.fetcher = fetcher
+        self.market_state = market_state
+        self.period = period
+        self.interval = interval
+        self.enabled = enabled
+        self.on_session = on_session
+        self.fetch = fetch
+        self.tick_ms = tick_ms
+        # polled quotes land in the shared quote table, which notifies subscribers alongside any streamed quotes
+        self.feed = feed if feed is not None else QuoteFeed(root)
+        self.subscriptions = {}
+        self.issued = 0
+        self.polled = 0
+        self.skipped_streamed = 0
+        self.skipped_closed = 0
+        self.skipped_hidden = 0
+        self.coalesced = 0
+        self.unchanged = 0
+        self.root.after(self.tick_ms, self._tick)
+
+    def subscribe(self, ticker, callback):
+        ticker = ticker.strip().upper()
+        subscription = self.subscriptions.setdefault(ticker, Subscription())
+        subscription.callbacks.append(callback)
+        self.feed.subscribe(ticker, callback)
+        if subscription.market_open is not None and self.on_session:
+            self.on_session(ticker, subscription.market_open)
+
+    def unsubscribe(self, ticker, callback):
+        ticker = ticker.strip().upper()
+        subscription = self.subscriptions.get(ticker)
+        if subscription is None:
+            return
+        if callback in subscription.callbacks:
+            subscription.callbacks.remove(callback)
+            self.feed.unsubscribe(ticker, callback)
+        if not subscription.callbacks:
+            del self.subscriptions[ticker]
+
+    def request(self, ticker):
+        subscription = self.subscriptions.get(ticker.strip().upper())
+        if subscription is None:
+            return
+        if subscription.inflight or subscription.requested:
+            self.coalesced += 1
+        subscription.requested = True
+        subscription.due = 0.0
+
+    def cadence(self, subscription):
+        bar_seconds = INTERVAL_SECONDS.get(self.interval(), 3600)
+        seconds = max(self.period(), bar_seconds / SAMPLES_PER_BAR)
+        return seconds * min(2 ** subscription.unchanged, BACKOFF_LIMIT)
+
+    def _check_session(self, ticker, subscription):
+        subscription.session_pending = True
+        self.fetcher.submit(("market_state", ticker), self.market_state, ticker,
+                            on_done=lambda state: self._session(ticker, state),
+                            on_error=lambda error: self._session(ticker, (False, None)))
+
+    def _session(self, ticker, state):
+        subscription = self.subscriptions.get(ticker)
+        if subscription is None:
+            return
+        market_open, seconds = state
+        if market_open and not subscription.market_open:
+            subscription.due = 0.0
+        subscription.market_open = market_open
+        subscription.session_pending = False
+        wait = seconds if seconds is not None else MARKET_RECHECK_SECONDS
+        subscription.session_until = get_provider().now() + timedelta(seconds=wait)
+        if self.on_session:
+            self.on_session(ticker, market_open)
+
+    def _tick(self):
+        now = time.monotonic()
+        clock = None
+        due = []
+        for ticker, subscription in list(self.subscriptions.items()):
+            if subscription.session_pending:
+                continue
+            if subscription.session_until is not None:
+                clock = clock or get_provider().now()
+            if subscription.market_open is None or clock >= subscription.session_until:
+                self._check_session(ticker, subscription)
+                continue
+            if subscription.inflight or now < subscription.due:
+                continue
+            if subscription.requested:
+                due.append(ticker)
+            elif not self.enabled():
+                continue
+            elif self.feed.last(ticker, max_age=self.cadence(subscription)) is not None:
+                # a stream delivered this ticker more recently than a poll would
+                self.skipped_streamed += 1
+                subscription.due = now + self.cadence(subscription)
+            elif not subscription.market_open:
+                self.skipped_closed += 1
+                subscription.due = now + MARKET_RECHECK_SECONDS
+            elif not self.root.winfo_viewable():
+                self.skipped_hidden += 1
+                subscription.due = now + self.cadence(subscription)
+            else:
+                due.append(ticker)
+        if due:
+            self._issue(due)
+        self.root.after(self.tick_ms, self._tick)
+
+    def _issue(self, tickers):
+        # every ticker due on this tick shares one batched quote request
+        for ticker in tickers:
+            subscription = self.subscriptions[ticker]
+            subscription.inflight = True
+            subscription.requested = False
+        self.issued += 1
+        self.polled += len(tickers)
+        self.fetcher.submit(("quotes", tuple(tickers)), self.fetch, tickers,
+                            on_done=lambda quotes: self._quotes(tickers, quotes),
+                            on_error=lambda error: self._quotes(tickers, {}, error))
+
+    def _quotes(self, tickers, quotes, error=None):
+        if error is not None:
+            print(f"ERROR {', '.join(tickers)}: {error}")
+        changes = self.feed.publish({ticker: quotes.get(ticker) for ticker in tickers})
+        for ticker in tickers:
+            subscription = self.subscriptions.get(ticker)
+            if subscription is None:
+                continue
+            subscription.inflight = False
+            if ticker not in changes:
+                subscription.unchanged += 1
+                self.unchanged += 1
+            else:
+                subscription.unchanged = 0
+                subscription.last_price = changes[ticker]
+            delay = 0.0 if subscription.requested else self.cadence(subscription)
+            subscription.due = time.monotonic() + delay
+
+    def stats(self):
+        skipped = self.skipped_closed + self.skipped_hidden + self.skipped_streamed + self.coalesced
+        return {
+            "issued": self.issued,
+            "polled": self.polled,
+            "skipped_streamed": self.skipped_streamed,
+            "skipped": skipped,
+            "skipped_closed": self.skipped_closed,
+            "skipped_hidden": self.skipped_hidden,
+            "coalesced": self.coalesced,
+            "unchanged": self.unchanged,
+            "subscriptions": len(self.subscriptions),
+        }
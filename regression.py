@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+ORDINAL_EPOCH = 719163
+EPOCH = pd.Timestamp("1970-01-01")
+DAY = pd.Timedelta(days=1)
+RANK_TOLERANCE = 1e-10
+
+
+def ordinal_days(dates):
+    # vectorized datetime.toordinal(): the calendar day in the timestamps' own timezone
+    index = pd.DatetimeIndex(dates)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return ((index.normalize() - EPOCH) // DAY).to_numpy(dtype=float) + ORDINAL_EPOCH
+
+
+def axis_scaling(x):
+    low, high = float(np.min(x)), float(np.max(x))
+    return (low + high) / 2, (high - low) / 2 or 1.0
+
+
+def design(t, degree):
+    return np.vander(np.asarray(t, dtype=float), degree + 1, increasing=True)
+
+
+def solve_triangular(r, b):
+    diagonal = np.abs(np.diag(r))
+    if diagonal.min() <= RANK_TOLERANCE * diagonal.max():
+        return None
+    return np.linalg.solve(r, b)
+
+
+class PolyFit:
+    def __init__(self, coef, center, scale):
+        self.coef = coef
+        self.center = center
+        self.scale = scale
+
+    @property
+    def degree(self):
+        return len(self.coef) - 1
+
+    def predict(self, x):
+        t = (np.asarray(x, dtype=float) - self.center) / self.scale
+        values = np.polynomial.polynomial.polyval(t, self.coef)
+        return values.T if values.ndim > 1 else values
+
+
+def fit(x, y, degrees=1):
+    # one QR of the highest-degree design serves every lower degree: its leading columns are the lower designs.
+    # y may be 2-D (bars x series) to fit several series that share a time axis at once
+    single = np.isscalar(degrees)
+    degrees = [int(degrees)] if single else [int(degree) for degree in degrees]
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    center, scale = axis_scaling(x)
+    a = design((x - center) / scale, max(degrees))
+    q, r = np.linalg.qr(a)
+    qty = q.T @ y
+    fits = {}
+    for degree in degrees:
+        size = degree + 1
+        coef = solve_triangular(r[:size, :size], qty[:size]) if size <= len(x) else None
+        if coef is None:
+            coef = np.linalg.lstsq(a[:, :size], y, rcond=None)[0]
+        fits[degree] = PolyFit(coef, center, scale)
+    return fits[degrees[0]] if single else fits
+
+
+def fit_many(xs, ys, degree=1):
+    # independent series of any length in one batched solve of the normal equations on scaled axes
+    count = max(len(x) for x in xs)
+    size = degree + 1
+    t = np.zeros((len(xs), count))
+    values = np.zeros((len(xs), count))
+    weights = np.zeros((len(xs), count))
+    scaling = []
+    for row, (x, y) in enumerate(zip(xs, ys)):
+        x = np.asarray(x, dtype=float)
+        center, scale = axis_scaling(x)
+        scaling.append((center, scale))
+        t[row, :len(x)] = (x - center) / scale
+        values[row, :len(x)] = y
+        weights[row, :len(x)] = 1.0
+    a = np.ones((len(xs), count, size))
+    a[..., 1:] = t[..., None]
+    np.multiply.accumulate(a, axis=2, out=a)
+    weighted = np.swapaxes(a * weights[..., None], 1, 2)
+    xtx = weighted @ a
+    xty = (weighted @ values[..., None])[..., 0]
+    try:
+        coefs = np.linalg.solve(xtx, xty[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        coefs = np.array([np.linalg.lstsq(m, v, rcond=None)[0] for m, v in zip(xtx, xty)])
+    return [PolyFit(coef, center, scale) for coef, (center, scale) in zip(coefs, scaling)]
+
+
+class IncrementalFit:
+    def __init__(self, degree, x, y):
+        x = np.asarray(x, dtype=float)
+        self.degree = degree
+        self.center, self.scale = axis_scaling(x)
+        a = design((x - self.center) / self.scale, degree)
+        y = np.asarray(y, dtype=float)
+        self.xtx = a.T @ a
+        self.xty = a.T @ y
+        self.count = len(x)
+        self.last_row = a[-1] if len(x) else None
+        self.last_y = float(y[-1]) if len(y) else None
+
+    def _row(self, x):
+        return design([(x - self.center) / self.scale], self.degree)[0]
+
+    def update(self, x, y):
+        row = self._row(x)
+        self.xtx += np.outer(row, row)
+        self.xty += row * y
+        self.count += 1
+        self.last_row, self.last_y = row, y
+        return self.coefficients()
+
+    def revise(self, y, x=None):
+        # a live tick changes the close of the bar already counted, so only its contribution is swapped
+        if self.last_row is None:
+            return self.update(x, y)
+        row = self.last_row if x is None else self._row(x)
+        if x is not None:
+            self.xtx += np.outer(row, row) - np.outer(self.last_row, self.last_row)
+        self.xty += row * y - self.last_row * self.last_y
+        self.last_row, self.last_y = row, y
+        return self.coefficients()
+
+    def coefficients(self):
+        try:
+            return np.linalg.solve(self.xtx, self.xty)
+        except np.linalg.LinAlgError:
+            return np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+
+    def fit(self):
+        return PolyFit(self.coefficients(), self.center, self.scale)
+
+    def predict(self, x):
+        return self.fit().predict(x)
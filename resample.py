@@ -0,0 +1,141 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from instrumentation import span, count
+from compact import CompactBars
+from bar_cache import to_day
+
+INTERVAL_SECONDS = {"1m": 60, "5m": 300, "15m": 900, "30m": 1800, "1h": 3600, "1d": 86400}
+DAY_SECONDS = 86400
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+MEMO_SIZE = 64
+TAIL_BARS = 512
+
+
+def bar_arrays(data):
+    if isinstance(data, CompactBars):
+        return data.times, {name: data.column(name).astype(float) for name in FIELDS}, data.tz
+    index = pd.DatetimeIndex(data.index)
+    columns = {name: data[name].to_numpy(dtype=float) if name in data else np.full(len(data), np.nan)
+               for name in FIELDS}
+    return index.as_unit('ns').asi8, columns, index.tz
+
+
+def tail_digest(data):
+    # tail refreshes revise the newest bars in place, which neither the length nor the last timestamp shows
+    tail = np.asarray(data['Close']).ravel()[-TAIL_BARS:].astype(float)
+    return hash(tail.tobytes())
+
+
+def session_anchors(times, tz, bounds=None):
+    # the open of the session each bar belongs to (UTC ns), -1 for bars outside every session
+    if bounds is not None:
+        opens = np.asarray(bounds[0], dtype=np.int64) * 1000
+        closes = np.asarray(bounds[1], dtype=np.int64) * 1000
+        position = np.maximum(np.searchsorted(opens, times, 'right') - 1, 0)
+        inside = (times >= opens[position]) & (times < closes[position]) if len(opens) else np.zeros(len(times), bool)
+        return np.where(inside, opens[position] if len(opens) else 0, -1)
+    # no calendar for the exchange: every local calendar day opens at its first bar
+    local = pd.DatetimeIndex(times.view('datetime64[ns]')).tz_localize("UTC")
+    days = (local.tz_convert(tz) if tz is not None else local).normalize().asi8
+    first = np.ones(len(times), dtype=bool)
+    first[1:] = days[1:] != days[:-1]
+    return times[np.maximum.accumulate(np.where(first, np.arange(len(times)), 0))]
+
+
+def resample(data, interval, bounds=None):
+    # coarser OHLCV from finer bars in one pass: bins start at the session open, like the exchange's own bars
+    times, columns, tz = bar_arrays(data)
+    anchors = session_anchors(times, tz, bounds)
+    keep = (anchors >= 0) & ~np.isnan(columns['Close'])
+    times, anchors = times[keep], anchors[keep]
+    columns = {name: values[keep] for name, values in columns.items()}
+    if INTERVAL_SECONDS[interval] >= DAY_SECONDS:
+        keys = anchors
+    else:
+        step = np.int64(INTERVAL_SECONDS[interval]) * 1_000_000_000
+        keys = anchors + (times - anchors) // step * step
+    if not len(keys):
+        return pd.DataFrame(columns=FIELDS)
+    starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+    ends = np.append(starts[1:], len(keys)) - 1
+    close = columns['Close']
+    high = np.where(np.isnan(columns['High']), close, columns['High'])
+    low = np.where(np.isnan(columns['Low']), close, columns['Low'])
+    opens = np.where(np.isnan(columns['Open']), close, columns['Open'])
+    labels = pd.DatetimeIndex(keys[starts].view('datetime64[ns]')).tz_localize("UTC")
+    labels = labels.tz_convert(tz) if tz is not None else labels.tz_localize(None)
+    if INTERVAL_SECONDS[interval] >= DAY_SECONDS:
+        labels = labels.normalize()
+    result = pd.DataFrame({
+        'Open': opens[starts],
+        'High': np.maximum.reduceat(high, starts),
+        'Low': np.minimum.reduceat(low, starts),
+        'Close': close[ends],
+        'Volume': np.add.reduceat(np.nan_to_num(columns['Volume']), starts),
+    }, index=labels.rename('Datetime'))
+    return CompactBars.from_frame(result) if isinstance(data, CompactBars) else result
+
+
+class Resampler:
+    def __init__(self, bars, sessions, memo_size=MEMO_SIZE):
+        self.bars = bars
+        self.sessions = sessions
+        self.memo_size = memo_size
+        self.memo = OrderedDict()
+        self.lock = threading.Lock()
+        self.derived = 0
+        self.reused = 0
+
+    def covers(self, ticker, interval, start):
+        frame, meta = self.bars.load(ticker, interval)
+        return meta is not None and frame is not None and pd.Timestamp(meta["start"]) <= start
+
+    def source_for(self, ticker, interval, start):
+        # the interval's own history wins; otherwise the coarsest cached finer interval that divides it evenly
+        seconds = INTERVAL_SECONDS.get(interval)
+        if seconds is None or self.covers(ticker, interval, start):
+            return None
+        for name, size in sorted(INTERVAL_SECONDS.items(), key=lambda item: -item[1]):
+            if size < seconds and size < DAY_SECONDS and seconds % size == 0 and self.covers(ticker, name, start):
+                return name
+        return None
+
+    def bounds(self, ticker, start, end):
+        try:
+            return self.sessions.session_bounds(ticker, start, end) if self.sessions is not None else None
+        except Exception as e:
+            print(f"ERROR {e}")
+            return None
+
+    def get(self, ticker, interval, start_date, end_date):
+        ticker = ticker.strip().upper()
+        start, end = to_day(start_date), to_day(end_date)
+        source = self.source_for(ticker, interval, start)
+        if source is None:
+            return self.bars.get(ticker, interval, start_date, end_date)
+        # the finer history may still need its tail topped up, which is far smaller than a new coarse download
+        data = self.bars.get(ticker, source, start_date, end_date)
+        if data.empty:
+            return self.bars.get(ticker, interval, start_date, end_date)
+        key = (ticker, interval, source, start, end, len(data), data.index[-1], tail_digest(data))
+        with self.lock:
+            if key in self.memo:
+                self.memo.move_to_end(key)
+                self.reused += 1
+                result = self.memo[key]
+                return result if isinstance(result, CompactBars) else result.copy()
+        with span("resample"):
+            result = resample(data, interval, self.bounds(ticker, start, end))
+        count("bars.resampled")
+        with self.lock:
+            self.derived += 1
+            self.memo[key] = result
+            while len(self.memo) > self.memo_size:
+                self.memo.popitem(last=False)
+        return result if isinstance(result, CompactBars) else result.copy()
+
+    def stats(self):
+        with self.lock:
+            return {"derived": self.derived, "reused": self.reused, "memoized": len(self.memo)}
@@ -0,0 +1,107 @@
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import stocks
+import indicators
+from providers import get_provider
+
+BATCH_SIZE = 200
+
+
+def fetch_universe(tickers, interval, start_date, end_date, batch_size=BATCH_SIZE):
+    provider = get_provider()
+    panels = []
+    for i in range(0, len(tickers), batch_size):
+        panel = provider.history_many(tickers[i:i + batch_size], interval, start_date, end_date)
+        if not panel.empty:
+            panels.append(panel)
+    if not panels:
+        return pd.DataFrame()
+    return pd.concat(panels, axis=1).sort_index()
+
+
+def last_valid(frame, mask):
+    values = frame.to_numpy()
+    rows = len(values) - 1 - np.argmax(mask[::-1], axis=0)
+    found = mask.any(axis=0)
+    picked = values[rows, np.arange(values.shape[1])]
+    return np.where(found, picked, np.nan)
+
+
+def sentiment_norms(tickers):
+    news = stocks.get_news_many(tickers)
+    stocks.headline_cache.polarities([item['title'] for items in news.values() for item in items])
+    ratings = [stocks.get_headlines_sentiment(ticker, news[ticker]) for ticker in tickers]
+    return np.array([(rating - 5) / 5 if rating is not None else 0.0 for rating in ratings])
+
+
+def score_panel(panel, with_sentiment=False):
+    close = panel['Close']
+    frame = indicators.IndicatorFrame(panel)
+    columns = [close, frame.ma[20], frame.ma[50], frame.middle_band, frame.upper_band, frame.lower_band,
+               frame.rsi, frame.macd, frame.macd_signal]
+    mask = np.logical_and.reduce([column.notna().to_numpy() for column in columns])
+    latest = [last_valid(column, mask) for column in columns]
+    close_price, ma_short, ma_long, middle, upper, lower, rsi_value, macd_value, signal_value = latest
+
+    rsi_norm, macd_norm, bollinger_norm = stocks.indicator_norms(
+        rsi_value, macd_value, signal_value, close_price, middle, upper, lower)
+    tickers = list(close.columns)
+    sentiment_norm = sentiment_norms(tickers) if with_sentiment else np.zeros(len(tickers))
+    score = stocks.total_score(rsi_norm, macd_norm, sentiment_norm)
+
+    bars = close.notna().sum().to_numpy()
+    trend = np.where(ma_short > ma_long, "Bullish", np.where(ma_short < ma_long, "Bearish", "Sideways"))
+    trend = np.where(bars < 50, "Not enough data", trend)
+
+    result = pd.DataFrame({
+        'Ticker': tickers,
+        'RSI Norm': rsi_norm,
+        'MACD Norm': macd_norm,
+        'Bollinger Position Norm': bollinger_norm,
+        'Sentiment Norm': sentiment_norm,
+        'Total Score': score,
+        'Trend': trend,
+        'Action': np.where(score >= 0, "BUY", "SHORT"),
+    })
+    result = result.dropna(subset=['Total Score'])
+    return result.sort_values('Total Score', ascending=False).reset_index(drop=True)
+
+
+def screen(tickers, start_date, end_date, interval=None, with_sentiment=False):
+    tickers = [ticker.strip().upper() for ticker in tickers if ticker.strip()]
+    interval = interval or stocks.get_interval()
+    panel = fetch_universe(tickers, interval, start_date, end_date)
+    if panel.empty:
+        return pd.DataFrame()
+    return score_panel(panel, with_sentiment)
+
+
+def read_tickers(path):
+    with open(path, "r") as f:
+        return [line.split(",")[0].strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score and rank a universe of tickers")
+    parser.add_argument("tickers", nargs="*")
+    parser.add_argument("--file", help="text file with one ticker per line")
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--interval")
+    parser.add_argument("--sentiment", action="store_true")
+    parser.add_argument("--top", type=int, default=0)
+    parser.add_argument("--output", help="write the ranked table to a CSV file")
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.file:
+        tickers += read_tickers(args.file)
+    end_date = datetime.today()
+    start_date = (end_date - timedelta(days=args.days)).strftime('%Y-%m-%d')
+    ranked = screen(tickers, start_date, end_date.strftime('%Y-%m-%d'), args.interval, args.sentiment)
+    if args.top:
+        ranked = ranked.head(args.top)
+    if args.output:
+        ranked.to_csv(args.output, index=False)
+    print(ranked.to_string(index=False))
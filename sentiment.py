@@ -0,0 +1,259 @@
+import re
+import numpy as np
+import pandas as pd
+
+NEGATIONS = ("no", "not", "n't", "never")
+MODIFIER_TAG = "RB"
+EXCLAMATION_BOOST = 1.25
+NEGATION_FACTOR = -0.5
+SARCASM = "(!)"
+SEPARATOR = "\ue000"
+BOUNDARY = "\n"
+EOS = "END-OF-SENTENCE"
+# a sentence ends at the last of a run of these tokens, as long as the run holds a terminator; TextBlob checks quote
+# balance against a sentence it has not filled yet, so plain quotes never extend a run
+TERMINATORS = ("...", ".", "!", "?", EOS)
+TRAILING = TERMINATORS + ("”", "’", ")")
+
+
+class SentimentBackend:
+    name = "base"
+
+    def score(self, headlines):
+        raise NotImplementedError
+
+
+class TextBlobBackend(SentimentBackend):
+    name = "textblob"
+
+    def score(self, headlines):
+        from textblob import TextBlob
+        return [TextBlob(headline).sentiment.polarity for headline in headlines]
+
+
+def load_lexicon():
+    from textblob.en import sentiment as lexicon
+    lexicon.load()
+    words, polarity, intensity, modifier = [], [], [], []
+    for word, tags in lexicon.items():
+        if " " in word or None not in tags:
+            continue
+        p, s, i = tags[None]
+        words.append(word)
+        polarity.append(p)
+        intensity.append(i)
+        modifier.append(MODIFIER_TAG in tags)
+    return words, np.array(polarity), np.array(intensity), np.array(modifier)
+
+
+def load_emoticons():
+    from textblob._text import EMOTICONS
+    emoticons = {SARCASM: 0.0}
+    for (mood, polarity), faces in EMOTICONS.items():
+        for face in faces:
+            emoticons.setdefault(face.lower(), polarity)
+    return emoticons
+
+
+class Tokenizer:
+    # TextBlob's find_tokens for a whole batch. Text-wide substitutions run once over the joined batch, each
+    # distinct whitespace-separated chunk is split into tokens once, and emoticons are re-joined over the token
+    # stream with a line break at every sentence end so that, like TextBlob, none spans two sentences.
+    def __init__(self):
+        from textblob._text import (PUNCTUATION, ABBREVIATIONS, RE_ABBR1, RE_ABBR2, RE_ABBR3, EMOTICONS,
+                                    RE_EMOTICONS, RE_SARCASM, replacements)
+        self.marks = PUNCTUATION
+        self.punctuation = tuple(PUNCTUATION.replace(".", ""))
+        self.abbreviations = ABBREVIATIONS
+        self.abbreviation_patterns = (RE_ABBR1, RE_ABBR2, RE_ABBR3)
+        self.replacements = replacements
+        self.sarcasm = RE_SARCASM
+        # every face starts with one of a few characters; checking that first keeps the long alternation cheap
+        first = "".join(sorted({re.escape(face[0]) for faces in EMOTICONS.values() for face in faces}))
+        self.emoticons = re.compile(f"(?=[{first}]){RE_EMOTICONS.pattern}")
+
+    def split(self, chunk):
+        tokens, tail = [], []
+        while chunk.startswith(self.punctuation) and chunk not in self.replacements:
+            tokens.append(chunk[0])
+            chunk = chunk[1:]
+        while chunk.endswith(self.punctuation + (".",)) and chunk not in self.replacements:
+            if chunk.endswith(self.punctuation):
+                tail.append(chunk[-1])
+                chunk = chunk[:-1]
+            if chunk.endswith("..."):
+                tail.append("...")
+                chunk = chunk[:-3].rstrip(".")
+            if chunk.endswith("."):
+                if chunk in self.abbreviations or any(pattern.match(chunk) for pattern in self.abbreviation_patterns):
+                    break
+                tail.append(chunk[-1])
+                chunk = chunk[:-1]
+        if chunk:
+            tokens.append(chunk)
+        return tokens + tail[::-1]
+
+    def tokens(self, headlines):
+        # lower-cased tokens of every headline, with SEPARATOR between headlines
+        text = f" {SEPARATOR} ".join(headlines)
+        for contraction, spaced in self.replacements.items():
+            text = text.replace(contraction, spaced)
+        for quote in "“”‘’'\"":
+            text = text.replace(quote, f" {quote} ")
+        text = re.sub(r"\n{2,}", f" {EOS} ", text.replace("\r\n", "\n"))
+        chunks, distinct = pd.factorize(np.array(text.split(), dtype=object))
+        parts = [self.split(chunk) for chunk in distinct]
+        lengths = np.array([len(part) for part in parts], dtype=np.int64)
+        flat = np.array([token for part in parts for token in part], dtype=object)
+        counts = lengths[chunks]
+        ends = np.cumsum(counts)
+        positions = np.repeat(np.cumsum(lengths)[chunks] - lengths[chunks] - ends + counts, counts)
+        tokens = flat[positions + np.arange(len(positions))]
+        kinds, names = pd.factorize(tokens)
+        trailing = np.isin(names, TRAILING)[kinds]
+        run = np.cumsum(~trailing)
+        closes = np.bincount(run[np.isin(names, TERMINATORS)[kinds]], minlength=run[-1] + 1 if len(run) else 1) > 0
+        last = trailing & ~np.append(trailing[1:], False) & closes[run]
+        tokens = np.insert(tokens, np.flatnonzero(last) + 1, BOUNDARY)
+        text = " ".join(tokens[tokens != EOS].tolist())
+        text = self.sarcasm.sub(SARCASM, text)
+        text = self.emoticons.sub(lambda match: match.group(1).replace(" ", "") + match.group(2), text)
+        return text.lower().split()
+
+
+def previous_index(mask):
+    # index of the last position strictly before each position where mask is set, or -1
+    positions = np.maximum.accumulate(np.where(mask, np.arange(len(mask)), -1))
+    return np.concatenate(([-1], positions[:-1]))
+
+
+class LexiconBackend(SentimentBackend):
+    # Vectorized port of TextBlob's pattern analyzer. The whole batch is tokenized in one pass,
+    # tokens are mapped to lexicon ids once per distinct token, and the modifier/negation state machine
+    # is resolved with prefix scans over the token stream instead of a per-word loop.
+    name = "lexicon"
+
+    def __init__(self):
+        self.words = None
+
+    def _load(self):
+        words, self.polarity, self.intensity, self.modifier = load_lexicon()
+        self.adverb = np.array([word.endswith("ly") for word in words])
+        self.words = {word: index for index, word in enumerate(words)}
+        self.emoticons = load_emoticons()
+        self.tokenizer = Tokenizer()
+
+    def _face(self, token):
+        # TextBlob only looks up short tokens that are neither words nor a run of its punctuation marks
+        if token == SARCASM or not token.isalpha() and len(token) <= 5 and token not in self.tokenizer.marks:
+            return self.emoticons.get(token, np.nan)
+        return np.nan
+
+    def _vocabulary(self, tokens):
+        ids = np.array([self.words.get(token, -1) for token in tokens], dtype=np.int64)
+        polarity = np.array([self._face(token) for token in tokens])
+        lengths = np.array([len(token) for token in tokens])
+        stripped = np.array([len(token.strip("'")) for token in tokens])
+        known = ids >= 0
+        negation = np.isin(tokens, NEGATIONS) & ~known
+        return {
+            "id": ids,
+            "face": polarity,
+            "length": lengths,
+            "known": known,
+            "negation": negation,
+            "emoticon": ~np.isnan(polarity) & ~known,
+            "exclamation": tokens == "!",
+            "boundary": tokens == SEPARATOR,
+            "clears_negation": ~known & ~negation & (stripped > 1),
+            "clears_modifier": ~known & ~negation & (lengths > 2),
+        }
+
+    def score(self, headlines):
+        if self.words is None:
+            self._load()
+        count = len(headlines)
+        if not count:
+            return []
+        inverse, tokens = pd.factorize(np.array(self.tokenizer.tokens(headlines) + [SEPARATOR], dtype=object))
+        vocabulary = self._vocabulary(tokens)
+        relevant = np.zeros(len(tokens), dtype=bool)
+        for flag in ("known", "negation", "emoticon", "exclamation", "clears_negation", "clears_modifier"):
+            relevant |= vocabulary[flag]
+        headline = np.cumsum(vocabulary["boundary"][inverse])
+        events = np.flatnonzero(relevant[inverse])
+        token = inverse[events]
+        headline = headline[events]
+        word = vocabulary["id"][token]
+        known, negation, emoticon = vocabulary["known"][token], vocabulary["negation"][token], vocabulary["emoticon"][token]
+        modifier = known & self.modifier[word]
+        adverb = known & self.adverb[word]
+
+        # a modifier stays active until the next known word or long unknown word; a negation right after
+        # an "-ly" modifier negates that assessment, any other long negation ends the modifier
+        before = previous_index(known | vocabulary["clears_modifier"][token])
+        source = np.maximum(before, 0)
+        long_negation = previous_index(negation & (vocabulary["length"][token] > 2))
+        modified = ((before >= 0) & (headline[source] == headline) & modifier[source]
+                    & (adverb[source] | (long_negation < before)))
+        consumed = negation & modified & adverb[source]
+        pending = negation & ~consumed
+        before = previous_index(known | negation | vocabulary["clears_negation"][token])
+        source = np.maximum(before, 0)
+        negated = known & (before >= 0) & (headline[source] == headline) & pending[source]
+
+        # known words outside a modifier chain and emoticons each open an assessment
+        opens = (known & ~modified) | emoticon
+        chains = int(opens.sum())
+        if not chains:
+            return [0.0] * count
+        assessment = np.cumsum(opens) - 1
+        members = known | emoticon
+        polarity = np.where(known, self.polarity[word], vocabulary["face"][token])[members]
+        intensity = np.where(known, self.intensity[word], 1.0)[members]
+        inverted = np.divide(1.0, intensity, out=np.ones_like(intensity), where=intensity != 0)
+        intensity = np.where(negated[members], inverted, intensity)
+        chain = assessment[members]
+        last = np.flatnonzero(np.append(chain[1:] != chain[:-1], True))
+        previous = np.maximum(last - 1, 0)
+        merged = (last > 0) & (chain[previous] == chain[last])
+        chain_polarity = np.where(merged, np.clip(polarity[last] * intensity[previous], -1.0, 1.0), polarity[last])
+        chain_negated = (np.bincount(chain[negated[members]], minlength=chains)
+                         + np.bincount(assessment[consumed], minlength=chains)) > 0
+
+        # exclamation marks boost the latest finished assessment of the same headline
+        chain_headline = headline[opens]
+        chain_end = np.flatnonzero(members)[last]
+        bang = np.flatnonzero(vocabulary["exclamation"][token])
+        bang = bang[assessment[bang] >= 0]
+        target = assessment[bang]
+        boosted = (chain_headline[target] == headline[bang]) & (bang > chain_end[target])
+        boosts = np.bincount(target[boosted], minlength=chains)
+        chain_polarity = np.clip(chain_polarity * EXCLAMATION_BOOST ** boosts, -1.0, 1.0)
+        chain_polarity = np.where(chain_negated, chain_polarity * NEGATION_FACTOR, chain_polarity)
+
+        totals = np.bincount(chain_headline, weights=chain_polarity, minlength=count)
+        assessed = np.bincount(chain_headline, minlength=count)
+        return np.divide(totals, assessed, out=np.zeros(len(totals)), where=assessed > 0)[:count].tolist()
+
+
+BACKENDS = {
+    TextBlobBackend.name: TextBlobBackend,
+    LexiconBackend.name: LexiconBackend,
+}
+backend = None
+
+
+def get_backend():
+    global backend
+    if backend is None:
+        backend = TextBlobBackend()
+    return backend
+
+
+def set_backend(new_backend):
+    global backend
+    if isinstance(new_backend, str):
+        new_backend = BACKENDS[new_backend]()
+    backend = new_backend
+    return backend
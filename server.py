@@ -0,0 +1,318 @@
+import json
+import time
+import asyncio
+import contextvars
+import argparse
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import stocks
+import indicators
+import providers
+import instrumentation
+
+HOST = "127.0.0.1"
+PORT = 8080
+WORKERS = 8
+DEFAULT_DAYS = 180
+DEFAULT_DEGREE = 3
+LATENCY_WINDOW = 10000
+RESULT_MEMO_SIZE = 256
+RESULT_TTL_SECONDS = 60
+PREDICTION_FIELDS = ('RSI Norm', 'MACD Norm', 'Bollinger Position Norm', 'Sentiment Norm', 'Total Score', 'Trend')
+
+
+def timestamps(index):
+    return [stamp.isoformat() for stamp in index]
+
+
+def series_values(values):
+    values = np.asarray(values, dtype=float)
+    return [None if np.isnan(value) else float(value) for value in values]
+
+
+def int_param(params, name, default):
+    try:
+        return int(params.get(name, default))
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+
+
+def prediction(data, ticker, with_sentiment=True):
+    result = stocks.predict_stock_movement(data.copy(), ticker, None if with_sentiment else [])
+    return {"ticker": ticker, **dict(zip(PREDICTION_FIELDS, result))}
+
+
+def indicator_series(data, ticker, names, tail):
+    columns = indicators.compute(data).columns()
+    names = names or list(columns)
+    unknown = [name for name in names if name not in columns]
+    if unknown:
+        raise ValueError(f"unknown indicators {unknown}, expected some of {list(columns)}")
+    return {
+        "ticker": ticker,
+        "index": timestamps(data.index[-tail:]),
+        "close": series_values(data['Close'].iloc[-tail:]),
+        "series": {name: series_values(columns[name].iloc[-tail:]) for name in names},
+    }
+
+
+def regression_trends(data, ticker, degree, tail):
+    trends = stocks.regression_trends(data, (1, degree))
+    return {
+        "ticker": ticker,
+        "degree": degree,
+        "index": timestamps(trends['Datetime'].iloc[-tail:]),
+        "close": series_values(trends['Close'].iloc[-tail:]),
+        "linear": series_values(trends[1].iloc[-tail:]),
+        "polynomial": series_values(trends[degree].iloc[-tail:]),
+    }
+
+
+def headline_sentiment(ticker):
+    news_data = stocks.getNewsData(ticker)
+    scored = stocks.show_headlines(ticker, news_data) or []
+    return {
+        "ticker": ticker,
+        "rating": stocks.get_headlines_sentiment(ticker, news_data),
+        "headlines": [{"title": title, "polarity": float(score)} for title, score in scored],
+    }
+
+
+class AnalysisServer:
+    def __init__(self, workers=WORKERS, latency_window=LATENCY_WINDOW):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis")
+        self.latency_window = latency_window
+        self.latencies = {}
+        self.inflight = {}
+        self.results = OrderedDict()
+        self.requests = 0
+        self.coalesced = 0
+        self.memo_hits = 0
+        self.errors = 0
+        self.started = time.time()
+        self.routes = {
+            "/predict": self.predict,
+            "/indicators": self.indicators,
+            "/regression": self.regression,
+            "/sentiment": self.sentiment,
+            "/stats": self.stats,
+        }
+
+    def run(self, func, *args):
+        # like asyncio.to_thread, the worker sees the request's context and so its instrumentation run
+        return asyncio.get_running_loop().run_in_executor(self.pool, contextvars.copy_context().run, func, *args)
+
+    async def coalesce(self, key, factory):
+        # identical concurrent queries share one future; shield keeps one client hanging up from cancelling it
+        future = self.inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self.inflight[key] = future
+            future.add_done_callback(lambda done: self.inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    async def memoized(self, key, data, func, *args):
+        # results are keyed by the bars they were computed from, so a new bar invalidates them
+        bars_key = indicators.memo_key(data)
+        if bars_key is None:
+            return await self.run(func, data, *args)
+        key = key + (bars_key,)
+        entry = self.results.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.results.move_to_end(key)
+            self.memo_hits += 1
+            return entry[1]
+        result = await self.run(func, data, *args)
+        self.results[key] = (time.monotonic() + RESULT_TTL_SECONDS, result)
+        if len(self.results) > RESULT_MEMO_SIZE:
+            self.results.popitem(last=False)
+        return result
+
+    async def bars(self, params):
+        ticker = params.get("ticker")
+        if not ticker:
+            raise ValueError("ticker is required")
+        days = int_param(params, "days", DEFAULT_DAYS)
+        interval = params.get("interval") or stocks.get_interval()
+        end_date = datetime.today()
+        start_str = (end_date - timedelta(days=days)).strftime('%Y-%m-%d')
+        end_str = end_date.strftime('%Y-%m-%d')
+        data = await self.coalesce(("bars", ticker, interval, start_str, end_str),
+                                   lambda: self.run(stocks.fetch_stock_data, ticker, start_str, end_str, interval, False))
+        if data.empty:
+            raise LookupError(f"no data for {ticker}")
+        return ticker, data
+
+    async def predict(self, params):
+        ticker, data = await self.bars(params)
+        with_sentiment = params.get("sentiment", "1") not in ("0", "false", "no")
+        return await self.memoized(("predict", with_sentiment), data, prediction, ticker, with_sentiment)
+
+    async def indicators(self, params):
+        ticker, data = await self.bars(params)
+        names = [name.strip() for name in params.get("names", "").split(",") if name.strip()]
+        tail = int_param(params, "tail", 0)
+        return await self.memoized(("indicators", tuple(names), tail), data, indicator_series, ticker, names, tail)
+
+    async def regression(self, params):
+        ticker, data = await self.bars(params)
+        degree = int_param(params, "degree", DEFAULT_DEGREE)
+        tail = int_param(params, "tail", 0)
+        return await self.memoized(("regression", degree, tail), data, regression_trends, ticker, degree, tail)
+
+    async def sentiment(self, params):
+        ticker = params.get("ticker")
+        if not ticker:
+            raise ValueError("ticker is required")
+        return await self.run(headline_sentiment, ticker)
+
+    async def stats(self, params=None):
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "memo_hits": self.memo_hits,
+            "errors": self.errors,
+            "inflight": len(self.inflight),
+            "memoized_results": len(self.results),
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "latency_ms": self.latency_report(),
+            "bar_cache_network_calls": stocks.bar_store.network_calls,
+            "indicator_memo": len(indicators.memo),
+            "headline_cache": stocks.headline_cache.stats(),
+            "stages": instrumentation.recorder.summary(),
+            "counters": instrumentation.recorder.snapshot()['counters'],
+        }
+
+    def latency_report(self):
+        report = {}
+        for path, samples in sorted(self.latencies.items()):
+            values = np.array(samples) * 1000
+            report[path] = {
+                "count": len(values),
+                "p50": round(float(np.percentile(values, 50)), 3),
+                "p99": round(float(np.percentile(values, 99)), 3),
+                "max": round(float(values.max()), 3),
+            }
+        return report
+
+    async def dispatch(self, method, target):
+        started = time.perf_counter()
+        url = urlparse(target)
+        route = self.routes.get(url.path)
+        if route is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"unknown path {url.path}", "paths": sorted(self.routes)}
+        if method != "GET":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "only GET is supported"}
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if "ticker" in params:
+            params["ticker"] = params["ticker"].strip().upper()
+        self.requests += 1
+        # each connection is its own task, so concurrent requests keep their spans apart
+        instrumentation.begin_run(url.path, params.get("ticker"))
+        try:
+            if route == self.stats:
+                body = await route(params)
+            else:
+                body = await self.coalesce((url.path,) + tuple(sorted(params.items())), lambda: route(params))
+            status = HTTPStatus.OK
+        except ValueError as e:
+            status, body = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except LookupError as e:
+            status, body = HTTPStatus.NOT_FOUND, {"error": str(e)}
+        except Exception as e:
+            print(f"ERROR {target}: {e}")
+            self.errors += 1
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+        self.latencies.setdefault(url.path, deque(maxlen=self.latency_window)).append(time.perf_counter() - started)
+        return status, body
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                length = int(headers.get("content-length", 0) or 0)
+                if length:
+                    await reader.readexactly(length)
+                status, body = await self.dispatch(method, target)
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                payload = json.dumps(body).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def report_every(self, seconds):
+        while True:
+            await asyncio.sleep(seconds)
+            self.print_report()
+
+    def print_report(self):
+        for path, stats in self.latency_report().items():
+            print(f"{path:>12}: {stats['count']:7d} requests  p50={stats['p50']:9.3f} ms  p99={stats['p99']:9.3f} ms")
+        print(f"coalesced={self.coalesced} memo_hits={self.memo_hits} errors={self.errors}")
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(host=HOST, port=PORT, workers=WORKERS, report_seconds=0, server=None):
+    server = server or AnalysisServer(workers)
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"Serving analysis on http://{host}:{port} ({', '.join(sorted(server.routes))})")
+    reporter = asyncio.ensure_future(server.report_every(report_seconds)) if report_seconds else None
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if reporter:
+            reporter.cancel()
+        server.close()
+        server.print_report()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the stock analysis as a local HTTP/JSON API")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--report", type=float, default=0, help="print p50/p99 latencies every N seconds")
+    parser.add_argument("--replay", help="serve bars recorded with providers.py from this directory")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        providers.set_provider(providers.ReplayProvider(args.replay))
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.report))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,63 @@
-import yfinance as yf
 import pandas as pd
-import ta
-import requests
-from bs4 import BeautifulSoup
-from textblob import TextBlob
 import numpy as np
-import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
-from mplfinance.original_flavor import candlestick_ohlc
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
-import pandas_market_calendars as mcal
 from datetime import datetime
-import pytz
 import random
+from lazy import lazy_import
+mdates = lazy_import("matplotlib.dates")
+plt = lazy_import("matplotlib.pyplot")
+mpl_figure = lazy_import("matplotlib.figure")
+mpf_original = lazy_import("mplfinance.original_flavor")
+from bar_cache import BarCache
+from providers import get_provider
+import indicators
+import regression
+from instrumentation import span, timed, count
+from compact import CompactBars, latest_valid
+from news_cache import HeadlineCache
+from news_ingest import NewsIngestor
+from market_sessions import MarketSessions
+from resample import Resampler
+market_sessions = MarketSessions()
+
 def is_market_open(ticker):
     try:
-        info = yf.Ticker(ticker).info
-        exchange = info.get("exchange", "").upper()
-
-        exchange_lookup = {
-            "NASDAQ": "NASDAQ",
-            "NMS": "NASDAQ",
-            "NYSE": "NYSE",
-            "NYQ": "NYSE",
-            "LSE": "LSE",
-            "TSX": "TSX",
-            "TOR": "TSX",
-        }
-
-        asian_exchanges = {
-            "JPX": ("Asia/Tokyo", 9, 15),
-            "TSE": ("Asia/Tokyo", 9, 15),
-            "HKG": ("Asia/Hong_Kong", 9, 16),
-            "SHG": ("Asia/Shanghai", 9, 15),
-            "SHE": ("Asia/Shanghai", 9, 15),
-        }
-
-        if exchange in asian_exchanges:
-            tz_str, open_hr, close_hr = asian_exchanges[exchange]
-            tz = pytz.timezone(tz_str)
-            now = datetime.now(tz)
-            return now.hour >= open_hr and now.hour < close_hr
-
-        cal_code = exchange_lookup.get(exchange)
-        if not cal_code:
-            return False
-
-        cal = mcal.get_calendar(cal_code)
-        today = datetime.now().strftime('%Y-%m-%d')
-        sched = cal.schedule(start_date=today, end_date=today)
-
-        if sched.empty:
-            return False
-
-        aware_now = pytz.utc.localize(datetime.utcnow())
-        open_time = sched.iloc[0]['market_open']
-        close_time = sched.iloc[0]['market_close']
-
-        return open_time <= aware_now <= close_time
+        return market_sessions.is_open(ticker)
     except Exception as e:
         print(f"ERROR {e}")
         return False
 
+def market_state(ticker):
+    try:
+        return market_sessions.state(ticker)
+    except Exception as e:
+        print(f"ERROR {e}")
+        return False, None
+
+
+news_ingestor = NewsIngestor()
+
+@timed("news.scrape")
+def scrape_news(stock):
+    return news_ingestor.fetch_news(stock)
 
+headline_cache = HeadlineCache()
+
+@timed("news")
 def getNewsData(stock):
-    url = f"https://finviz.com/quote.ashx?t={stock}"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.6312.86 Safari/537.36"
-    }
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, "html.parser")
-    table = soup.find("table", class_="fullview-news-outer")
-    news_results = []
-    if table:
-        rows = table.find_all("tr")
-        for row in rows:
-            timestamp = row.td.text.strip()
-            link_tag = row.find_all("td")[1].find("a")
-            title = link_tag.text.strip()
-            link = link_tag["href"]
-            news_results.append({
-                "link": link,
-                "title": title,
-                "snippet": "",
-                "date": timestamp,
-                "source": "Finviz"
-            })
-    return news_results
-
-def get_headlines_sentiment(stock):
-    news_data = getNewsData(stock)
+    return headline_cache.get_news(stock, scrape_news)
+
+@timed("news")
+def get_news_many(stocks):
+    return headline_cache.get_many(stocks, news_ingestor.fetch_many)
+
+@timed("sentiment")
+def get_headlines_sentiment(stock, news_data=None):
+    if news_data is None:
+        news_data = getNewsData(stock)
     headlines = [item['title'] for item in news_data]
     if not headlines:
         return None
-    sentiment_scores = [TextBlob(headline).sentiment.polarity for headline in headlines]
+    sentiment_scores = headline_cache.polarities(headlines)
     sentiment_scores = [score for score in sentiment_scores if score != 0]
     if not sentiment_scores:
         return None
@@ -102,16 +65,17 @@ def get_headlines_sentiment(stock):
     rating = 5.5 + 4.5 * (average_sentiment / 2)
     return rating
 
-def show_headlines(stock):
-    news_data = getNewsData(stock)
+def show_headlines(stock, news_data=None):
+    if news_data is None:
+        news_data = getNewsData(stock)
     headlines = [item['title'] for item in news_data]
     if not headlines:
         return None
-    sentiment_scores = [TextBlob(headline).sentiment.polarity for headline in headlines]
+    sentiment_scores = headline_cache.polarities(headlines)
     headlines_with_sentiment = list(zip(headlines, sentiment_scores))
     return headlines_with_sentiment
 
-def fetch_stock_data(ticker, start_date, end_date):
+def get_interval():
     try:
         with open("user_settings.inf", "r") as f:
             lines = f.readlines()
@@ -119,53 +83,61 @@ def fetch_stock_data(ticker, start_date, end_date):
             interval = interval_line[0].split("=")[1].strip() if interval_line else "1h"
     except:
         interval = "15m"
+    return interval
+
+@timed("download")
+def download_stock_data(ticker, interval, start_date, end_date):
+    count("network.bars")
+    return get_provider().history(ticker, interval, start_date, end_date)
 
-    data = yf.download(ticker, interval=interval, start=start_date, end=end_date)
+bar_store = BarCache(download_stock_data)
+resampler = Resampler(bar_store, market_sessions)
+
+@timed("fetch")
+def fetch_stock_data(ticker, start_date, end_date, interval=None, verbose=True, compact=False):
+    interval = interval or get_interval()
+    if get_provider().cached:
+        data = resampler.get(ticker, interval, start_date, end_date)
+    else:
+        data = download_stock_data(ticker, interval, start_date, end_date)
+    if compact:
+        data = CompactBars.from_frame(data)
+    elif isinstance(data, CompactBars):
+        data = data.to_frame(copy=True)
     if data.empty:
         return data
-    data = data[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
-    data = data.astype(float)
-    print(data)
+    data.attrs['key'] = (ticker.strip().upper(), interval, str(start_date), str(end_date))
+    if verbose:
+        print(data)
     return data
 
 def moving_averages(data):
-    data['20-day MA'] = data['Close'].rolling(window=20).mean()
-    data['50-day MA'] = data['Close'].rolling(window=50).mean()
+    indicators.compute(data).apply(data, ['20-day MA', '50-day MA'])
 
 def bollinger_bands(data):
-    data['20-day Mean'] = data['Close'].rolling(window=20).mean()
-    data['20-day STD'] = data['Close'].rolling(window=20).std()
-    data['Upper Band'] = data['20-day Mean'] + (data['20-day STD'] * 2)
-    data['Lower Band'] = data['20-day Mean'] - (data['20-day STD'] * 2)
+    indicators.compute(data).apply(data, ['Middle Band', '20-day STD', 'Upper Band', 'Lower Band'])
 
 def rsi(data):
-    close_series = data['Close']
-    if isinstance(close_series, pd.DataFrame):
-        close_series = close_series.squeeze()
-    rsi_indicator = ta.momentum.RSIIndicator(close_series)
-    data['RSI'] = rsi_indicator.rsi()
+    indicators.compute(data).apply(data, ['RSI'])
     return data['RSI']
 
 def macd(data):
-    close_series = data['Close']
-    if isinstance(close_series, pd.DataFrame):
-        close_series = close_series.squeeze()
-    macd_calc = ta.trend.MACD(close_series)
-    data['MACD'] = pd.Series(np.ravel(macd_calc.macd()), index=data.index)
-    data['MACD Signal'] = pd.Series(np.ravel(macd_calc.macd_signal()), index=data.index)
+    indicators.compute(data).apply(data, ['MACD', 'MACD Signal'])
     return data['MACD']
 
 def detect_trend(data):
     if len(data) < 50:
         return "Not enough data"
-    ma_short = data['20-day MA'].iloc[-1]
-    ma_long = data['50-day MA'].iloc[-1]
+    return trend_direction(data['20-day MA'].iloc[-1], data['50-day MA'].iloc[-1])
+
+def trend_direction(ma_short, ma_long):
     if ma_short > ma_long:
         return "Bullish"
     elif ma_short < ma_long:
         return "Bearish"
     return "Sideways"
 
+@timed("plot.showboll")
 def showboll(data, ticker):
     ohlc_data = data[['Open', 'High', 'Low', 'Close']].astype(float)
     ohlc_data.reset_index(inplace=True)
@@ -177,7 +149,7 @@ def showboll(data, ticker):
                 break
     ohlc_data['Datetime'] = mdates.date2num(ohlc_data['Datetime'].dt.to_pydatetime())
     fig, axs = plt.subplots()
-    candlestick_ohlc(axs, ohlc_data.values, width=0.6, colorup='green', colordown='red')
+    mpf_original.candlestick_ohlc(axs, ohlc_data.values, width=0.6, colorup='green', colordown='red')
     axs.plot(mdates.date2num(data.index.to_pydatetime()), data['Upper Band'], color='orange', label='Upper Band')
     axs.plot(mdates.date2num(data.index.to_pydatetime()), data['Lower Band'], color='green', label='Lower Band')
     axs.set_title(f'{ticker} Bollinger Bands')
@@ -187,20 +159,24 @@ def showboll(data, ticker):
     axs.grid()
     plt.tight_layout()
     plt.show()
+    plt.close(fig)
 
+@timed("plot.showgraph")
 def showgraph(data):
     ohlc_data = data[['Open', 'High', 'Low', 'Close']].astype(float)
     ohlc_data.reset_index(inplace=True)
     ohlc_data['Datetime'] = mdates.date2num(ohlc_data['Datetime'].dt.to_pydatetime())
     fig, axs = plt.subplots()
-    candlestick_ohlc(axs, ohlc_data.values, width=0.6, colorup='green', colordown='red')
+    mpf_original.candlestick_ohlc(axs, ohlc_data.values, width=0.6, colorup='green', colordown='red')
     axs.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
     axs.legend()
     axs.tick_params(axis='x', rotation=45)
     axs.grid()
     plt.tight_layout()
     plt.show()
+    plt.close(fig)
 
+@timed("plot.showRSI")
 def showRSI(data, ticker):
     fig, axs = plt.subplots()
     axs.plot(data.index, data['RSI'], color='purple', label='RSI')
@@ -212,36 +188,28 @@ def showRSI(data, ticker):
     axs.legend()
     plt.tight_layout()
     plt.show()
+    plt.close(fig)
 
-def linear_regression_trend(data):
+@timed("regression")
+def regression_trends(data, degrees=(1,)):
     data = data.dropna()
-    data = data.reset_index()
-    data['Timestamp'] = data['Datetime'].map(lambda x: x.toordinal())
-    X = data[['Timestamp']]
-    y = data['Close']
-    model = LinearRegression()
-    model.fit(X, y)
-    data['LR Trend'] = model.predict(X)
-    return data[['Datetime', 'Close', 'LR Trend']]
+    close = indicators.close_series(data).to_numpy()
+    x = regression.ordinal_days(data.index)
+    fits = regression.fit(x, close, degrees)
+    result = pd.DataFrame({'Datetime': data.index, 'Close': close})
+    for degree, fitted in fits.items():
+        result[degree] = fitted.predict(x)
+    return result
 
-def polynomial_regression_trend(data, degree=2):
-    degree = int(degree)
-    data = data.dropna().reset_index()
-    if 'Datetime' not in data.columns:
-        data['Datetime'] = data['index']
-    data['Timestamp'] = data['Datetime'].map(lambda x: x.toordinal())
-    X = data[['Timestamp']]
-    y = data['Close']
-
-    poly = PolynomialFeatures(degree=degree)
-    X_poly = poly.fit_transform(X)
-
-    model = LinearRegression()
-    model.fit(X_poly, y)
+def linear_regression_trend(data):
+    result = regression_trends(data, (1,))
+    return result.rename(columns={1: 'LR Trend'})
 
-    data['Poly Trend'] = model.predict(X_poly)
-    return data[['Datetime', 'Close', 'Poly Trend']]
+def polynomial_regression_trend(data, degree=2):
+    result = regression_trends(data, (int(degree),))
+    return result.rename(columns={int(degree): 'Poly Trend'})
 
+@timed("plot.showMACD")
 def showMACD(data, ticker):
     fig, axs = plt.subplots()
     axs.plot(data.index, data['MACD'], color='blue', label='MACD Line')
@@ -254,51 +222,59 @@ def showMACD(data, ticker):
     axs.legend()
     plt.tight_layout()
     plt.show()
+    plt.close(fig)
 
-def predict_stock_movement(data, ticker):
-    for col in ['Close', 'Open', 'High', 'Low']:
-        if isinstance(data[col], pd.DataFrame):
-            data[col] = data[col].squeeze()
-    close_series = data['Close'].squeeze()
-    data['20-day MA'] = close_series.rolling(window=20).mean()
-    data['50-day MA'] = close_series.rolling(window=50).mean()
-    bollinger = ta.volatility.BollingerBands(close_series)
-    data['Upper Band'] = pd.Series(np.ravel(bollinger.bollinger_hband()), index=data.index)
-    data['Middle Band'] = pd.Series(np.ravel(bollinger.bollinger_mavg()), index=data.index)
-    data['Lower Band'] = pd.Series(np.ravel(bollinger.bollinger_lband()), index=data.index)
-    rsi = ta.momentum.RSIIndicator(close_series)
-    data['RSI'] = pd.Series(np.ravel(rsi.rsi()), index=data.index)
-    macd = ta.trend.MACD(close_series)
-    data['MACD'] = pd.Series(np.ravel(macd.macd()), index=data.index)
-    data['MACD Signal'] = pd.Series(np.ravel(macd.macd_signal()), index=data.index)
-    latest_data = data.dropna().iloc[-1]
-    sentiment_rating = get_headlines_sentiment(ticker)
-    rsi_norm = ((latest_data['RSI'] - 50) / 50)
-    macd_diff_val = latest_data['MACD'] - latest_data['MACD Signal']
-    macd_diff_val = macd_diff_val.iloc[0] if isinstance(macd_diff_val, pd.Series) else macd_diff_val
-    macd_max = max(abs(macd_diff_val), 1)
-    macd_norm = macd_diff_val / macd_max
-    middle_band = latest_data['Middle Band']
-    close_price = latest_data['Close']
-    band_width = latest_data['Upper Band'] - latest_data['Lower Band']
-    band_width = band_width.iloc[0] if isinstance(band_width, pd.Series) else band_width
-    band_width_max = max(band_width, 1)
-    bollinger_position_norm = (close_price - middle_band) / (band_width_max / 2)
-    if isinstance(bollinger_position_norm, pd.Series):
-        bollinger_position_norm = bollinger_position_norm.iloc[0]
-    elif isinstance(bollinger_position_norm, np.ndarray):
-        bollinger_position_norm = bollinger_position_norm.item()
-    bollinger_position_norm = float(bollinger_position_norm)
-    sentiment_norm = ((sentiment_rating - 5) / 5) if sentiment_rating is not None else 0
+def normalize_rsi(rsi_value):
+    return (rsi_value - 50) / 50
+
+def normalize_macd(macd_value, signal_value):
+    macd_diff_val = macd_value - signal_value
+    return macd_diff_val / np.maximum(np.abs(macd_diff_val), 1)
+
+def normalize_bollinger(close_price, middle_band, upper_band, lower_band):
+    band_width_max = np.maximum(upper_band - lower_band, 1)
+    return (close_price - middle_band) / (band_width_max / 2)
+
+def indicator_norms(rsi_value, macd_value, signal_value, close_price, middle_band, upper_band, lower_band):
+    return (normalize_rsi(rsi_value), normalize_macd(macd_value, signal_value),
+            normalize_bollinger(close_price, middle_band, upper_band, lower_band))
+
+SCORE_WEIGHTS = (0.33, 0.33, 0.33)
+
+def total_score(rsi_norm, macd_norm, sentiment_norm, weights=SCORE_WEIGHTS, bollinger_norm=0.0):
     weighted_sum = (
-        0.33 * rsi_norm +
-        0.33 * macd_norm +
-        0.33 * sentiment_norm
+        weights[0] * rsi_norm +
+        weights[1] * macd_norm +
+        weights[2] * sentiment_norm
     )
-    score = 50 * weighted_sum
-    trend = detect_trend(data)
+    if len(weights) > 3:
+        weighted_sum = weighted_sum + weights[3] * bollinger_norm
+    return 50 * weighted_sum
+
+@timed("predict")
+def predict_stock_movement(data, ticker, news_data=None):
+    if isinstance(data, CompactBars):
+        # compact bars stay read-only: indicators are read from the memoized frame instead of added as columns
+        with span("indicators"):
+            frame = indicators.compute(data)
+        latest_data = latest_valid(data, frame.columns())
+        trend = trend_direction(frame.ma[20].iloc[-1], frame.ma[50].iloc[-1]) if len(data) >= 50 else "Not enough data"
+    else:
+        for col in ['Close', 'Open', 'High', 'Low']:
+            if isinstance(data[col], pd.DataFrame):
+                data[col] = data[col].squeeze()
+        with span("indicators"):
+            indicators.compute(data).apply(data)
+        latest_data = data.dropna().iloc[-1]
+        trend = detect_trend(data)
+    sentiment_rating = get_headlines_sentiment(ticker, news_data)
+    rsi_norm, macd_norm, bollinger_position_norm = indicator_norms(
+        latest_data['RSI'], latest_data['MACD'], latest_data['MACD Signal'], latest_data['Close'],
+        latest_data['Middle Band'], latest_data['Upper Band'], latest_data['Lower Band'])
+    sentiment_norm = ((sentiment_rating - 5) / 5) if sentiment_rating is not None else 0
+    score = total_score(rsi_norm, macd_norm, sentiment_norm)
     return (
-        float(rsi_norm.iloc[0] if isinstance(rsi_norm, pd.Series) else rsi_norm),
+        float(rsi_norm),
         float(macd_norm),
         float(bollinger_position_norm),
         float(sentiment_norm),
@@ -306,19 +282,27 @@ def predict_stock_movement(data, ticker):
         trend
     )
 
-def plot_projection(data, ticker, return_fig=False):
-    recent_slope = (data['50-day MA'].iloc[-1] - data['50-day MA'].iloc[-50]) / 50
+@timed("plot.projection")
+def plot_projection(data, ticker, return_fig=False, fig=None):
+    ma_long = indicators.compute(data).ma[50] if isinstance(data, CompactBars) else data['50-day MA']
+    recent_slope = (ma_long.iloc[-1] - ma_long.iloc[-50]) / 50
     future_days = np.arange(1, 31)
-    future_prices = data['50-day MA'].iloc[-1] + recent_slope * future_days
-    fig = plt.figure(figsize=(5, 3))
-    plt.plot(data.index, data['Close'], label='Actual Prices')
-    plt.plot(data.index, data['50-day MA'], label='50-day MA')
+    future_prices = ma_long.iloc[-1] + recent_slope * future_days
+    show = fig is None and not return_fig
+    if fig is None:
+        # only the interactive window goes through pyplot; embedded figures never join its registry
+        fig = plt.figure(figsize=(5, 3)) if show else mpl_figure.Figure(figsize=(5, 3))
+    fig.clear()
+    ax = fig.add_subplot(111)
+    ax.plot(data.index, data['Close'], label='Actual Prices')
+    ax.plot(data.index, ma_long, label='50-day MA')
     future_dates = pd.date_range(start=data.index[-1] + pd.Timedelta(days=1), periods=30)
-    plt.plot(future_dates, future_prices, label='Projected', linestyle='dashed')
-    plt.legend()
-    plt.title(f'{ticker} Projection')
-    plt.grid(True)
-    plt.tight_layout()
-    if return_fig:
+    ax.plot(future_dates, future_prices, label='Projected', linestyle='dashed')
+    ax.legend()
+    ax.set_title(f'{ticker} Projection')
+    ax.grid(True)
+    fig.tight_layout()
+    if not show:
         return fig
     plt.show()
+    plt.close(fig)
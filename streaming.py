@@ -0,0 +1,217 @@
+import math
+from collections import deque
+
+NAN = float("nan")
+
+
+class EMA:
+    def __init__(self, span=None, alpha=None, min_periods=None):
+        self.alpha = alpha if alpha is not None else 2 / (span + 1)
+        self.min_periods = min_periods if min_periods is not None else (span or 1)
+        self.prev = None
+        self.current = None
+        self.count = 0
+
+    def _step(self, value):
+        return value if self.prev is None else self.prev + self.alpha * (value - self.prev)
+
+    def update(self, value):
+        self.prev = self.current
+        self.current = self._step(value)
+        self.count += 1
+        return self.value
+
+    def revise(self, value):
+        if self.count == 0:
+            return self.update(value)
+        self.current = self._step(value)
+        return self.value
+
+    @property
+    def value(self):
+        return self.current if self.count >= self.min_periods else NAN
+
+
+class RollingStats:
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.reference = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.appends = 0
+
+    def _resum(self):
+        shift = self.total / len(self.values)
+        self.values = deque(x - shift for x in self.values)
+        self.reference += shift
+        self.total = math.fsum(self.values)
+        self.total_sq = math.fsum(x * x for x in self.values)
+
+    def update(self, value):
+        if self.reference is None:
+            self.reference = value
+        x = value - self.reference
+        self.values.append(x)
+        self.total += x
+        self.total_sq += x * x
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+        self.appends += 1
+        if self.appends % self.window == 0:
+            self._resum()
+        return self.mean
+
+    def revise(self, value):
+        if not self.values:
+            return self.update(value)
+        x = value - self.reference
+        old = self.values[-1]
+        self.values[-1] = x
+        self.total += x - old
+        self.total_sq += x * x - old * old
+        return self.mean
+
+    @property
+    def mean(self):
+        if len(self.values) < self.window:
+            return NAN
+        return self.total / self.window + self.reference
+
+    @property
+    def std(self):
+        if len(self.values) < self.window:
+            return NAN
+        mean = self.total / self.window
+        return math.sqrt(max(self.total_sq / self.window - mean * mean, 0.0))
+
+
+class Bollinger:
+    def __init__(self, window=20, window_dev=2):
+        self.stats = RollingStats(window)
+        self.window_dev = window_dev
+
+    def update(self, value):
+        self.stats.update(value)
+        return self.value
+
+    def revise(self, value):
+        self.stats.revise(value)
+        return self.value
+
+    @property
+    def value(self):
+        mean, std = self.stats.mean, self.stats.std
+        return mean, mean + self.window_dev * std, mean - self.window_dev * std
+
+
+class RSI:
+    def __init__(self, window=14):
+        self.avg_up = EMA(alpha=1 / window, min_periods=window)
+        self.avg_down = EMA(alpha=1 / window, min_periods=window)
+        self.prev_close = None
+        self.last_close = None
+
+    def _moves(self, value):
+        diff = 0.0 if self.prev_close is None else value - self.prev_close
+        return max(diff, 0.0), max(-diff, 0.0)
+
+    def update(self, value):
+        self.prev_close = self.last_close
+        self.last_close = value
+        up, down = self._moves(value)
+        self.avg_up.update(up)
+        self.avg_down.update(down)
+        return self.value
+
+    def revise(self, value):
+        if self.last_close is None:
+            return self.update(value)
+        self.last_close = value
+        up, down = self._moves(value)
+        self.avg_up.revise(up)
+        self.avg_down.revise(down)
+        return self.value
+
+    @property
+    def value(self):
+        up, down = self.avg_up.value, self.avg_down.value
+        if math.isnan(down):
+            return NAN
+        if down == 0:
+            return 100.0
+        return 100 - 100 / (1 + up / down)
+
+
+class MACD:
+    def __init__(self, window_fast=12, window_slow=26, window_sign=9):
+        self.fast = EMA(span=window_fast)
+        self.slow = EMA(span=window_slow)
+        self.signal = EMA(span=window_sign)
+        self.signal_has_bar = False
+
+    def update(self, value):
+        self.fast.update(value)
+        self.slow.update(value)
+        macd = self.fast.value - self.slow.value
+        self.signal_has_bar = not math.isnan(macd)
+        if self.signal_has_bar:
+            self.signal.update(macd)
+        return self.value
+
+    def revise(self, value):
+        self.fast.revise(value)
+        self.slow.revise(value)
+        if self.signal_has_bar:
+            self.signal.revise(self.fast.value - self.slow.value)
+        return self.value
+
+    @property
+    def value(self):
+        return self.fast.value - self.slow.value, self.signal.value
+
+
+class StreamingIndicators:
+    def __init__(self):
+        self.bollinger = Bollinger(20, 2)
+        self.ma_long = RollingStats(50)
+        self.rsi = RSI(14)
+        self.macd = MACD(12, 26, 9)
+        self.close = NAN
+
+    @classmethod
+    def from_close(cls, close):
+        stream = cls()
+        for value in close:
+            stream.update(float(value))
+        return stream
+
+    def update(self, value):
+        self.close = value
+        for indicator in (self.bollinger, self.ma_long, self.rsi, self.macd):
+            indicator.update(value)
+        return self.snapshot()
+
+    def revise(self, value):
+        self.close = value
+        for indicator in (self.bollinger, self.ma_long, self.rsi, self.macd):
+            indicator.revise(value)
+        return self.snapshot()
+
+    def snapshot(self):
+        middle, upper, lower = self.bollinger.value
+        macd, signal = self.macd.value
+        return {
+            'Close': self.close,
+            '20-day MA': middle,
+            '50-day MA': self.ma_long.mean,
+            'Middle Band': middle,
+            '20-day STD': self.bollinger.stats.std,
+            'Upper Band': upper,
+            'Lower Band': lower,
+            'RSI': self.rsi.value,
+            'MACD': macd,
+            'MACD Signal': signal,
+        }
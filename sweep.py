@@ -0,0 +1,245 @@
+import os
+import hashlib
+import argparse
+import itertools
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import stocks
+import indicators
+import screener
+import parallel
+import backtest
+
+CACHE_DIR = "sweep_cache"
+TREND_WINDOW = 50
+WEIGHT_NAMES = ['W RSI', 'W MACD', 'W Bollinger']
+PARAM_NAMES = ['RSI', 'MACD Fast', 'MACD Slow', 'MACD Signal', 'Boll Window', 'Boll Dev']
+METRICS = ['Total Return', 'Sharpe', 'Max Drawdown', 'Hit Rate', 'Turnover', 'Exposure']
+
+
+class Components:
+    # every rolling sum, EMA and norm is built once per series and shared by all the combinations that use it
+    def __init__(self, close):
+        self.close = close
+        values = close.to_numpy(dtype=float)
+        self.reference = np.nanmean(values)
+        centered = values - self.reference
+        self.sums = np.concatenate([[0.0], np.cumsum(centered)])
+        self.squares = np.concatenate([[0.0], np.cumsum(centered * centered)])
+        self.cache = {}
+
+    def _memo(self, key, build):
+        if key not in self.cache:
+            self.cache[key] = build()
+        return self.cache[key]
+
+    def ema(self, span):
+        return self._memo(("ema", span), lambda: indicators.ema(self.close, span))
+
+    def rsi(self, window):
+        return self._memo(("rsi", window),
+                          lambda: stocks.normalize_rsi(indicators.wilder_rsi(self.close, window)).to_numpy())
+
+    def macd(self, fast, slow, signal):
+        def build():
+            line = self.ema(fast) - self.ema(slow)
+            return stocks.normalize_macd(line, indicators.ema(line, signal)).to_numpy()
+        return self._memo(("macd", fast, slow, signal), build)
+
+    def rolling(self, window):
+        def build():
+            count = len(self.close)
+            mean = np.full(count, np.nan)
+            std = np.full(count, np.nan)
+            if count >= window:
+                total = self.sums[window:] - self.sums[:-window]
+                squares = self.squares[window:] - self.squares[:-window]
+                centered_mean = total / window
+                mean[window - 1:] = centered_mean + self.reference
+                std[window - 1:] = np.sqrt(np.clip(squares / window - centered_mean * centered_mean, 0, None))
+            return mean, std
+        return self._memo(("rolling", window), build)
+
+    def bollinger(self, window, dev):
+        def build():
+            mean, std = self.rolling(window)
+            return stocks.normalize_bollinger(self.close.to_numpy(), mean, mean + dev * std, mean - dev * std)
+        return self._memo(("bollinger", window, dev), build)
+
+    def norms(self, params):
+        rsi, fast, slow, signal, boll_window, boll_dev = params
+        return np.column_stack([self.rsi(rsi), self.macd(fast, slow, signal), self.bollinger(boll_window, boll_dev)])
+
+
+def make_grid(rsi=(14,), macd=((12, 26, 9),), bollinger=((20, 2),), weight_steps=(0.0, 0.5, 1.0)):
+    params = [(r,) + tuple(m) + tuple(b) for r, m, b in itertools.product(rsi, macd, bollinger)]
+    weights = np.array([w for w in itertools.product(weight_steps, repeat=len(WEIGHT_NAMES)) if any(w)], dtype=float)
+    return params, weights
+
+
+def evaluate(norms, weights, returns, start, periods_per_year, cost, allow_short=True):
+    # all weight vectors for one indicator combination at once: bars x combinations
+    score = 50 * norms @ weights.T
+    position = np.where(score >= 0, 1.0, -1.0 if allow_short else 0.0)
+    position[:start] = 0.0
+    position[np.isnan(score)] = 0.0
+    held = np.vstack([np.zeros((1, position.shape[1])), position[:-1]])
+    turnover = np.abs(np.diff(position, axis=0, prepend=0.0))
+    gross = held * returns[:, None]
+    net = gross - turnover * cost
+    equity = np.cumprod(1 + net, axis=0)
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1
+    deviation = net.std(axis=0, ddof=1)
+    active = held != 0
+    years = len(returns) / periods_per_year
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where(deviation > 0, net.mean(axis=0) / deviation * np.sqrt(periods_per_year), 0.0)
+        hit_rate = ((gross > 0) & active).sum(axis=0) / active.sum(axis=0)
+    return np.column_stack([equity[-1] - 1, sharpe, drawdown.min(axis=0), hit_rate,
+                            turnover.sum(axis=0) / years, active.mean(axis=0)])
+
+
+def fingerprint(close, cost, allow_short):
+    digest = hashlib.sha1(close.to_numpy(dtype=float).tobytes())
+    digest.update(np.asarray(close.index.asi8 if isinstance(close.index, pd.DatetimeIndex) else []).tobytes())
+    digest.update(f"{cost}:{allow_short}".encode())
+    return digest.hexdigest()[:20]
+
+
+class SweepCache:
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.parquet")
+
+    def load(self, key):
+        path = self._path(key)
+        if not self.directory or not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            print(f"ERROR {e}")
+            return None
+
+    def store(self, key, frame):
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        frame.to_parquet(self._path(key), index=False)
+
+
+def sweep(data, params, weights, cost_bps=backtest.COST_BPS, slippage_bps=backtest.SLIPPAGE_BPS, allow_short=True,
+          cache_dir=CACHE_DIR):
+    close = indicators.close_series(data)
+    cost = (cost_bps + slippage_bps) / 10000
+    cache = SweepCache(cache_dir)
+    key = fingerprint(close, cost, allow_short)
+    cached = cache.load(key)
+    done = set()
+    if cached is not None:
+        done = set(map(tuple, cached[PARAM_NAMES + WEIGHT_NAMES].to_numpy().tolist()))
+
+    returns = close.pct_change().fillna(0.0).to_numpy()
+    span = (close.index[-1] - close.index[0]).total_seconds() if isinstance(close.index, pd.DatetimeIndex) else 0
+    years = span / backtest.SECONDS_PER_YEAR if span > 0 else len(close) / 252
+    periods_per_year = len(close) / years
+    components = Components(close)
+    trend_start = TREND_WINDOW - 1
+    frames = []
+    for combo in params:
+        pending = [w for w in weights if tuple(map(float, combo)) + tuple(w) not in done]
+        if not pending:
+            continue
+        norms = components.norms(combo)
+        valid = ~np.isnan(norms).any(axis=1)
+        start = max(int(np.argmax(valid)) if valid.any() else len(valid), trend_start)
+        metrics = evaluate(norms, np.array(pending), returns, start, periods_per_year, cost, allow_short)
+        frame = pd.DataFrame(metrics, columns=METRICS)
+        frame[WEIGHT_NAMES] = np.array(pending)
+        frame[PARAM_NAMES] = np.array(combo, dtype=float)
+        frames.append(frame)
+    if frames:
+        cached = pd.concat(([cached] if cached is not None else []) + frames, ignore_index=True)
+        cache.store(key, cached)
+    if cached is None:
+        return pd.DataFrame(columns=PARAM_NAMES + WEIGHT_NAMES + METRICS)
+    wanted = pd.DataFrame([tuple(map(float, combo)) + tuple(w) for combo in params for w in weights],
+                          columns=PARAM_NAMES + WEIGHT_NAMES)
+    return wanted.merge(cached, on=PARAM_NAMES + WEIGHT_NAMES, how="left")[PARAM_NAMES + WEIGHT_NAMES + METRICS]
+
+
+def sweep_chunk(tasks, params, weights, options):
+    results = []
+    for position, ticker, start, stop in tasks:
+        try:
+            result = sweep(parallel.frame_from_block(start, stop), params, weights, **options)
+            result.insert(0, 'Ticker', ticker)
+        except Exception as e:
+            print(f"ERROR {ticker}: {e}")
+            result = None
+        results.append((position, result))
+    return results
+
+
+def sweep_many(frames, params, weights, workers=None, chunksize=parallel.CHUNK_SIZE, **options):
+    frames = {ticker: data for ticker, data in frames.items() if not data.empty}
+    if not frames:
+        return pd.DataFrame()
+    results = parallel.map_shared(frames, sweep_chunk, params, weights, options, workers=workers, chunksize=chunksize)
+    results = [result for result in results if result is not None]
+    return pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+
+
+def rank(results, metric='Sharpe', top=20):
+    # average every combination across the universe, best first
+    table = results.groupby(PARAM_NAMES + WEIGHT_NAMES)[METRICS].mean().reset_index()
+    return table.sort_values(metric, ascending=metric == 'Turnover').head(top).reset_index(drop=True)
+
+
+def parse_list(text, cast=int):
+    return [tuple(cast(part) for part in item.split(":")) if ":" in item else cast(item)
+            for item in text.split(",") if item.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grid-search indicator windows and score weights over history")
+    parser.add_argument("tickers", nargs="*")
+    parser.add_argument("--file", help="text file with one ticker per line")
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--interval")
+    parser.add_argument("--rsi", default="7,14,21", help="RSI windows")
+    parser.add_argument("--macd", default="12:26:9,8:17:9,5:35:5", help="fast:slow:signal triples")
+    parser.add_argument("--bollinger", default="20:2,20:2.5,10:2", help="window:deviation pairs")
+    parser.add_argument("--weights", default="0,0.25,0.5,0.75,1", help="values tried for each score weight")
+    parser.add_argument("--metric", default="Sharpe", choices=METRICS)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--cost-bps", type=float, default=backtest.COST_BPS)
+    parser.add_argument("--slippage-bps", type=float, default=backtest.SLIPPAGE_BPS)
+    parser.add_argument("--long-only", action="store_true")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="where partial results are kept; empty to disable")
+    parser.add_argument("--output", help="write every combination's per-ticker metrics to a CSV file")
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.file:
+        tickers += screener.read_tickers(args.file)
+    tickers = [ticker.strip().upper() for ticker in tickers if ticker.strip()]
+    params, weights = make_grid(parse_list(args.rsi), parse_list(args.macd),
+                                [(int(b[0]), float(b[1])) for b in parse_list(args.bollinger, float)],
+                                [float(w) for w in args.weights.split(",")])
+    print(f"{len(params)} indicator combinations x {len(weights)} weight vectors x {len(tickers)} tickers")
+    end_date = datetime.today()
+    start_date = (end_date - timedelta(days=args.days)).strftime('%Y-%m-%d')
+    panel = screener.fetch_universe(tickers, args.interval or stocks.get_interval(), start_date,
+                                    end_date.strftime('%Y-%m-%d'))
+    results = sweep_many(parallel.split_panel(panel), params, weights, args.workers, cost_bps=args.cost_bps,
+                         slippage_bps=args.slippage_bps, allow_short=not args.long_only,
+                         cache_dir=args.cache_dir) if not panel.empty else pd.DataFrame()
+    if args.output:
+        results.to_csv(args.output, index=False)
+    if not results.empty:
+        print(rank(results, args.metric, args.top).to_string(index=False))